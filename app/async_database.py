@@ -0,0 +1,24 @@
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from .config import settings
+from .database import apply_sqlite_pragmas, engine_options
+from .metrics import SlowQueryLog
+
+# Any async driver works in production, e.g. postgresql+asyncpg://...
+ASYNC_DATABASE_URL = settings.async_database_url
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, settings)
+)
+apply_sqlite_pragmas(async_engine.sync_engine, settings)
+if settings.slow_query_ms > 0:
+    SlowQueryLog(settings.slow_query_ms / 1000).attach(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+async def get_async_db():
+    """Async database dependency for FastAPI endpoints."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,130 @@
+"""Async variant of the API served from pooled ``AsyncSession`` objects.
+
+Run with ``uvicorn app.async_main:app``. The handlers are ``async def`` so
+requests are not bound by the threadpool that serves the sync handlers in
+``app.main``; responses are identical.
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import Depends, FastAPI, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import db_models, migrate
+from .async_database import async_engine, get_async_db
+from .config import settings
+from .models import Comment, CommentCreate, Post, PostCreate
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset, split_page
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The schema comes from ``python -m app.migrate``, as for the sync app
+    if settings.migrate_on_startup:
+        await run_in_threadpool(migrate.upgrade)
+    yield
+    await async_engine.dispose()
+
+
+app = FastAPI(title="Posts + Comments API", lifespan=lifespan)
+
+
+async def _post_exists(db: AsyncSession, post_id: int) -> bool:
+    result = await db.execute(
+        select(db_models.DBPost.id).where(db_models.DBPost.id == post_id)
+    )
+    return result.first() is not None
+
+
+@app.post("/posts", response_model=Post, status_code=201)
+async def create_post(post: PostCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new post."""
+    posts = db_models.DBPost.__table__
+    result = await db.execute(insert(posts).returning(*posts.c), post.model_dump())
+    db_post = result.one()
+    await db.commit()
+    return db_post
+
+
+@app.get("/posts", response_model=List[Post])
+async def get_posts(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a page of posts; the next page's cursor is in X-Next-Cursor."""
+    stmt = keyset(select(db_models.DBPost), db_models.DBPost, cursor, limit)
+    posts, next_cursor = split_page((await db.execute(stmt)).scalars().all(), limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return posts
+
+
+@app.get("/posts/{post_id}", response_model=Post)
+async def get_post(post_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get a specific post by ID."""
+    db_post = await db.get(db_models.DBPost, post_id)
+    if not db_post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return db_post
+
+
+@app.post("/comments", response_model=Comment, status_code=201)
+async def create_comment(
+    comment: CommentCreate, db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new comment on a post."""
+    # Update the post's version and comment summary; no row updated means
+    # the post does not exist
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(db_models.DBPost)
+        .where(db_models.DBPost.id == comment.post_id)
+        .values(
+            version=db_models.DBPost.version + 1,
+            comment_count=db_models.DBPost.comment_count + 1,
+            last_comment_at=now,
+        )
+    )
+    if not result.rowcount:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    comments = db_models.DBComment.__table__
+    result = await db.execute(
+        insert(comments).returning(*comments.c),
+        {**comment.model_dump(), "created_at": now},
+    )
+    db_comment = result.one()
+    await db.commit()
+    return db_comment
+
+
+@app.get("/posts/{post_id}/comments", response_model=List[Comment])
+async def get_comments(
+    post_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a page of comments for a post; see X-Next-Cursor for the next page."""
+    if not await _post_exists(db, post_id):
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    stmt = keyset(
+        select(db_models.DBComment).where(db_models.DBComment.post_id == post_id),
+        db_models.DBComment,
+        cursor,
+        limit,
+    )
+    comments, next_cursor = split_page(
+        (await db.execute(stmt)).scalars().all(), limit
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return comments
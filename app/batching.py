@@ -0,0 +1,165 @@
+"""Write-behind group commit for ``POST /comments``.
+
+With ``COMMENT_BATCHING=1`` the endpoint validates the comment, puts it on an
+in-process queue and blocks until a background thread has committed it. The
+thread flushes whenever ``COMMENT_BATCH_SIZE`` comments are waiting or
+``COMMENT_BATCH_WAIT_MS`` after the first one arrived, with the same three
+statements and one commit as ``POST /comments/bulk``. Concurrent writers then
+share one transaction and one fsync, instead of queueing one by one behind
+SQLite's write lock.
+
+A caller gets its 201 only after its batch committed, so an acknowledged
+comment is as durable as without batching. Comments still in the queue when
+the process dies were never acknowledged.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, List, Optional
+
+from fastapi import HTTPException
+
+from .config import Settings, settings
+from .database import SessionLocal
+from .models import CommentCreate
+from .repository import Repository, SqlRepository, store
+from .search import search_index
+
+_STOP = object()
+
+
+def write_comments(repo: Repository, comments: List[CommentCreate]) -> list:
+    """Insert ``comments`` in one transaction; None for those without a post."""
+    existing = repo.existing_post_ids(comment.post_id for comment in comments)
+    insertable = [comment for comment in comments if comment.post_id in existing]
+    created = iter(repo.create_comments(insertable) if insertable else [])
+    return [next(created) if comment.post_id in existing else None for comment in comments]
+
+
+def default_repository() -> Repository:
+    return store if store is not None else SqlRepository(SessionLocal(), search_index)
+
+
+class CommentBatcher:
+    """Queue of pending comments flushed in batches by one background thread."""
+
+    def __init__(
+        self,
+        repository_factory: Callable[[], Repository] = default_repository,
+        max_batch: int = 100,
+        max_wait: float = 0.005,
+        max_queue: int = 10000,
+        timeout: float = 10.0,
+    ):
+        self.repository_factory = repository_factory
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.comments = 0
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="comment-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def close(self) -> None:
+        """Flush everything queued so far and stop the background thread."""
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def submit(self, comment: CommentCreate) -> Future:
+        """Queue ``comment``; the future resolves to its row, or None if no post."""
+        if self._thread is None:
+            self.start()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((comment, future))
+        except queue.Full:
+            raise HTTPException(
+                status_code=503,
+                detail="Comment queue is full",
+                headers={"Retry-After": "1"},
+            )
+        return future
+
+    def write(self, comment: CommentCreate):
+        """Submit ``comment`` and wait for its batch; 503 if that takes ``timeout``."""
+        try:
+            return self.submit(comment).result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # The comment may still commit later; the client has to check or retry
+            raise HTTPException(
+                status_code=503,
+                detail="Comment batch did not commit in time",
+                headers={"Retry-After": "1"},
+            )
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 \
+                        else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch: list) -> None:
+        repo = None
+        try:
+            # Inside the try: a failing factory must fail the batch, not the thread
+            repo = self.repository_factory()
+            rows = write_comments(repo, [comment for comment, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+        else:
+            self.batches += 1
+            self.comments += len(batch)
+            for (_, future), row in zip(batch, rows):
+                future.set_result(row)
+        finally:
+            if repo is not None:
+                repo.close()
+
+
+def make_batcher(config: Settings = settings) -> Optional[CommentBatcher]:
+    """The comment batcher if ``COMMENT_BATCHING`` is on, else None."""
+    if not config.comment_batching:
+        return None
+    return CommentBatcher(
+        max_batch=config.comment_batch_size,
+        max_wait=config.comment_batch_wait_ms / 1000,
+        max_queue=config.comment_queue_size,
+        timeout=config.comment_batch_timeout,
+    )
+
+
+comment_batcher = make_batcher(settings)
+
+
+def get_comment_batcher() -> Optional[CommentBatcher]:
+    """Comment batcher dependency for FastAPI endpoints."""
+    return comment_batcher
@@ -0,0 +1,193 @@
+"""Read-through cache for serialized JSON responses.
+
+Backends store already-encoded response bodies keyed by resource, so a hit
+skips both the SQL round trip and Pydantic validation. Writers invalidate the
+exact keys they affect via the ``*_key`` helpers below.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from .config import Settings, settings
+
+
+def post_key(post_id: int) -> str:
+    return f"post:{post_id}"
+
+
+def comments_key(post_id: int) -> str:
+    """Key of the first, default-sized page of a post's comments."""
+    return f"comments:{post_id}"
+
+
+def pack_entry(body: bytes, headers: dict) -> bytes:
+    """Store a response body together with the headers it is served with."""
+    return json.dumps(headers, separators=(",", ":")).encode() + b"\n" + body
+
+
+def unpack_entry(value: bytes):
+    """Return ``(body, headers)`` from ``pack_entry`` output."""
+    headers, _, body = value.partition(b"\n")
+    return body, json.loads(headers)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class CacheBackend:
+    """Interface shared by all cache backends."""
+    name = "none"
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes) -> None:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def _record(self, value: Optional[bytes]) -> Optional[bytes]:
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    def info(self) -> dict:
+        return {"backend": self.name, **asdict(self.stats)}
+
+
+class NullCache(CacheBackend):
+    """Backend used when caching is disabled; never stores anything."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def set(self, key: str, value: bytes) -> None:
+        pass
+
+    def delete(self, *keys: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache with a per-entry TTL."""
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 60.0):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return self._record(value)
+                del self._entries[key]
+            return self._record(None)
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> dict:
+        return {**super().info(), "size": len(self._entries)}
+
+
+class RedisCache(CacheBackend):
+    """Backend for any client speaking the Redis GET/SET/DEL commands.
+
+    Evictions are performed by the server (``maxmemory-policy``) and are
+    reported from ``INFO stats`` when the client supports it.
+    """
+    name = "redis"
+
+    def __init__(self, client, ttl: float = 60.0, prefix: str = "fastapi:"):
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._record(self.client.get(self.prefix + key))
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(self.prefix + key, value, ex=max(1, int(self.ttl)))
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def info(self) -> dict:
+        info = super().info()
+        try:
+            info["evictions"] = int(self.client.info("stats").get("evicted_keys", 0))
+        except (AttributeError, NotImplementedError):
+            pass
+        return info
+
+
+def make_cache(config: Settings = settings) -> CacheBackend:
+    """Build the cache backend selected by ``CACHE_BACKEND``."""
+    if config.cache_backend == "memory":
+        return MemoryCache(max_entries=config.cache_max_entries, ttl=config.cache_ttl)
+    if config.cache_backend == "redis":
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "CACHE_BACKEND=redis requires the 'redis' package"
+            ) from exc
+        return RedisCache(redis.Redis.from_url(config.redis_url), ttl=config.cache_ttl)
+    if config.cache_backend == "none":
+        return NullCache()
+    raise ValueError(f"Unknown CACHE_BACKEND: {config.cache_backend!r}")
+
+
+cache = make_cache(settings)
+
+
+def get_cache() -> CacheBackend:
+    """Cache dependency for FastAPI endpoints."""
+    return cache
@@ -0,0 +1,165 @@
+"""Application settings read from environment variables."""
+import os
+from dataclasses import dataclass
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return default if value is None else int(value)
+
+
+@dataclass
+class Settings:
+    """Engine, pool and SQLite tuning knobs.
+
+    Every field can be overridden with the upper-cased environment variable
+    of the same name, e.g. ``DATABASE_URL`` or ``DB_POOL_SIZE``.
+    """
+    database_url: str = "sqlite:///./fastapi_app.db"
+    async_database_url: str = "sqlite+aiosqlite:///./fastapi_app.db"
+    # Comma-separated read-only URLs, e.g.
+    # "sqlite:///file:./fastapi_app.db?mode=ro&uri=true"
+    database_replica_urls: str = ""
+    # Reads stay on the primary this long after the client's last write
+    read_your_writes_seconds: float = 5.0
+    # pool_size + max_overflow should cover the 40 anyio worker threads, or
+    # requests waiting on a connection can starve the threads that would
+    # return one to the pool.
+    db_pool_size: int = 20
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30
+    db_pool_pre_ping: bool = False
+    sqlite_pragmas: bool = True
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -64000  # negative means KiB, i.e. 64 MB
+    sqlite_busy_timeout: int = 5000  # milliseconds
+    # Storage: "sqlalchemy" (DATABASE_URL) or "memory" (in-process, one worker)
+    storage_backend: str = "sqlalchemy"
+    # Response cache: "none", "memory" or "redis". The memory backend is
+    # per-process, so only enable it with a single worker.
+    cache_backend: str = "none"
+    cache_ttl: float = 60.0
+    cache_max_entries: int = 10000
+    redis_url: str = "redis://localhost:6379/0"
+    # Full-text search: "fts5" (SQLite FTS5, BM25 ranked) or "like" (scan)
+    search_backend: str = "fts5"
+    # Skip response-model validation on reads and encode rows with orjson
+    fast_serializer: bool = False
+    # Group commit for POST /comments: flush every N comments or T ms
+    comment_batching: bool = False
+    comment_batch_size: int = 100
+    comment_batch_wait_ms: float = 5.0
+    comment_queue_size: int = 10000
+    # Seconds a request waits for its batch to commit before answering 503
+    comment_batch_timeout: float = 10.0
+    # Per-request timing: Server-Timing header, SQL hooks and /metrics
+    metrics_enabled: bool = True
+    # Log SQL statements slower than this many milliseconds (0 disables it)
+    slow_query_ms: float = 0.0
+    # Server-sent comment streams: idle keepalive and per-stream backlog
+    stream_keepalive_seconds: float = 15.0
+    stream_queue_size: int = 100
+    # Apply Alembic migrations in the app's lifespan instead of beforehand
+    migrate_on_startup: bool = False
+    # Write admission control: per-client token buckets ("none", "memory" or
+    # "redis") and a per-process cap on writes in flight (0 disables it)
+    rate_limit_backend: str = "none"
+    rate_limit_per_second: float = 10.0
+    rate_limit_burst: float = 20.0
+    rate_limit_max_clients: int = 100000
+    write_concurrency_limit: int = 0
+    # Idempotency-Key replays for POST /posts and /comments: "none" or "memory"
+    idempotency_backend: str = "none"
+    idempotency_ttl: float = 86400.0
+    idempotency_max_entries: int = 10000
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        defaults = cls()
+        return cls(
+            database_url=os.environ.get("DATABASE_URL", defaults.database_url),
+            async_database_url=os.environ.get(
+                "ASYNC_DATABASE_URL", defaults.async_database_url
+            ),
+            database_replica_urls=os.environ.get(
+                "DATABASE_REPLICA_URLS", defaults.database_replica_urls
+            ),
+            read_your_writes_seconds=float(os.environ.get(
+                "READ_YOUR_WRITES_SECONDS", defaults.read_your_writes_seconds
+            )),
+            db_pool_size=_env_int("DB_POOL_SIZE", defaults.db_pool_size),
+            db_max_overflow=_env_int("DB_MAX_OVERFLOW", defaults.db_max_overflow),
+            db_pool_timeout=_env_int("DB_POOL_TIMEOUT", defaults.db_pool_timeout),
+            db_pool_pre_ping=_env_bool("DB_POOL_PRE_PING", defaults.db_pool_pre_ping),
+            sqlite_pragmas=_env_bool("SQLITE_PRAGMAS", defaults.sqlite_pragmas),
+            sqlite_journal_mode=os.environ.get(
+                "SQLITE_JOURNAL_MODE", defaults.sqlite_journal_mode
+            ),
+            sqlite_synchronous=os.environ.get(
+                "SQLITE_SYNCHRONOUS", defaults.sqlite_synchronous
+            ),
+            sqlite_mmap_size=_env_int("SQLITE_MMAP_SIZE", defaults.sqlite_mmap_size),
+            sqlite_cache_size=_env_int("SQLITE_CACHE_SIZE", defaults.sqlite_cache_size),
+            sqlite_busy_timeout=_env_int(
+                "SQLITE_BUSY_TIMEOUT", defaults.sqlite_busy_timeout
+            ),
+            storage_backend=os.environ.get("STORAGE_BACKEND", defaults.storage_backend),
+            cache_backend=os.environ.get("CACHE_BACKEND", defaults.cache_backend),
+            cache_ttl=float(os.environ.get("CACHE_TTL", defaults.cache_ttl)),
+            cache_max_entries=_env_int("CACHE_MAX_ENTRIES", defaults.cache_max_entries),
+            redis_url=os.environ.get("REDIS_URL", defaults.redis_url),
+            search_backend=os.environ.get("SEARCH_BACKEND", defaults.search_backend),
+            fast_serializer=_env_bool("FAST_SERIALIZER", defaults.fast_serializer),
+            comment_batching=_env_bool("COMMENT_BATCHING", defaults.comment_batching),
+            comment_batch_size=_env_int("COMMENT_BATCH_SIZE", defaults.comment_batch_size),
+            comment_batch_wait_ms=float(
+                os.environ.get("COMMENT_BATCH_WAIT_MS", defaults.comment_batch_wait_ms)
+            ),
+            comment_queue_size=_env_int("COMMENT_QUEUE_SIZE", defaults.comment_queue_size),
+            comment_batch_timeout=float(
+                os.environ.get("COMMENT_BATCH_TIMEOUT", defaults.comment_batch_timeout)
+            ),
+            metrics_enabled=_env_bool("METRICS_ENABLED", defaults.metrics_enabled),
+            slow_query_ms=float(os.environ.get("SLOW_QUERY_MS", defaults.slow_query_ms)),
+            stream_keepalive_seconds=float(os.environ.get(
+                "STREAM_KEEPALIVE_SECONDS", defaults.stream_keepalive_seconds
+            )),
+            stream_queue_size=_env_int("STREAM_QUEUE_SIZE", defaults.stream_queue_size),
+            migrate_on_startup=_env_bool("MIGRATE_ON_STARTUP", defaults.migrate_on_startup),
+            rate_limit_backend=os.environ.get(
+                "RATE_LIMIT_BACKEND", defaults.rate_limit_backend
+            ),
+            rate_limit_per_second=float(os.environ.get(
+                "RATE_LIMIT_PER_SECOND", defaults.rate_limit_per_second
+            )),
+            rate_limit_burst=float(os.environ.get(
+                "RATE_LIMIT_BURST", defaults.rate_limit_burst
+            )),
+            rate_limit_max_clients=_env_int(
+                "RATE_LIMIT_MAX_CLIENTS", defaults.rate_limit_max_clients
+            ),
+            write_concurrency_limit=_env_int(
+                "WRITE_CONCURRENCY_LIMIT", defaults.write_concurrency_limit
+            ),
+            idempotency_backend=os.environ.get(
+                "IDEMPOTENCY_BACKEND", defaults.idempotency_backend
+            ),
+            idempotency_ttl=float(os.environ.get(
+                "IDEMPOTENCY_TTL", defaults.idempotency_ttl
+            )),
+            idempotency_max_entries=_env_int(
+                "IDEMPOTENCY_MAX_ENTRIES", defaults.idempotency_max_entries
+            ),
+        )
+
+
+settings = Settings.from_env()
@@ -0,0 +1,168 @@
+"""Data access for posts and comments.
+
+Every function issues the minimum number of statements: inserts use
+``INSERT ... RETURNING`` instead of a follow-up ``refresh()`` SELECT, and
+existence checks are folded into an UPDATE of the post's version or a
+single-column primary-key lookup. Reads select plain column rows rather than
+ORM objects.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from .db_models import DBComment, DBPost
+from .filters import NO_FILTER, ListFilter, apply_filter
+from .models import CommentCreate, PostCreate
+from .pagination import paginate
+
+posts_table = DBPost.__table__
+comments_table = DBComment.__table__
+
+
+def insert_returning(db: Session, table, rows: List[dict]) -> List[Row]:
+    """Insert ``rows`` with one multi-VALUES statement and return them in order.
+
+    Asking SQLAlchemy to sort RETURNING by parameter order makes SQLite fall
+    back to one INSERT per row, so sort by the assigned ids instead; ids are
+    allocated in VALUES order within a single statement.
+    """
+    result = db.execute(insert(table).returning(*table.c), rows).all()
+    return sorted(result, key=lambda row: row.id)
+
+
+def create_post(db: Session, post: PostCreate) -> Row:
+    row = db.execute(
+        insert(posts_table).returning(*posts_table.c), post.model_dump()
+    ).one()
+    db.commit()
+    return row
+
+
+def create_posts(db: Session, posts: List[PostCreate]) -> List[Row]:
+    rows = insert_returning(db, posts_table, [post.model_dump() for post in posts])
+    db.commit()
+    return rows
+
+
+def record_comments(db: Session, post_id: int, added: int, at: datetime) -> bool:
+    """Bump the post's version and comment summary; False if it does not exist."""
+    result = db.execute(
+        update(posts_table)
+        .where(posts_table.c.id == post_id)
+        .values(
+            version=posts_table.c.version + added,
+            comment_count=posts_table.c.comment_count + added,
+            last_comment_at=at,
+        )
+    )
+    return result.rowcount > 0
+
+
+def create_comment(db: Session, comment: CommentCreate) -> Optional[Row]:
+    """Insert a comment, or return None if its post does not exist."""
+    now = datetime.utcnow()
+    if not record_comments(db, comment.post_id, 1, now):
+        db.rollback()
+        return None
+    row = db.execute(
+        insert(comments_table).returning(*comments_table.c),
+        {**comment.model_dump(), "created_at": now},
+    ).one()
+    db.commit()
+    return row
+
+
+def existing_post_ids(db: Session, post_ids: Iterable[int]) -> Set[int]:
+    post_ids = set(post_ids)
+    if not post_ids:
+        return set()
+    return set(db.scalars(select(posts_table.c.id).where(posts_table.c.id.in_(post_ids))))
+
+
+def create_comments(db: Session, comments: List[CommentCreate]) -> List[Row]:
+    """Insert comments whose posts are known to exist, updating post summaries."""
+    now = datetime.utcnow()
+    rows = insert_returning(
+        db,
+        comments_table,
+        [{**comment.model_dump(), "created_at": now} for comment in comments],
+    )
+    counts: Dict[int, int] = {}
+    for comment in comments:
+        counts[comment.post_id] = counts.get(comment.post_id, 0) + 1
+    db.execute(
+        update(posts_table)
+        .where(posts_table.c.id == bindparam("post_id"))
+        .values(
+            version=posts_table.c.version + bindparam("added"),
+            comment_count=posts_table.c.comment_count + bindparam("added"),
+            last_comment_at=now,
+        ),
+        [{"post_id": post_id, "added": added} for post_id, added in counts.items()],
+    )
+    db.commit()
+    return rows
+
+
+def get_post(db: Session, post_id: int) -> Optional[Row]:
+    return db.execute(
+        select(*posts_table.c).where(posts_table.c.id == post_id)
+    ).first()
+
+
+def post_version(db: Session, post_id: int) -> Optional[int]:
+    """Return the post's version, or None if it does not exist."""
+    return db.scalar(select(posts_table.c.version).where(posts_table.c.id == post_id))
+
+
+def select_columns(table, names: Optional[Sequence[str]]) -> list:
+    """All of ``table``'s columns, or only ``names``, in table order."""
+    if names is None:
+        return list(table.c)
+    return [column for column in table.c if column.name in names]
+
+
+def list_posts(
+    db: Session,
+    cursor: Optional[str],
+    limit: int,
+    columns: Optional[Sequence[str]] = None,
+    filters: ListFilter = NO_FILTER,
+):
+    query = apply_filter(db.query(*select_columns(posts_table, columns)), DBPost, filters)
+    return paginate(query, DBPost, cursor, limit)
+
+
+def list_post_versions(
+    db: Session, cursor: Optional[str], limit: int, filters: ListFilter = NO_FILTER
+):
+    """Page of ``(id, version, created_at)`` keys, for computing list ETags."""
+    query = db.query(DBPost.id, DBPost.version, DBPost.created_at)
+    return paginate(apply_filter(query, DBPost, filters), DBPost, cursor, limit)
+
+
+def list_comments(
+    db: Session,
+    post_id: int,
+    cursor: Optional[str],
+    limit: int,
+    columns: Optional[Sequence[str]] = None,
+    filters: ListFilter = NO_FILTER,
+):
+    query = db.query(*select_columns(comments_table, columns)).filter(
+        DBComment.post_id == post_id
+    )
+    return paginate(apply_filter(query, DBComment, filters), DBComment, cursor, limit)
+
+
+def comments_after(db: Session, post_id: int, after_id: int, limit: int) -> List[Row]:
+    """Comments of a post with an id above ``after_id``, oldest first."""
+    return db.execute(
+        select(*comments_table.c)
+        .where(comments_table.c.post_id == post_id, comments_table.c.id > after_id)
+        .order_by(comments_table.c.id)
+        .limit(limit)
+    ).all()
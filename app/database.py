@@ -1,15 +1,143 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import itertools
+import math
+import time
+from typing import List, Optional
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./fastapi_app.db"
+from fastapi import Cookie, Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+from .config import Settings, settings
+from .metrics import InstrumentedQueuePool, SlowQueryLog, instrument_engine
+
+
+def engine_options(url: str, config: Settings) -> dict:
+    """Keyword arguments for ``create_engine``/``create_async_engine``."""
+    url = make_url(url)
+    options = {"pool_pre_ping": config.db_pool_pre_ping}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            # In-memory databases use a single-connection pool.
+            return options
+    if config.metrics_enabled and not url.get_dialect().is_async:
+        options["poolclass"] = InstrumentedQueuePool
+    options.update(
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout,
+    )
+    return options
+
+
+def apply_sqlite_pragmas(engine: Engine, config: Settings) -> None:
+    """Run the configured PRAGMAs on every new SQLite connection.
+
+    WAL lets readers proceed while a writer holds the lock, and
+    ``busy_timeout`` makes concurrent writers wait for it instead of failing
+    with "database is locked".
+    """
+    if engine.dialect.name != "sqlite" or not config.sqlite_pragmas:
+        return
+    # The journal mode is stored in the file and can only be set by a writer
+    read_only = engine.url.query.get("mode") == "ro"
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"PRAGMA busy_timeout = {int(config.sqlite_busy_timeout)}")
+            if not read_only:
+                cursor.execute(f"PRAGMA journal_mode = {config.sqlite_journal_mode}")
+            cursor.execute(f"PRAGMA synchronous = {config.sqlite_synchronous}")
+            cursor.execute(f"PRAGMA mmap_size = {int(config.sqlite_mmap_size)}")
+            cursor.execute(f"PRAGMA cache_size = {int(config.sqlite_cache_size)}")
+        finally:
+            cursor.close()
+
+
+def make_engine(config: Settings = settings, url: Optional[str] = None) -> Engine:
+    """Create the application engine from ``config``."""
+    url = url or config.database_url
+    engine = create_engine(url, **engine_options(url, config))
+    apply_sqlite_pragmas(engine, config)
+    if config.metrics_enabled:
+        instrument_engine(engine)
+    if config.slow_query_ms > 0:
+        SlowQueryLog(config.slow_query_ms / 1000).attach(engine)
+    return engine
+
+
+engine = make_engine(settings)
+# Rows are not re-read after commit; the data-access layer uses RETURNING
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+LAST_WRITE_COOKIE = "last_write"
+
+
+def make_replica_engines(config: Settings = settings) -> List[Engine]:
+    """Engines for the comma-separated ``DATABASE_REPLICA_URLS``."""
+    urls = [url.strip() for url in config.database_replica_urls.split(",")]
+    return [make_engine(config, url=url) for url in urls if url]
+
+
+class ReadRouter:
+    """Chooses the session a read-only endpoint uses.
+
+    Reads go round-robin to the replicas, except for a client that wrote less
+    than ``sticky_seconds`` ago: its reads stay on the primary so it sees its
+    own writes before they reach a lagging replica. Without replicas
+    everything uses the primary.
+    """
+
+    def __init__(self, primary: sessionmaker, replicas: List[sessionmaker],
+                 sticky_seconds: float = 5.0):
+        self.primary = primary
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self._next = itertools.count()
+
+    def wrote_recently(self, last_write: Optional[str]) -> bool:
+        try:
+            return time.time() - float(last_write) < self.sticky_seconds
+        except (TypeError, ValueError):
+            return False
+
+    def session(self, last_write: Optional[str] = None) -> Session:
+        if not self.replicas or self.wrote_recently(last_write):
+            return self.primary()
+        db = self.replicas[next(self._next) % len(self.replicas)]()
+        # Lets endpoints keep possibly stale rows out of the response cache
+        db.info["replica"] = True
+        return db
+
+    def mark_write(self, response: Response) -> None:
+        """Pin the client's reads to the primary for ``sticky_seconds``."""
+        if self.replicas:
+            response.set_cookie(
+                LAST_WRITE_COOKIE,
+                f"{time.time():.3f}",
+                max_age=math.ceil(self.sticky_seconds),
+                httponly=True,
+                samesite="lax",
+            )
+
+
+replica_engines = make_replica_engines(settings)
+read_router = ReadRouter(
+    SessionLocal,
+    [
+        sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=replica)
+        for replica in replica_engines
+    ],
+    settings.read_your_writes_seconds,
+)
+
 
 def get_db():
     """Database dependency for FastAPI endpoints."""
@@ -18,3 +146,17 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db(last_write: Optional[str] = Cookie(None)):
+    """Database dependency for read-only endpoints; may be a replica."""
+    db = read_router.session(last_write)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def mark_write(response: Response) -> None:
+    """Dependency for write endpoints; enables read-your-writes."""
+    read_router.mark_write(response)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -13,9 +13,22 @@ class DBPost(Base):
     content = Column(String(5000), nullable=False)
     author = Column(String(50), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Bumped on every new comment; drives ETags without reading comments
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Denormalized comment summary, maintained by crud in the comment's transaction
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_comment_at = Column(DateTime, nullable=True)
     
     comments = relationship("DBComment", back_populates="post", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination order for GET /posts; title and author make it
+        # a covering index for ?view=summary
+        Index("ix_posts_created_at_id_summary", "created_at", "id", "title", "author"),
+        # GET /posts?author=...[&since=...&until=...] in pagination order
+        Index("ix_posts_author_created_at_id", "author", "created_at", "id"),
+    )
+
 
 class DBComment(Base):
     """SQLAlchemy model for Comment table."""
@@ -28,3 +41,9 @@ class DBComment(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     post = relationship("DBPost", back_populates="comments")
+
+    __table_args__ = (
+        # Keyset pagination order for GET /posts/{post_id}/comments; also
+        # serves since/until on a post's comments and the post_id foreign key
+        Index("ix_comments_post_id_created_at_id", "post_id", "created_at", "id"),
+    )
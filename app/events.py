@@ -0,0 +1,149 @@
+"""In-process pub/sub behind ``GET /posts/{post_id}/comments/stream``.
+
+The comment endpoints publish every committed comment to ``comment_broker``.
+Each open stream is a ``Subscription``: a bounded ``asyncio.Queue`` on the
+event loop that serves it. An idle subscriber is one suspended coroutine, a
+queue and a keepalive timer, with no database connection and no polling. A
+publish encodes the comment once and wakes each event loop once, however
+many subscribers the post has.
+
+A reader that falls ``STREAM_QUEUE_SIZE`` events behind has its stream ended
+instead of buffering without bound. ``EventSource`` then reconnects with
+``Last-Event-ID`` and the endpoint replays the missed comments from the
+database. The broker lives in the worker process; with several workers a
+stream only sees comments written through its own worker.
+"""
+import asyncio
+import threading
+import weakref
+from typing import AsyncIterator, Dict, List, Tuple
+
+from .config import Settings, settings
+from .models import Comment
+from .serialization import encode_one
+
+KEEPALIVE = b": keepalive\n\n"
+# Comments replayed per connection; a longer gap ends the stream and the
+# client's reconnect (with the new Last-Event-ID) fetches the next batch
+REPLAY_LIMIT = 500
+
+Event = Tuple[int, bytes]
+
+
+def format_event(comment_id: int, data: bytes) -> bytes:
+    """One ``comment`` event in the ``text/event-stream`` format."""
+    return b"id: %d\nevent: comment\ndata: %s\n\n" % (comment_id, data)
+
+
+class Subscription:
+    """One stream's pending events, consumed on the loop that created it."""
+    __slots__ = ("post_id", "loop", "queue", "overflowed", "__weakref__")
+
+    def __init__(self, post_id: int, max_pending: int):
+        self.post_id = post_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(max_pending)
+        self.overflowed = False
+
+    def push(self, event: Event) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+def _deliver(subscriptions: List[Subscription], event: Event) -> None:
+    for subscription in subscriptions:
+        subscription.push(event)
+
+
+class CommentBroker:
+    """Fan committed comments out to the streams of their post."""
+
+    def __init__(self, max_pending: int = 100, keepalive: float = 15.0):
+        self.max_pending = max_pending
+        self.keepalive = keepalive
+        self._lock = threading.Lock()
+        # Weak, so a stream whose generator never ran cannot leak its entry
+        self._subscriptions: Dict[int, "weakref.WeakSet[Subscription]"] = {}
+        self.published = 0
+
+    def subscribe(self, post_id: int) -> Subscription:
+        """Start buffering the post's comments; call on the serving event loop."""
+        subscription = Subscription(post_id, self.max_pending)
+        with self._lock:
+            self._subscriptions.setdefault(post_id, weakref.WeakSet()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.post_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.post_id]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def publish(self, comment) -> None:
+        """Hand a committed comment to its post's streams; safe from any thread."""
+        with self._lock:
+            subscriptions = self._subscriptions.get(comment.post_id)
+            subscriptions = list(subscriptions) if subscriptions else []
+        if not subscriptions:
+            return
+        event = (comment.id, format_event(comment.id, encode_one(comment, Comment)))
+        by_loop: Dict[asyncio.AbstractEventLoop, List[Subscription]] = {}
+        for subscription in subscriptions:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver, group, event)
+            except RuntimeError:
+                # The loop has closed; its streams are gone
+                pass
+        self.published += 1
+
+    async def stream(
+        self, subscription: Subscription, replay: List[Event], last_id: int = 0
+    ) -> AsyncIterator[bytes]:
+        """Yield the replayed events, then live ones, until the client leaves."""
+        try:
+            for comment_id, data in replay:
+                last_id = comment_id
+                yield format_event(comment_id, data)
+            if len(replay) >= REPLAY_LIMIT:
+                return
+            # Comments committed during the replay arrive from both sides. Live
+            # ones are published from different threads and may arrive out of
+            # order, so only the replayed range is skipped.
+            replayed_through = last_id
+            while not (subscription.overflowed and subscription.queue.empty()):
+                try:
+                    comment_id, event = await asyncio.wait_for(
+                        subscription.queue.get(), self.keepalive
+                    )
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+                    continue
+                if comment_id > replayed_through:
+                    yield event
+        finally:
+            self.unsubscribe(subscription)
+
+
+def make_broker(config: Settings = settings) -> CommentBroker:
+    return CommentBroker(
+        max_pending=config.stream_queue_size,
+        keepalive=config.stream_keepalive_seconds,
+    )
+
+
+comment_broker = make_broker(settings)
+
+
+def get_comment_broker() -> CommentBroker:
+    """Comment broker dependency for FastAPI endpoints."""
+    return comment_broker
@@ -0,0 +1,41 @@
+"""Streaming NDJSON export of whole tables.
+
+Rows are read through a server-side cursor in ``yield_per`` sized partitions
+and written out one partition at a time, so memory use does not depend on the
+table size and the first bytes go out as soon as the first partition is read.
+"""
+from typing import Iterable, Iterator, Type
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .serialization import encode_one
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def iter_partitions(db: Session, table, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list]:
+    """Yield every row of ``table`` in id order, ``batch_size`` rows at a time."""
+    result = db.execute(
+        select(*table.columns)
+        .order_by(table.c.id)
+        .execution_options(yield_per=batch_size)
+    )
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
+
+
+def ndjson_lines(partitions: Iterable[list], schema: Type[BaseModel]) -> Iterator[bytes]:
+    """Serialize each partition of rows with ``schema``, one JSON object per line."""
+    for partition in partitions:
+        yield b"".join(encode_one(row, schema) + b"\n" for row in partition)
+
+
+def iter_ndjson(
+    db: Session, table, schema: Type[BaseModel], batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[bytes]:
+    """Yield ``table`` rows serialized with ``schema``, one JSON object per line."""
+    return ndjson_lines(iter_partitions(db, table, batch_size), schema)
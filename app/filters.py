@@ -0,0 +1,58 @@
+"""Author and time-range filters for the list endpoints.
+
+``GET /posts`` and ``GET /posts/{post_id}/comments`` accept ``author``,
+``since`` (inclusive) and ``until`` (exclusive). Every combination is served
+by an index whose leading columns are the equality filter followed by
+``created_at``, so a filtered page is an index range scan in pagination
+order: ``(author, created_at, id)`` for posts and ``(post_id, created_at,
+id)`` for a post's comments.
+"""
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException, Query
+
+
+class ListFilter(NamedTuple):
+    author: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    @property
+    def active(self) -> bool:
+        return any(value is not None for value in self)
+
+
+NO_FILTER = ListFilter()
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive UTC; convert aware ones to match."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def list_filter(
+    author: Optional[str] = Query(None, max_length=50, description="Exact author name"),
+    since: Optional[datetime] = Query(
+        None, description="Created at or after (ISO 8601, UTC unless an offset is given)"
+    ),
+    until: Optional[datetime] = Query(None, description="Created before (ISO 8601)"),
+) -> ListFilter:
+    """Dependency parsing the filter query parameters."""
+    since, until = as_utc(since), as_utc(until)
+    if since is not None and until is not None and since >= until:
+        raise HTTPException(status_code=400, detail="since must be earlier than until")
+    return ListFilter(author, since, until)
+
+
+def apply_filter(query, model, filters: ListFilter):
+    """Add ``filters`` to a ``Query`` or ``Select`` over ``model``."""
+    if filters.author is not None:
+        query = query.filter(model.author == filters.author)
+    if filters.since is not None:
+        query = query.filter(model.created_at >= filters.since)
+    if filters.until is not None:
+        query = query.filter(model.created_at < filters.until)
+    return query
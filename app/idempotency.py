@@ -0,0 +1,157 @@
+"""Idempotency keys for the single-item create endpoints.
+
+A client that sends ``Idempotency-Key: <unique value>`` with ``POST /posts``
+or ``POST /comments`` can retry the request after a timeout without creating
+a second row. The first request to succeed stores the row it created under
+the key; a retry with the same key and payload gets the same ``201`` body
+back, with ``Idempotent-Replayed: true``, without running any SQL. Requests sharing a key
+are serialized, so a retry that arrives while the original is still running
+waits for it instead of inserting in parallel. Reusing a key for a different
+payload answers ``422``. Failed requests are not stored and can be retried.
+
+Enable it with ``IDEMPOTENCY_BACKEND=memory``. Responses are kept for
+``IDEMPOTENCY_TTL`` seconds in an LRU of at most ``IDEMPOTENCY_MAX_ENTRIES``.
+The store lives in the worker process, so run a single worker with it.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+
+from .config import Settings, settings
+
+MAX_KEY_LENGTH = 255
+
+
+class StoredResult(NamedTuple):
+    fingerprint: str
+    value: Any
+
+
+class IdempotencyStore:
+    """Interface shared by idempotency key stores."""
+    name = "none"
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """Hold ``key`` so concurrent requests using it run one at a time."""
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[StoredResult]:
+        raise NotImplementedError
+
+    def set(self, key: str, response: StoredResult) -> None:
+        raise NotImplementedError
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """In-process LRU of stored results with a TTL, plus per-key locks."""
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 86400.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # key -> [lock, holders]; only keys with a request in flight are kept
+        self._locks: Dict[str, List] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        with self._lock:
+            slot = self._locks.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if not slot[1]:
+                    del self._locks[key]
+
+    def get(self, key: str) -> Optional[StoredResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def set(self, key: str, response: StoredResult) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def make_idempotency_store(config: Settings = settings) -> Optional[IdempotencyStore]:
+    """Build the store selected by ``IDEMPOTENCY_BACKEND``, or None."""
+    if config.idempotency_backend == "memory":
+        return MemoryIdempotencyStore(
+            max_entries=config.idempotency_max_entries, ttl=config.idempotency_ttl
+        )
+    if config.idempotency_backend == "none":
+        return None
+    raise ValueError(f"Unknown IDEMPOTENCY_BACKEND: {config.idempotency_backend!r}")
+
+
+idempotency_store = make_idempotency_store(settings)
+
+
+def get_idempotency_store() -> Optional[IdempotencyStore]:
+    """Idempotency store dependency for FastAPI endpoints."""
+    return idempotency_store
+
+
+def fingerprint(payload: BaseModel) -> str:
+    """Hash of the validated payload, so key reuse for other data is caught."""
+    return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+
+def run_once(
+    store: Optional[IdempotencyStore],
+    scope: str,
+    key: Optional[str],
+    payload: BaseModel,
+    create: Callable[[], Any],
+    response: Response,
+) -> Any:
+    """Call ``create`` at most once per ``(scope, key)``; replay its result after."""
+    if store is None or key is None:
+        return create()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters",
+        )
+    digest = fingerprint(payload)
+    key = f"{scope}:{key}"
+    with store.lock(key):
+        stored = store.get(key)
+        if stored is not None:
+            if stored.fingerprint != digest:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used with a different payload",
+                )
+            response.headers["Idempotent-Replayed"] = "true"
+            return stored.value
+        # Raises on failure, so only successful results are stored
+        value = create()
+        store.set(key, StoredResult(digest, value))
+        return value
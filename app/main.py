@@ -1,70 +1,437 @@
-from fastapi import FastAPI, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List
-from .models import Post, PostCreate, Comment, CommentCreate
-from .database import engine, get_db, Base
-from . import db_models
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="Posts + Comments API")
-
-
-@app.post("/posts", response_model=Post, status_code=201)
-def create_post(post: PostCreate, db: Session = Depends(get_db)):
-    """Create a new post."""
-    db_post = db_models.DBPost(
-        title=post.title,
-        content=post.content,
-        author=post.author
+from contextlib import asynccontextmanager
+
+from fastapi import APIRouter, Body, FastAPI, HTTPException, Depends, Header, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Any, Dict, List, Literal, Optional, Tuple, Type, Union
+from .models import (
+    Post, PostCreate, PostWithComments, Comment, CommentCreate, BulkItemError,
+    PostBulkResult, CommentBulkResult, SearchResult,
+)
+from . import batching, migrate
+from .batching import CommentBatcher, get_comment_batcher
+from .cache import (
+    CacheBackend, NullCache, comments_key, get_cache, pack_entry, post_key, unpack_entry
+)
+from .database import engine, mark_write, replica_engines
+from .events import REPLAY_LIMIT, CommentBroker, get_comment_broker
+from .etag import etag_matches, make_etag, not_modified
+from .config import Settings, settings
+from .export import ndjson_lines
+from .filters import ListFilter, list_filter
+from .idempotency import IdempotencyStore, get_idempotency_store, run_once
+from .metrics import MetricsMiddleware, render_metrics
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from .ratelimit import admit_write
+from .projection import (
+    POST_MUTABLE_FIELDS, Fields, comment_columns, post_columns, requested_fields,
+    response_model,
+)
+from .repository import (
+    Repository, get_read_repository, get_repository, get_stream_repository
+)
+from .serialization import embed, encode_many, encode_one
+
+router = APIRouter()
+
+MAX_BULK_ITEMS = 1000
+# Shed excess writes first, then pin the client's reads to the primary
+WRITE_DEPENDENCIES = [Depends(admit_write), Depends(mark_write)]
+
+
+def json_response(body: bytes, headers: Optional[dict] = None) -> Response:
+    """Wrap an already-serialized JSON body, e.g. one read from the cache."""
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def page_headers(etag: str, next_cursor: Optional[str]) -> dict:
+    headers = {"ETag": etag}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return headers
+
+
+def posts_page_etag(rows, next_cursor: Optional[str], fields: Fields = None) -> str:
+    if fields is not None and not POST_MUTABLE_FIELDS.intersection(fields):
+        # Nothing in the body changes once the posts exist
+        keys = [row.id for row in rows]
+    else:
+        keys = [(row.id, row.version) for row in rows]
+    return make_etag("posts", keys, next_cursor, fields)
+
+
+def fill_cache(
+    cache: CacheBackend, repo: Repository, key: str, post_id: int, version: int,
+    body: bytes, headers: dict,
+) -> None:
+    """Cache a response built from the post at ``version``, unless it is stale.
+
+    Writers delete the keys after committing, so a comment committed while
+    this request was reading has already deleted the key; setting it now
+    would put the old body back. Re-reading the version catches that race.
+    """
+    if isinstance(cache, NullCache):
+        return
+    # A lagging replica would put back the entry a write just deleted
+    if repo.stale_reads or repo.post_version(post_id) != version:
+        return
+    cache.set(key, pack_entry(body, headers))
+
+
+def validate_items(
+    items: List[Dict[str, Any]], schema: Type[BaseModel]
+) -> Tuple[List[BaseModel], List[BulkItemError]]:
+    """Validate bulk items one by one so a bad item does not fail the batch."""
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as exc:
+            errors.append(BulkItemError(
+                index=index,
+                detail=exc.errors(include_url=False, include_context=False),
+            ))
+    return valid, errors
+
+
+@router.post(
+    "/posts", response_model=Post, status_code=201, dependencies=WRITE_DEPENDENCIES
+)
+def create_post(
+    post: PostCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+    repo: Repository = Depends(get_repository),
+    cache: CacheBackend = Depends(get_cache),
+    store: Optional[IdempotencyStore] = Depends(get_idempotency_store),
+):
+    """Create a new post; retries with the same Idempotency-Key replay the first."""
+    def create():
+        db_post = repo.create_post(post)
+        # SQLite reuses the ids of deleted rows, so drop anything cached under it
+        cache.delete(post_key(db_post.id), comments_key(db_post.id))
+        return db_post
+
+    return run_once(store, "posts", idempotency_key, post, create, response)
+
+
+@router.post(
+    "/posts/bulk", response_model=PostBulkResult, status_code=201, dependencies=WRITE_DEPENDENCIES
+)
+def create_posts_bulk(
+    items: List[Dict[str, Any]] = Body(..., max_length=MAX_BULK_ITEMS),
+    repo: Repository = Depends(get_repository),
+    cache: CacheBackend = Depends(get_cache),
+):
+    """Create many posts in one transaction; invalid items are reported."""
+    valid, errors = validate_items(items, PostCreate)
+    created = repo.create_posts([post for _, post in valid]) if valid else []
+    cache.delete(*(key for p in created for key in (post_key(p.id), comments_key(p.id))))
+    return PostBulkResult(
+        created=[Post.model_validate(p) for p in created], errors=errors
     )
-    db.add(db_post)
-    db.commit()
-    db.refresh(db_post)
-    return db_post
 
 
-@app.get("/posts", response_model=List[Post])
-def get_posts(db: Session = Depends(get_db)):
-    """Get all posts."""
-    return db.query(db_models.DBPost).all()
+@router.get("/posts", response_model=List[Post])
+def get_posts(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    view: Literal["full", "summary"] = "full",
+    filters: ListFilter = Depends(list_filter),
+    if_none_match: Optional[str] = Header(None),
+    repo: Repository = Depends(get_read_repository),
+):
+    """Get a page of posts, optionally by author and time range; see X-Next-Cursor."""
+    names = requested_fields(Post, fields, view)
+    if if_none_match:
+        # Compare against the page's (id, version) pairs before loading rows
+        keys, next_cursor = repo.list_post_versions(cursor, limit, filters)
+        etag = posts_page_etag(keys, next_cursor, names)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
 
+    posts, next_cursor = repo.list_posts(cursor, limit, post_columns(names), filters)
+    return json_response(
+        encode_many(posts, response_model(Post, names)),
+        page_headers(posts_page_etag(posts, next_cursor, names), next_cursor),
+    )
 
-@app.get("/posts/{post_id}", response_model=Post)
-def get_post(post_id: int, db: Session = Depends(get_db)):
-    """Get a specific post by ID."""
-    db_post = db.query(db_models.DBPost).filter(db_models.DBPost.id == post_id).first()
+
+def post_with_comments(repo: Repository, post_id: int, if_none_match: Optional[str]):
+    """The post with its first page of comments: two indexed lookups, no join.
+
+    A join would repeat the post's columns on every comment row, and eager
+    loading the relationship cannot stop after one page.
+    """
+    if if_none_match:
+        version = repo.post_version(post_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+        etag = make_etag("post", post_id, version, "comments")
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    db_post = repo.get_post(post_id)
     if not db_post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return db_post
+    # The post's row already proved it exists; no second lookup for the 404
+    comments, next_cursor = repo.list_comments(post_id, None, DEFAULT_PAGE_SIZE)
+    body = embed(encode_one(db_post, Post), "comments", encode_many(comments, Comment))
+    etag = make_etag("post", post_id, db_post.version, "comments")
+    return json_response(body, page_headers(etag, next_cursor))
+
 
+@router.get("/posts/{post_id}", response_model=Union[PostWithComments, Post])
+def get_post(
+    post_id: int,
+    include: Optional[Literal["comments"]] = Query(
+        None, description="Embed the first page of comments; the next page's cursor "
+                          "is in X-Next-Cursor"
+    ),
+    if_none_match: Optional[str] = Header(None),
+    repo: Repository = Depends(get_read_repository),
+    cache: CacheBackend = Depends(get_cache),
+):
+    """Get a specific post by ID."""
+    if include == "comments":
+        return post_with_comments(repo, post_id, if_none_match)
+
+    key = post_key(post_id)
+    cached = cache.get(key)
+    if cached is not None:
+        body, headers = unpack_entry(cached)
+        if etag_matches(if_none_match, headers["ETag"]):
+            return not_modified(headers["ETag"])
+        return json_response(body, headers)
 
-@app.post("/comments", response_model=Comment, status_code=201)
-def create_comment(comment: CommentCreate, db: Session = Depends(get_db)):
-    """Create a new comment on a post."""
-    # Check if post exists
-    db_post = db.query(db_models.DBPost).filter(db_models.DBPost.id == comment.post_id).first()
+    if if_none_match:
+        version = repo.post_version(post_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+        etag = make_etag("post", post_id, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    db_post = repo.get_post(post_id)
     if not db_post:
         raise HTTPException(status_code=404, detail="Post not found")
-    
-    db_comment = db_models.DBComment(
-        post_id=comment.post_id,
-        content=comment.content,
-        author=comment.author
+    body = encode_one(db_post, Post)
+    headers = {"ETag": make_etag("post", post_id, db_post.version)}
+    fill_cache(cache, repo, key, post_id, db_post.version, body, headers)
+    return json_response(body, headers)
+
+
+@router.post(
+    "/comments", response_model=Comment, status_code=201, dependencies=WRITE_DEPENDENCIES
+)
+def create_comment(
+    comment: CommentCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+    repo: Repository = Depends(get_repository),
+    cache: CacheBackend = Depends(get_cache),
+    batcher: Optional[CommentBatcher] = Depends(get_comment_batcher),
+    broker: CommentBroker = Depends(get_comment_broker),
+    store: Optional[IdempotencyStore] = Depends(get_idempotency_store),
+):
+    """Create a new comment on a post; Idempotency-Key works as for posts."""
+    def create():
+        if batcher is not None:
+            # Wait for the group commit that includes this comment
+            db_comment = batcher.write(comment)
+        else:
+            db_comment = repo.create_comment(comment)
+        if db_comment is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+        cache.delete(post_key(comment.post_id), comments_key(comment.post_id))
+        broker.publish(db_comment)
+        return db_comment
+
+    return run_once(store, "comments", idempotency_key, comment, create, response)
+
+
+@router.post(
+    "/comments/bulk", response_model=CommentBulkResult, status_code=201, dependencies=WRITE_DEPENDENCIES
+)
+def create_comments_bulk(
+    items: List[Dict[str, Any]] = Body(..., max_length=MAX_BULK_ITEMS),
+    repo: Repository = Depends(get_repository),
+    cache: CacheBackend = Depends(get_cache),
+    broker: CommentBroker = Depends(get_comment_broker),
+):
+    """Create many comments in one transaction; invalid items are reported."""
+    valid, errors = validate_items(items, CommentCreate)
+
+    # One IN query checks every referenced post
+    existing = repo.existing_post_ids((comment.post_id for _, comment in valid))
+    insertable = []
+    for index, comment in valid:
+        if comment.post_id in existing:
+            insertable.append(comment)
+        else:
+            errors.append(BulkItemError(index=index, detail="Post not found"))
+    errors.sort(key=lambda error: error.index)
+
+    created = repo.create_comments(insertable) if insertable else []
+    post_ids = {comment.post_id for comment in insertable}
+    cache.delete(*(key for pid in post_ids for key in (post_key(pid), comments_key(pid))))
+    for db_comment in created:
+        broker.publish(db_comment)
+    return CommentBulkResult(
+        created=[Comment.model_validate(c) for c in created], errors=errors
+    )
+
+
+@router.get("/posts/{post_id}/comments", response_model=List[Comment])
+def get_comments(
+    post_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    view: Literal["full", "summary"] = "full",
+    filters: ListFilter = Depends(list_filter),
+    if_none_match: Optional[str] = Header(None),
+    repo: Repository = Depends(get_read_repository),
+    cache: CacheBackend = Depends(get_cache),
+):
+    """Get a page of a post's comments, optionally filtered; see X-Next-Cursor."""
+    names = requested_fields(Comment, fields, view)
+    # Only the first default-sized full page is cached; it is what hot posts serve
+    cacheable = (
+        cursor is None and limit == DEFAULT_PAGE_SIZE and names is None and not filters.active
+    )
+    if cacheable:
+        cached = cache.get(comments_key(post_id))
+        if cached is not None:
+            body, headers = unpack_entry(cached)
+            if etag_matches(if_none_match, headers["ETag"]):
+                return not_modified(headers["ETag"])
+            return json_response(body, headers)
+
+    # Check if post exists; its version changes with every new comment
+    version = repo.post_version(post_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    etag = make_etag("comments", post_id, version, cursor, limit, names, filters)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    comments, next_cursor = repo.list_comments(
+        post_id, cursor, limit, comment_columns(names), filters
     )
-    db.add(db_comment)
-    db.commit()
-    db.refresh(db_comment)
-    return db_comment
+    headers = page_headers(etag, next_cursor)
+    body = encode_many(comments, response_model(Comment, names))
+    if cacheable:
+        fill_cache(cache, repo, comments_key(post_id), post_id, version, body, headers)
+    return json_response(body, headers)
 
 
-@app.get("/posts/{post_id}/comments", response_model=List[Comment])
-def get_comments(post_id: int, db: Session = Depends(get_db)):
-    """Get all comments for a specific post."""
-    # Check if post exists
-    db_post = db.query(db_models.DBPost).filter(db_models.DBPost.id == post_id).first()
-    if not db_post:
+def replay_comments(repo: Repository, post_id: int, after_id: int) -> list:
+    return [
+        (row.id, encode_one(row, Comment))
+        for row in repo.comments_after(post_id, after_id, REPLAY_LIMIT)
+    ]
+
+
+@router.get("/posts/{post_id}/comments/stream")
+async def stream_comments(
+    post_id: int,
+    last_event_id: Optional[int] = Header(None),
+    repo: Repository = Depends(get_stream_repository),
+    broker: CommentBroker = Depends(get_comment_broker),
+):
+    """Stream new comments on a post as server-sent events.
+
+    Reconnecting with ``Last-Event-ID`` first replays the comments missed
+    since that id.
+    """
+    # Subscribe before reading so a comment committed in between is not lost
+    subscription = broker.subscribe(post_id)
+    if await run_in_threadpool(repo.post_version, post_id) is None:
+        broker.unsubscribe(subscription)
         raise HTTPException(status_code=404, detail="Post not found")
-    
-    return db.query(db_models.DBComment).filter(db_models.DBComment.post_id == post_id).all()
+    replay = []
+    if last_event_id is not None:
+        replay = await run_in_threadpool(replay_comments, repo, post_id, last_event_id)
+    return StreamingResponse(
+        broker.stream(subscription, replay, last_event_id or 0),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/search", response_model=List[SearchResult])
+def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    repo: Repository = Depends(get_read_repository),
+):
+    """Search posts and comments, best matches first."""
+    results, next_cursor = repo.search(q, cursor, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return results
+
+
+@router.get("/cache/stats")
+def get_cache_stats(cache: CacheBackend = Depends(get_cache)):
+    """Get hit, miss and eviction counters of the response cache."""
+    return cache.info()
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics(cache: CacheBackend = Depends(get_cache)):
+    """Get request, SQL and pool metrics in Prometheus text format."""
+    return PlainTextResponse(
+        render_metrics(cache.info()), media_type="text/plain; version=0.0.4"
+    )
+
+
+@router.get("/export/posts.ndjson")
+def export_posts(repo: Repository = Depends(get_read_repository)):
+    """Stream every post as newline-delimited JSON."""
+    return StreamingResponse(
+        ndjson_lines(repo.iter_posts(), Post),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/export/comments.ndjson")
+def export_comments(repo: Repository = Depends(get_read_repository)):
+    """Stream every comment as newline-delimited JSON."""
+    return StreamingResponse(
+        ndjson_lines(repo.iter_comments(), Comment),
+        media_type="application/x-ndjson",
+    )
+
+
+def create_app(config: Settings = settings) -> FastAPI:
+    """Build the application.
+
+    Creating it runs no DDL: the schema is applied by ``python -m app.migrate``
+    (or ``python -m app.serve``) once per deployment, or in the lifespan when
+    ``MIGRATE_ON_STARTUP`` is set.
+    """
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if config.migrate_on_startup and config.storage_backend == "sqlalchemy":
+            await run_in_threadpool(migrate.upgrade, config.database_url)
+        yield
+        if batching.comment_batcher is not None:
+            await run_in_threadpool(batching.comment_batcher.close)
+        engine.dispose()
+        for replica in replica_engines:
+            replica.dispose()
+
+    app = FastAPI(title="Posts + Comments API", lifespan=lifespan)
+    if config.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+    app.include_router(router)
+    return app
+
+
+app = create_app()
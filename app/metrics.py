@@ -0,0 +1,285 @@
+"""Per-request timing, SQL instrumentation and Prometheus metrics.
+
+``MetricsMiddleware`` opens a ``RequestStats`` for every HTTP request. The
+engine hooks installed by ``instrument_engine`` add each SQL statement's
+duration and the time spent waiting for a pooled connection to it, and the
+serializer records validation and encoding time via ``timed``. The totals
+go into a ``Server-Timing`` header when the response starts and into the
+process-wide histograms served on ``/metrics`` (Prometheus text format) when
+it ends.
+
+``SlowQueryLog`` logs every statement slower than ``SLOW_QUERY_MS`` to the
+``app.slow_query`` logger, with its bound parameters and the route of the
+request that ran it.
+"""
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestStats:
+    """Counters for the request currently being served."""
+    __slots__ = ("sql_count", "sql_time", "pool_wait", "phases", "scope")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.pool_wait = 0.0
+        self.phases: Dict[str, float] = {}
+        # The router adds the matched route to the ASGI scope
+        self.scope = scope
+
+    @property
+    def route(self) -> str:
+        scope = self.scope or {}
+        path = getattr(scope.get("route"), "path", "unmatched")
+        return f"{scope.get('method', '-')} {path}"
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+class timed:
+    """Add the time spent in the block to ``phase`` of the current request."""
+    __slots__ = ("phase", "stats", "start")
+
+    def __init__(self, phase: str):
+        self.phase = phase
+        self.stats = _current.get()
+
+    def __enter__(self):
+        if self.stats is not None:
+            self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        stats = self.stats
+        if stats is not None:
+            elapsed = time.perf_counter() - self.start
+            stats.phases[self.phase] = stats.phases.get(self.phase, 0.0) + elapsed
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Prometheus histogram with fixed buckets, keyed by label values."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # one slot per bucket plus +Inf, then sum
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            for label_values, series in items:
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), series):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    labels = _labels(self.labels, label_values, 'le="%s"' % le)
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labels, label_values)} {series[-1]}")
+                lines.append(f"{self.name}_count{_labels(self.labels, label_values)} {cumulative}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route", "status"),
+)
+REQUEST_SQL_STATEMENTS = Histogram(
+    "http_request_sql_statements", "SQL statements executed per request.",
+    ("route",), COUNT_BUCKETS,
+)
+REQUEST_SQL_DURATION = Histogram(
+    "http_request_sql_duration_seconds", "Time spent executing SQL per request.",
+    ("route",),
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.",
+)
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_SQL_STATEMENTS, REQUEST_SQL_DURATION, POOL_CHECKOUT_WAIT)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            waited = time.perf_counter() - start
+            POOL_CHECKOUT_WAIT.observe(waited)
+            stats = _current.get()
+            if stats is not None:
+                stats.pool_wait += waited
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_time += time.perf_counter() - context._metrics_start
+
+
+def instrument_engine(engine) -> None:
+    """Attach the SQL timing hooks to ``engine`` (idempotent)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SlowQueryLog:
+    """Log statements slower than ``threshold`` seconds on the engines it is attached to.
+
+    Each record carries the duration, the originating route (``-`` outside a
+    request, e.g. the comment batcher's thread), the statement and its bound
+    parameters, cut to ``max_param_chars``.
+    """
+
+    def __init__(self, threshold: float, logger: logging.Logger = None,
+                 max_param_chars: int = 1000):
+        self.threshold = threshold
+        self.logger = logger or logging.getLogger("app.slow_query")
+        self.max_param_chars = max_param_chars
+
+    def attach(self, engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def detach(self, engine) -> None:
+        event.remove(engine, "before_cursor_execute", self._before)
+        event.remove(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_start = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._slow_query_start
+        if elapsed < self.threshold:
+            return
+        stats = _current.get()
+        params = repr(parameters)
+        if len(params) > self.max_param_chars:
+            params = params[:self.max_param_chars] + "..."
+        self.logger.warning(
+            "slow query %.1f ms route=%s statement=%s parameters=%s",
+            elapsed * 1000,
+            stats.route if stats is not None else "-",
+            " ".join(statement.split()),
+            params,
+            extra={"duration_ms": elapsed * 1000, "statement": statement},
+        )
+
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    parts = [f'sql;dur={stats.sql_time * 1000:.3f};desc="{stats.sql_count} queries"']
+    if stats.pool_wait:
+        parts.append(f"pool;dur={stats.pool_wait * 1000:.3f}")
+    for phase, seconds in stats.phases.items():
+        parts.append(f"{phase};dur={seconds * 1000:.3f}")
+    parts.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency and SQL usage."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    server_timing(stats, time.perf_counter() - start).encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start, scope["method"], path, str(status[0])
+            )
+            REQUEST_SQL_STATEMENTS.observe(stats.sql_count, path)
+            REQUEST_SQL_DURATION.observe(stats.sql_time, path)
+
+
+def render_metrics(cache_info: Optional[dict] = None) -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    if cache_info is not None:
+        backend = cache_info.get("backend", "none")
+        for counter in ("hits", "misses", "evictions"):
+            name = f"cache_{counter}_total"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f'{name}{{backend="{_escape(backend)}"}} {cache_info.get(counter, 0)}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,107 @@
+"""Schema migrations.
+
+The schema is managed by Alembic revisions in ``migrations/``. Apply them
+once per database before starting the app, not once per worker::
+
+    python -m app.migrate                 # upgrade to the latest revision
+    python -m app.migrate current
+    python -m app.migrate downgrade base
+
+Databases created by the old import-time ``create_all`` already have the
+tables but no ``alembic_version``; ``upgrade`` stamps them with the initial
+revision, which is the original schema, and then applies every later
+revision. Those skip columns and indexes that ``create_all`` already made
+and fill in the data the new ones need.
+"""
+import argparse
+from pathlib import Path
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+
+from . import db_models  # noqa: F401  registers the tables on Base.metadata
+from .config import settings
+from .database import Base, make_engine
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INITIAL_REVISION = "0001"
+
+
+def include_name(name: Optional[str], type_: str, parent_names) -> bool:
+    """Leave the search index and its FTS5 shadow tables to ``app.search``."""
+    if type_ == "table":
+        return name in Base.metadata.tables
+    return True
+
+
+def alembic_config(url: Optional[str] = None) -> Config:
+    config = Config(str(REPO_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(REPO_ROOT / "migrations"))
+    # ConfigParser interpolates "%", which URL-encoded passwords contain
+    config.set_main_option("sqlalchemy.url", (url or settings.database_url).replace("%", "%%"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def _run(url: Optional[str], fn) -> None:
+    url = url or settings.database_url
+    # make_engine applies the pragmas, so WAL is switched on before any worker starts
+    engine = make_engine(settings, url=url)
+    try:
+        with engine.begin() as conn:
+            config = alembic_config(url)
+            config.attributes["connection"] = conn
+            fn(conn, config)
+    finally:
+        engine.dispose()
+
+
+def upgrade(url: Optional[str] = None, revision: str = "head") -> None:
+    """Bring the database at ``url`` (default ``DATABASE_URL``) to ``revision``."""
+    def apply(conn, config):
+        tables = inspect(conn)
+        if tables.has_table("posts") and not tables.has_table("alembic_version"):
+            command.stamp(config, INITIAL_REVISION)
+        command.upgrade(config, revision)
+
+    _run(url, apply)
+
+
+def downgrade(url: Optional[str] = None, revision: str = "-1") -> None:
+    _run(url, lambda conn, config: command.downgrade(config, revision))
+
+
+def current_revision(url: Optional[str] = None) -> Optional[str]:
+    """The revision the database is at, or None if it was never migrated."""
+    revision = []
+    _run(url, lambda conn, config: revision.append(
+        MigrationContext.configure(conn).get_current_revision()
+    ))
+    return revision[0]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.migrate")
+    parser.add_argument("command", nargs="?", default="upgrade",
+                        choices=["upgrade", "downgrade", "current"])
+    parser.add_argument("revision", nargs="?")
+    parser.add_argument("--url", help="database URL (default: DATABASE_URL)")
+    args = parser.parse_args(argv)
+
+    if args.command == "upgrade":
+        upgrade(args.url, args.revision or "head")
+    elif args.command == "downgrade":
+        downgrade(args.url, args.revision or "-1")
+    print(f"{current_revision(args.url) or 'base'} (head: {head_revision()})")
+
+
+if __name__ == "__main__":
+    main()
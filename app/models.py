@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import Optional
+from typing import Any, List, Literal, Optional
 from datetime import datetime
 
 
@@ -29,6 +29,8 @@ class Post(PostBase):
     """Schema for Post response."""
     id: int
     created_at: datetime
+    comment_count: int = 0
+    last_comment_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -61,3 +63,35 @@ class Comment(CommentBase):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PostWithComments(Post):
+    """Schema for a Post with the first page of its comments embedded."""
+    comments: List[Comment]
+
+
+class BulkItemError(BaseModel):
+    """Why one item of a bulk request was rejected."""
+    index: int
+    detail: Any
+
+
+class PostBulkResult(BaseModel):
+    """Schema for a bulk Post creation response."""
+    created: List[Post]
+    errors: List[BulkItemError]
+
+
+class CommentBulkResult(BaseModel):
+    """Schema for a bulk Comment creation response."""
+    created: List[Comment]
+    errors: List[BulkItemError]
+
+
+class SearchResult(BaseModel):
+    """Schema for one full-text search hit."""
+    kind: Literal["post", "comment"]
+    id: int
+    post_id: int
+    rank: float
+    snippet: str
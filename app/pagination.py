@@ -0,0 +1,76 @@
+"""Opaque keyset cursors for the list endpoints.
+
+Pages are ordered by ``(created_at, id)`` and resumed with a row-value
+comparison against the last row of the previous page, so every page is an
+index range scan instead of an OFFSET walk.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_token(values: list) -> str:
+    """Encode a list of JSON-serializable sort key values as an opaque cursor."""
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_token(cursor: str) -> list:
+    """Decode a cursor produced by ``encode_token``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode the sort key of the last row on a page into an opaque cursor."""
+    return encode_token([created_at.isoformat(), row_id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by ``encode_cursor``."""
+    try:
+        created_at, row_id = decode_token(cursor)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset(query, model, cursor: Optional[str], limit: int):
+    """Restrict a ``Query`` or ``Select`` to the page after ``cursor``.
+
+    One extra row is requested so ``split_page`` can tell whether another
+    page follows.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(model.created_at, model.id) > tuple_(created_at, row_id)
+        )
+    return query.order_by(model.created_at, model.id).limit(limit + 1)
+
+
+def split_page(rows, limit: int):
+    """Return ``(rows, next_cursor)`` from the result of a ``keyset`` query."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+def paginate(query, model, cursor: Optional[str], limit: int):
+    """Return ``(rows, next_cursor)`` for one page of ``query``."""
+    return split_page(keyset(query, model, cursor, limit).all(), limit)
@@ -0,0 +1,81 @@
+"""Sparse fieldsets for the list endpoints.
+
+``GET /posts`` and ``GET /posts/{post_id}/comments`` accept
+``fields=title,author`` or ``view=summary``. Only the requested columns, plus
+the ``(created_at, id)`` keyset columns, are selected, and the body is
+encoded with a response model holding just those fields. ``id`` is always
+returned. The posts pagination index also covers ``title`` and ``author``,
+so a summary page is read from the index alone and never touches the
+``content`` column.
+"""
+from functools import lru_cache
+from typing import Optional, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ConfigDict, create_model
+
+from .models import Comment, Post
+
+Fields = Optional[Tuple[str, ...]]
+
+SUMMARY_FIELDS = {
+    Post: ("id", "title", "author", "created_at"),
+    Comment: ("id", "post_id", "author", "created_at"),
+}
+KEYSET_COLUMNS = ("id", "created_at")
+# Post fields that change after creation; ``version`` is bumped with them
+POST_MUTABLE_FIELDS = frozenset({"comment_count", "last_comment_at"})
+
+
+def requested_fields(schema: Type[BaseModel], fields: Optional[str], view: str) -> Fields:
+    """Fields to return in ``schema``'s order, or None for the whole model."""
+    if fields is not None and view != "full":
+        raise HTTPException(status_code=400, detail="Use either fields or view, not both")
+    if view == "summary":
+        names = set(SUMMARY_FIELDS[schema])
+    elif fields is not None:
+        names = {name.strip() for name in fields.split(",") if name.strip()}
+        if not names:
+            raise HTTPException(status_code=400, detail="fields must name at least one field")
+        unknown = sorted(names - set(schema.model_fields))
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}; "
+                       f"choose from {', '.join(schema.model_fields)}",
+            )
+        names.add("id")
+    else:
+        return None
+    if names == set(schema.model_fields):
+        return None
+    return tuple(name for name in schema.model_fields if name in names)
+
+
+@lru_cache(maxsize=None)
+def projected_model(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """A response model with only ``fields`` of ``schema``."""
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name])
+           for name in fields},
+    )
+
+
+def response_model(schema: Type[BaseModel], fields: Fields) -> Type[BaseModel]:
+    return schema if fields is None else projected_model(schema, fields)
+
+
+def post_columns(fields: Fields) -> Fields:
+    """Post columns to select for ``fields``; ``version`` only when it matters."""
+    if fields is None:
+        return None
+    extra = ("version",) if POST_MUTABLE_FIELDS.intersection(fields) else ()
+    return tuple(dict.fromkeys(fields + KEYSET_COLUMNS + extra))
+
+
+def comment_columns(fields: Fields) -> Fields:
+    if fields is None:
+        return None
+    return tuple(dict.fromkeys(fields + KEYSET_COLUMNS))
@@ -0,0 +1,201 @@
+"""Admission control for the write endpoints.
+
+Two checks run before a write is handed to the threadpool:
+
+- **Rate limiting** - a token bucket per client (``RATE_LIMIT_PER_SECOND``
+  refill, ``RATE_LIMIT_BURST`` capacity). An empty bucket answers ``429``
+  with ``Retry-After``. ``RATE_LIMIT_BACKEND=memory`` keeps the buckets in
+  the process in an LRU of at most ``RATE_LIMIT_MAX_CLIENTS`` entries, so
+  lookups are O(1) and the least recently seen clients are evicted first.
+  ``redis`` shares them between workers via one atomic script per request.
+- **Concurrency limiting** - at most ``WRITE_CONCURRENCY_LIMIT`` writes run
+  at once per process. The next one is rejected with ``503`` immediately
+  instead of queueing for a thread and a SQLite connection.
+
+Both are off by default. The check is an ``async`` dependency, so a
+rejected request never takes a threadpool slot; only the Redis round trip
+is moved to the threadpool, to keep it off the event loop.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+
+from .config import Settings, settings
+
+
+class RateLimiter:
+    """Interface shared by rate limiter backends."""
+    name = "none"
+    # Whether acquire() does I/O and must not run on the event loop
+    blocking = False
+
+    def acquire(self, key: str) -> float:
+        """Take a token for ``key``: 0 if allowed, else seconds until one is free."""
+        raise NotImplementedError
+
+
+class MemoryRateLimiter(RateLimiter):
+    """Token buckets in an LRU bounded by ``max_clients``."""
+    name = "memory"
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 100000,
+                 clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (tokens, time of last update), least recently seen first
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def acquire(self, key: str) -> float:
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = self.burst
+                if len(self._buckets) >= self.max_clients:
+                    # The longest-idle client; its bucket has most likely refilled
+                    self._buckets.popitem(last=False)
+            else:
+                tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                self._buckets.move_to_end(key)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Refill, take one token if there is one, and let idle buckets expire once full
+TOKEN_BUCKET_SCRIPT = """
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    """Token buckets shared by every worker through a Redis server."""
+    name = "redis"
+    blocking = True
+
+    def __init__(self, client, rate: float, burst: float, prefix: str = "fastapi:rate:"):
+        self.rate = rate
+        self.burst = burst
+        self.prefix = prefix
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def acquire(self, key: str) -> float:
+        wait = self._script(keys=[self.prefix + key], args=[self.rate, self.burst, time.time()])
+        return float(wait)
+
+
+class ConcurrencyLimiter:
+    """Non-blocking counter of the writes in flight."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._slots = threading.BoundedSemaphore(limit)
+
+    def try_acquire(self) -> bool:
+        return self._slots.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._slots.release()
+
+
+def make_rate_limiter(config: Settings = settings) -> Optional[RateLimiter]:
+    """Build the rate limiter selected by ``RATE_LIMIT_BACKEND``, or None."""
+    if config.rate_limit_backend == "none":
+        return None
+    if config.rate_limit_backend == "memory":
+        return MemoryRateLimiter(
+            config.rate_limit_per_second, config.rate_limit_burst, config.rate_limit_max_clients
+        )
+    if config.rate_limit_backend == "redis":
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "RATE_LIMIT_BACKEND=redis requires the 'redis' package"
+            ) from exc
+        return RedisRateLimiter(
+            redis.Redis.from_url(config.redis_url),
+            config.rate_limit_per_second,
+            config.rate_limit_burst,
+        )
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {config.rate_limit_backend!r}")
+
+
+def make_write_limiter(config: Settings = settings) -> Optional[ConcurrencyLimiter]:
+    if config.write_concurrency_limit <= 0:
+        return None
+    return ConcurrencyLimiter(config.write_concurrency_limit)
+
+
+rate_limiter = make_rate_limiter(settings)
+write_limiter = make_write_limiter(settings)
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Rate limiter dependency for FastAPI endpoints."""
+    return rate_limiter
+
+
+def get_write_limiter() -> Optional[ConcurrencyLimiter]:
+    """Write concurrency limiter dependency for FastAPI endpoints."""
+    return write_limiter
+
+
+def client_key(request: Request) -> str:
+    """The client a request is charged to; behind a proxy run uvicorn --proxy-headers."""
+    return request.client.host if request.client else "unknown"
+
+
+async def admit_write(
+    request: Request,
+    limiter: Optional[RateLimiter] = Depends(get_rate_limiter),
+    slots: Optional[ConcurrencyLimiter] = Depends(get_write_limiter),
+):
+    """Dependency for write endpoints: shed the request or hold a write slot."""
+    if limiter is not None:
+        key = client_key(request)
+        if limiter.blocking:
+            wait = await run_in_threadpool(limiter.acquire, key)
+        else:
+            wait = limiter.acquire(key)
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+    if slots is None:
+        yield
+        return
+    if not slots.try_acquire():
+        raise HTTPException(
+            status_code=503,
+            detail="Too many writes in progress",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        yield
+    finally:
+        slots.release()
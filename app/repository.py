@@ -0,0 +1,433 @@
+"""Storage backends behind the API endpoints.
+
+``SqlRepository`` wraps ``app.crud`` and the search index around one request's
+session. ``MemoryRepository`` keeps everything in process: dicts by id, a
+per-post index of comment keys and a sorted index of post keys, all guarded by
+one lock, so every lookup is O(1) and every page O(log n + limit) with no I/O
+at all. Both return rows with the same columns, which the serializer, ETag and
+pagination helpers consume unchanged.
+
+Select the backend with ``STORAGE_BACKEND=sqlalchemy`` (default) or
+``STORAGE_BACKEND=memory``. The memory store lives in the worker process: run
+a single worker and expect it to be empty after a restart.
+"""
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from itertools import islice
+from typing import (
+    Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+)
+
+from fastapi import Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from . import crud
+from .config import Settings, settings
+from .database import get_db, get_read_db
+from .export import EXPORT_BATCH_SIZE, iter_partitions
+from .filters import NO_FILTER, ListFilter
+from .models import CommentCreate, PostCreate, SearchResult
+from .pagination import decode_cursor, decode_token, encode_token, split_page
+from .search import SearchIndex, get_search_index, query_terms
+
+Page = Tuple[list, Optional[str]]
+
+
+class PostRecord(NamedTuple):
+    """A post row; fields in the column order of ``posts``."""
+    id: int
+    title: str
+    content: str
+    author: Optional[str]
+    created_at: datetime
+    version: int = 1
+    comment_count: int = 0
+    last_comment_at: Optional[datetime] = None
+
+
+class CommentRecord(NamedTuple):
+    """A comment row; fields in the column order of ``comments``."""
+    id: int
+    post_id: int
+    content: str
+    author: Optional[str]
+    created_at: datetime
+
+
+class Repository:
+    """Interface shared by storage backends."""
+    name = "none"
+    # True when reads may lag behind the latest writes (a replica session)
+    stale_reads = False
+
+    def create_post(self, post: PostCreate):
+        raise NotImplementedError
+
+    def create_posts(self, posts: List[PostCreate]) -> list:
+        raise NotImplementedError
+
+    def create_comment(self, comment: CommentCreate):
+        """Insert a comment, or return None if its post does not exist."""
+        raise NotImplementedError
+
+    def existing_post_ids(self, post_ids: Iterable[int]) -> Set[int]:
+        raise NotImplementedError
+
+    def create_comments(self, comments: List[CommentCreate]) -> list:
+        """Insert comments whose posts are known to exist."""
+        raise NotImplementedError
+
+    def get_post(self, post_id: int):
+        raise NotImplementedError
+
+    def post_version(self, post_id: int) -> Optional[int]:
+        """Return the post's version, or None if it does not exist."""
+        raise NotImplementedError
+
+    def list_posts(
+        self,
+        cursor: Optional[str],
+        limit: int,
+        columns: Optional[Sequence[str]] = None,
+        filters: ListFilter = NO_FILTER,
+    ) -> Page:
+        """Page of posts; with ``columns``, rows need not carry any others."""
+        raise NotImplementedError
+
+    def list_post_versions(
+        self, cursor: Optional[str], limit: int, filters: ListFilter = NO_FILTER
+    ) -> Page:
+        """Page of rows with at least ``id``, ``version`` and ``created_at``."""
+        raise NotImplementedError
+
+    def list_comments(
+        self,
+        post_id: int,
+        cursor: Optional[str],
+        limit: int,
+        columns: Optional[Sequence[str]] = None,
+        filters: ListFilter = NO_FILTER,
+    ) -> Page:
+        """Page of a post's comments; ``columns`` as for ``list_posts``."""
+        raise NotImplementedError
+
+    def comments_after(self, post_id: int, after_id: int, limit: int) -> list:
+        """Comments of a post with an id above ``after_id``, oldest first."""
+        raise NotImplementedError
+
+    def search(
+        self, q: str, cursor: Optional[str], limit: int
+    ) -> Tuple[List[SearchResult], Optional[str]]:
+        raise NotImplementedError
+
+    def iter_posts(self, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list]:
+        """Yield every post in id order, ``batch_size`` rows at a time."""
+        raise NotImplementedError
+
+    def iter_comments(self, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list]:
+        """Yield every comment in id order, ``batch_size`` rows at a time."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release whatever the repository holds; request-scoped ones only."""
+
+
+class SqlRepository(Repository):
+    """SQLAlchemy backend bound to one request's session."""
+    name = "sqlalchemy"
+
+    def __init__(self, db: Session, index: SearchIndex):
+        self.db = db
+        self.index = index
+
+    @property
+    def stale_reads(self) -> bool:
+        return self.db.info.get("replica", False)
+
+    def create_post(self, post):
+        return crud.create_post(self.db, post)
+
+    def create_posts(self, posts):
+        return crud.create_posts(self.db, posts)
+
+    def create_comment(self, comment):
+        return crud.create_comment(self.db, comment)
+
+    def existing_post_ids(self, post_ids):
+        return crud.existing_post_ids(self.db, post_ids)
+
+    def create_comments(self, comments):
+        return crud.create_comments(self.db, comments)
+
+    def get_post(self, post_id):
+        return crud.get_post(self.db, post_id)
+
+    def post_version(self, post_id):
+        return crud.post_version(self.db, post_id)
+
+    def list_posts(self, cursor, limit, columns=None, filters=NO_FILTER):
+        return crud.list_posts(self.db, cursor, limit, columns, filters)
+
+    def list_post_versions(self, cursor, limit, filters=NO_FILTER):
+        return crud.list_post_versions(self.db, cursor, limit, filters)
+
+    def list_comments(self, post_id, cursor, limit, columns=None, filters=NO_FILTER):
+        return crud.list_comments(self.db, post_id, cursor, limit, columns, filters)
+
+    def comments_after(self, post_id, after_id, limit):
+        return crud.comments_after(self.db, post_id, after_id, limit)
+
+    def search(self, q, cursor, limit):
+        return self.index.search(self.db, q, cursor, limit)
+
+    def iter_posts(self, batch_size=EXPORT_BATCH_SIZE):
+        return iter_partitions(self.db, crud.posts_table, batch_size)
+
+    def iter_comments(self, batch_size=EXPORT_BATCH_SIZE):
+        return iter_partitions(self.db, crud.comments_table, batch_size)
+
+    def close(self):
+        self.db.close()
+
+
+def _page_after(
+    keys: List[Tuple[datetime, int]],
+    cursor: Optional[str],
+    limit: int,
+    filters: ListFilter = NO_FILTER,
+    records: Optional[dict] = None,
+):
+    """Keys of the page after ``cursor``, plus one to detect a next page.
+
+    ``since`` and ``until`` narrow the slice by bisection. An ``author``
+    filter checks each key's record in ``records``; posts pass the keys of
+    that author's posts instead, so only comments pay for it.
+    """
+    start = bisect_right(keys, decode_cursor(cursor)) if cursor else 0
+    end = len(keys)
+    if filters.since is not None:
+        start = max(start, bisect_left(keys, (filters.since,)))
+    if filters.until is not None:
+        end = bisect_left(keys, (filters.until,))
+    if filters.author is None or records is None:
+        return keys[start:min(end, start + limit + 1)]
+    matches = (
+        keys[i] for i in range(start, end) if records[keys[i][1]].author == filters.author
+    )
+    return list(islice(matches, limit + 1))
+
+
+class MemoryRepository(Repository):
+    """Thread-safe in-process store with the SQL backend's semantics."""
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._posts: Dict[int, PostRecord] = {}
+        self._comments: Dict[int, CommentRecord] = {}
+        # (created_at, id) keys kept sorted, the pagination order
+        self._post_keys: List[Tuple[datetime, int]] = []
+        self._author_post_keys: Dict[Optional[str], List[Tuple[datetime, int]]] = {}
+        self._comment_keys: Dict[int, List[Tuple[datetime, int]]] = {}
+        self._next_post_id = 1
+        self._next_comment_id = 1
+
+    @staticmethod
+    def _append_key(keys: list, key: Tuple[datetime, int]) -> None:
+        # The clock only moves forward in the common case; insort covers skew
+        if not keys or keys[-1] < key:
+            keys.append(key)
+        else:
+            insort(keys, key)
+
+    def _add_post(self, post: PostCreate, now: datetime) -> PostRecord:
+        record = PostRecord(id=self._next_post_id, created_at=now, **post.model_dump())
+        self._next_post_id += 1
+        self._posts[record.id] = record
+        self._append_key(self._post_keys, (now, record.id))
+        self._append_key(self._author_post_keys.setdefault(record.author, []), (now, record.id))
+        self._comment_keys[record.id] = []
+        return record
+
+    def _add_comment(self, comment: CommentCreate, now: datetime) -> CommentRecord:
+        record = CommentRecord(id=self._next_comment_id, created_at=now, **comment.model_dump())
+        self._next_comment_id += 1
+        self._comments[record.id] = record
+        self._append_key(self._comment_keys[record.post_id], (now, record.id))
+        post = self._posts[record.post_id]
+        self._posts[post.id] = post._replace(
+            version=post.version + 1,
+            comment_count=post.comment_count + 1,
+            last_comment_at=now,
+        )
+        return record
+
+    def create_post(self, post):
+        with self._lock:
+            return self._add_post(post, datetime.utcnow())
+
+    def create_posts(self, posts):
+        with self._lock:
+            now = datetime.utcnow()
+            return [self._add_post(post, now) for post in posts]
+
+    def create_comment(self, comment):
+        with self._lock:
+            if comment.post_id not in self._posts:
+                return None
+            return self._add_comment(comment, datetime.utcnow())
+
+    def existing_post_ids(self, post_ids):
+        with self._lock:
+            return {post_id for post_id in post_ids if post_id in self._posts}
+
+    def create_comments(self, comments):
+        with self._lock:
+            now = datetime.utcnow()
+            return [self._add_comment(comment, now) for comment in comments]
+
+    # Single dict lookups are atomic; they do not need the lock
+    def get_post(self, post_id):
+        return self._posts.get(post_id)
+
+    def post_version(self, post_id):
+        post = self._posts.get(post_id)
+        return None if post is None else post.version
+
+    # Records are already in memory; the serializer picks the requested fields
+    def list_posts(self, cursor, limit, columns=None, filters=NO_FILTER):
+        with self._lock:
+            if filters.author is not None:
+                keys = self._author_post_keys.get(filters.author, [])
+                filters = filters._replace(author=None)
+            else:
+                keys = self._post_keys
+            keys = _page_after(keys, cursor, limit, filters)
+            rows = [self._posts[post_id] for _, post_id in keys]
+        return split_page(rows, limit)
+
+    def list_post_versions(self, cursor, limit, filters=NO_FILTER):
+        return self.list_posts(cursor, limit, None, filters)
+
+    def list_comments(self, post_id, cursor, limit, columns=None, filters=NO_FILTER):
+        with self._lock:
+            keys = _page_after(
+                self._comment_keys.get(post_id, []), cursor, limit, filters, self._comments
+            )
+            rows = [self._comments[comment_id] for _, comment_id in keys]
+        return split_page(rows, limit)
+
+    def comments_after(self, post_id, after_id, limit):
+        with self._lock:
+            ids = sorted(
+                comment_id for _, comment_id in self._comment_keys.get(post_id, [])
+                if comment_id > after_id
+            )[:limit]
+            return [self._comments[comment_id] for comment_id in ids]
+
+    def search(self, q, cursor, limit):
+        """Case-insensitive substring match like ``LikeSearchIndex``; scans every row."""
+        terms = [term.lower() for term in query_terms(q)]
+        if not terms:
+            return [], None
+        after = -1
+        if cursor:
+            try:
+                _, after = decode_token(cursor)
+                after = int(after)
+            except (ValueError, TypeError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        def matches(*texts) -> bool:
+            text = " ".join(t for t in texts if t).lower()
+            return all(term in text for term in terms)
+
+        with self._lock:
+            posts = list(self._posts.values())
+            comments = list(self._comments.values())
+        hits = [
+            (post.id * 2, post.id, post.content) for post in posts
+            if post.id * 2 > after and matches(post.title, post.content)
+        ] + [
+            (comment.id * 2 + 1, comment.post_id, comment.content) for comment in comments
+            if comment.id * 2 + 1 > after and matches(comment.content)
+        ]
+        hits.sort()
+        next_cursor = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            next_cursor = encode_token([0.0, hits[-1][0]])
+        return [
+            SearchResult(
+                kind="post" if rowid % 2 == 0 else "comment",
+                id=rowid // 2,
+                post_id=post_id,
+                rank=0.0,
+                snippet=content[:80],
+            )
+            for rowid, post_id, content in hits
+        ], next_cursor
+
+    @staticmethod
+    def _batches(rows: list, batch_size: int) -> Iterator[list]:
+        for start in range(0, len(rows), batch_size):
+            yield rows[start:start + batch_size]
+
+    # Ids are assigned in insertion order, so the dicts are already id-ordered
+    def iter_posts(self, batch_size=EXPORT_BATCH_SIZE):
+        with self._lock:
+            rows = list(self._posts.values())
+        return self._batches(rows, batch_size)
+
+    def iter_comments(self, batch_size=EXPORT_BATCH_SIZE):
+        with self._lock:
+            rows = list(self._comments.values())
+        return self._batches(rows, batch_size)
+
+
+def make_store(config: Settings = settings) -> Optional[MemoryRepository]:
+    """The process-wide store for ``STORAGE_BACKEND=memory``, None for SQL."""
+    if config.storage_backend == "sqlalchemy":
+        return None
+    if config.storage_backend == "memory":
+        return MemoryRepository()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {config.storage_backend!r}")
+
+
+store = make_store(settings)
+
+
+def get_repository(
+    db: Session = Depends(get_db),
+    index: SearchIndex = Depends(get_search_index),
+) -> Repository:
+    """Storage backend dependency for FastAPI endpoints."""
+    if store is not None:
+        return store
+    return SqlRepository(db, index)
+
+
+def get_read_repository(
+    db: Session = Depends(get_read_db),
+    index: SearchIndex = Depends(get_search_index),
+) -> Repository:
+    """Storage backend dependency for read-only endpoints (replica-routed)."""
+    if store is not None:
+        return store
+    return SqlRepository(db, index)
+
+
+def get_stream_repository(
+    db: Session = Depends(get_db, scope="function"),
+    index: SearchIndex = Depends(get_search_index),
+) -> Repository:
+    """Storage backend dependency for long-lived streaming endpoints.
+
+    The session is closed as soon as the endpoint returns rather than when
+    the response ends, so an open stream holds no pooled connection. It
+    reads from the primary: a replica may not have the latest comments yet.
+    """
+    if store is not None:
+        return store
+    return SqlRepository(db, index)
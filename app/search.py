@@ -0,0 +1,230 @@
+"""Full-text search over post titles/content and comment content.
+
+The default backend mirrors posts and comments into an SQLite FTS5 table.
+Triggers on ``posts`` and ``comments`` keep it in sync inside the writing
+transaction, so every create path (single, bulk, async app) is covered
+without extra statements from the application. Index rows use
+``rowid = id * 2`` for posts and ``id * 2 + 1`` for comments, which makes
+deletes and updates primary-key operations.
+
+Rebuild the index of an existing database with::
+
+    python -m app.search rebuild
+"""
+import argparse
+import re
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from . import db_models  # noqa: F401  registers the tables the triggers use
+from .config import Settings, settings
+from .database import Base
+from .models import SearchResult
+from .pagination import decode_token, encode_token
+
+FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        title, content, post_id UNINDEXED, tokenize = 'unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS search_posts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO search_index (rowid, title, content, post_id)
+        VALUES (new.id * 2, new.title, new.content, new.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_posts_au AFTER UPDATE OF title, content ON posts BEGIN
+        UPDATE search_index SET title = new.title, content = new.content
+        WHERE rowid = new.id * 2;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_posts_ad AFTER DELETE ON posts BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_comments_ai AFTER INSERT ON comments BEGIN
+        INSERT INTO search_index (rowid, title, content, post_id)
+        VALUES (new.id * 2 + 1, NULL, new.content, new.post_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_comments_au AFTER UPDATE OF content ON comments BEGIN
+        UPDATE search_index SET content = new.content WHERE rowid = new.id * 2 + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_comments_ad AFTER DELETE ON comments BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2 + 1;
+    END""",
+]
+
+FTS_DROP = [
+    "DROP TRIGGER IF EXISTS search_posts_ai",
+    "DROP TRIGGER IF EXISTS search_posts_au",
+    "DROP TRIGGER IF EXISTS search_posts_ad",
+    "DROP TRIGGER IF EXISTS search_comments_ai",
+    "DROP TRIGGER IF EXISTS search_comments_au",
+    "DROP TRIGGER IF EXISTS search_comments_ad",
+    "DROP TABLE IF EXISTS search_index",
+]
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def query_terms(q: str) -> List[str]:
+    """Split user input into plain word terms, ignoring FTS query syntax."""
+    return _TERM.findall(q)
+
+
+def _result(row) -> SearchResult:
+    return SearchResult(
+        kind="post" if row.rowid % 2 == 0 else "comment",
+        id=row.rowid // 2,
+        post_id=row.post_id,
+        rank=row.rank,
+        snippet=row.snippet,
+    )
+
+
+class SearchIndex:
+    """Interface shared by search backends."""
+    name = "none"
+
+    def install(self, conn: Connection) -> None:
+        """Create whatever the backend needs; safe to call repeatedly."""
+
+    def drop(self, conn: Connection) -> None:
+        """Remove everything ``install`` created."""
+
+    def rebuild(self, conn: Connection) -> None:
+        """Re-index every existing post and comment."""
+
+    def search(
+        self, db: Session, q: str, cursor: Optional[str], limit: int
+    ) -> Tuple[List[SearchResult], Optional[str]]:
+        raise NotImplementedError
+
+    def _page(self, db: Session, sql: str, params: dict, cursor: Optional[str], limit: int):
+        """Run a ranked query and apply keyset pagination on ``(rank, rowid)``."""
+        where = ""
+        if cursor:
+            try:
+                rank, rowid = decode_token(cursor)
+                params.update(after_rank=float(rank), after_rowid=int(rowid))
+            except (ValueError, TypeError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            where = (
+                "WHERE rank > :after_rank "
+                "OR (rank = :after_rank AND rowid > :after_rowid)"
+            )
+        rows = db.execute(
+            text(f"SELECT * FROM ({sql}) {where} ORDER BY rank, rowid LIMIT :limit"),
+            {**params, "limit": limit + 1},
+        ).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_token([rows[-1].rank, rows[-1].rowid])
+        return [_result(row) for row in rows], next_cursor
+
+
+class Fts5SearchIndex(SearchIndex):
+    """SQLite FTS5 index ranked by BM25, titles weighted twice as content."""
+    name = "fts5"
+
+    def install(self, conn: Connection) -> None:
+        for ddl in FTS_DDL:
+            conn.exec_driver_sql(ddl)
+
+    def drop(self, conn: Connection) -> None:
+        for ddl in FTS_DROP:
+            conn.exec_driver_sql(ddl)
+
+    def rebuild(self, conn: Connection) -> None:
+        self.drop(conn)
+        self.install(conn)
+        conn.exec_driver_sql(
+            "INSERT INTO search_index (rowid, title, content, post_id) "
+            "SELECT id * 2, title, content, id FROM posts"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO search_index (rowid, title, content, post_id) "
+            "SELECT id * 2 + 1, NULL, content, post_id FROM comments"
+        )
+        conn.exec_driver_sql("INSERT INTO search_index (search_index) VALUES ('optimize')")
+
+    def search(self, db, q, cursor, limit):
+        terms = query_terms(q)
+        if not terms:
+            return [], None
+        match = " ".join('"' + term + '"' for term in terms)
+        sql = (
+            "SELECT rowid, post_id, bm25(search_index, 2.0, 1.0) AS rank, "
+            "snippet(search_index, -1, '<b>', '</b>', '…', 12) AS snippet "
+            "FROM search_index WHERE search_index MATCH :match"
+        )
+        return self._page(db, sql, {"match": match}, cursor, limit)
+
+
+class LikeSearchIndex(SearchIndex):
+    """Unindexed ``LIKE`` scan; works on any database but reads every row."""
+    name = "like"
+
+    def search(self, db, q, cursor, limit):
+        terms = query_terms(q)
+        if not terms:
+            return [], None
+        params = {f"t{i}": f"%{term}%" for i, term in enumerate(terms)}
+        post_match = " AND ".join(
+            f"(title LIKE :t{i} OR content LIKE :t{i})" for i in range(len(terms))
+        )
+        comment_match = " AND ".join(f"content LIKE :t{i}" for i in range(len(terms)))
+        sql = (
+            "SELECT id * 2 AS rowid, id AS post_id, 0.0 AS rank, "
+            f"substr(content, 1, 80) AS snippet FROM posts WHERE {post_match} "
+            "UNION ALL "
+            "SELECT id * 2 + 1 AS rowid, post_id, 0.0 AS rank, "
+            f"substr(content, 1, 80) AS snippet FROM comments WHERE {comment_match}"
+        )
+        return self._page(db, sql, params, cursor, limit)
+
+
+def make_search_index(config: Settings = settings) -> SearchIndex:
+    """Build the search backend selected by ``SEARCH_BACKEND``."""
+    if config.search_backend == "fts5":
+        return Fts5SearchIndex()
+    if config.search_backend == "like":
+        return LikeSearchIndex()
+    raise ValueError(f"Unknown SEARCH_BACKEND: {config.search_backend!r}")
+
+
+search_index = make_search_index(settings)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        search_index.install(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        search_index.drop(connection)
+
+
+def get_search_index() -> SearchIndex:
+    """Search backend dependency for FastAPI endpoints."""
+    return search_index
+
+
+def main() -> None:
+    from .database import engine
+    from .migrate import upgrade
+
+    parser = argparse.ArgumentParser(prog="python -m app.search")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+    upgrade()
+    with engine.begin() as conn:
+        search_index.rebuild(conn)
+    print(f"Rebuilt {search_index.name} search index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""JSON encoding of response bodies.
+
+By default rows are validated into the response model and encoded by
+pydantic-core. With ``FAST_SERIALIZER=1`` the validation step is skipped:
+column rows are copied into dicts in the model's field order and encoded by
+orjson (or pydantic-core when orjson is not installed). Rows were validated
+on write, and the JSON is byte-for-byte the same.
+"""
+from operator import attrgetter, itemgetter
+from typing import Any, Iterable, List, Type
+
+import pydantic_core
+from pydantic import BaseModel, TypeAdapter
+
+from .config import settings
+from .metrics import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_adapters = {}
+_getters = {}
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode plain Python data (dicts, lists, datetimes) as compact JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return pydantic_core.to_json(obj)
+
+
+def embed(obj: bytes, name: str, value: bytes) -> bytes:
+    """Add the encoded ``value`` as field ``name`` of the encoded object ``obj``."""
+    return b"%s,%s:%s}" % (obj[:-1], dumps(name), value)
+
+
+def _getter(schema: Type[BaseModel], sample):
+    """Build (and memoize) a function turning a row into a ``schema`` dict.
+
+    Column rows are read by position, which is much cheaper than attribute
+    lookup on ``Row``; anything else (ORM objects) is read by attribute.
+    """
+    columns = getattr(sample, "_fields", None)
+    key = (schema, columns)
+    getter = _getters.get(key)
+    if getter is None:
+        fields = tuple(schema.model_fields)
+        if columns is not None:
+            values = itemgetter(*(columns.index(name) for name in fields))
+        else:
+            values = attrgetter(*fields)
+        if len(fields) == 1:
+            # With one field the getters return the bare value, not a tuple
+            name = fields[0]
+            getter = lambda row: {name: values(row)}
+        else:
+            getter = lambda row: dict(zip(fields, values(row)))
+        _getters[key] = getter
+    return getter
+
+
+def row_dict(row, schema: Type[BaseModel]) -> dict:
+    """Copy the fields of ``schema`` from a column row or ORM object."""
+    return _getter(schema, row)(row)
+
+
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    adapter = _adapters.get(schema)
+    if adapter is None:
+        adapter = _adapters[schema] = TypeAdapter(List[schema])
+    return adapter
+
+
+def encode_one(row, schema: Type[BaseModel]) -> bytes:
+    """JSON for a single row shaped like ``schema``."""
+    if settings.fast_serializer:
+        with timed("encode"):
+            return dumps(row_dict(row, schema))
+    with timed("validate"):
+        model = schema.model_validate(row)
+    with timed("encode"):
+        return model.model_dump_json().encode()
+
+
+def encode_many(rows: Iterable, schema: Type[BaseModel]) -> bytes:
+    """JSON array for rows shaped like ``schema``."""
+    if settings.fast_serializer:
+        rows = list(rows)
+        if not rows:
+            return b"[]"
+        getter = _getter(schema, rows[0])
+        with timed("encode"):
+            return dumps([getter(row) for row in rows])
+    adapter = _list_adapter(schema)
+    with timed("validate"):
+        models = adapter.validate_python(rows, from_attributes=True)
+    with timed("encode"):
+        return adapter.dump_json(models)
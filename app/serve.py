@@ -0,0 +1,52 @@
+"""Run the API in several worker processes.
+
+    python -m app.serve --workers 4 --port 8000
+
+Migrations run once, here in the parent, so the workers never race on DDL.
+Then uvicorn starts ``--workers`` processes that share the listening socket
+and the SQLite database. WAL mode lets their readers proceed while one of
+them writes; ``busy_timeout`` queues the writers. Each worker has its own
+connection pool, so the total connection count is workers x pool size.
+"""
+import argparse
+
+import uvicorn
+
+from .config import settings
+from .migrate import upgrade
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.serve")
+    parser.add_argument("--app", default="app.main:app")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--no-migrate", action="store_true",
+                        help="skip the schema upgrade before starting")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    if args.workers > 1:
+        # Per-process state would silently diverge between workers
+        if settings.storage_backend == "memory":
+            parser.error("STORAGE_BACKEND=memory keeps data per process; use one worker")
+        if settings.cache_backend == "memory":
+            parser.error("CACHE_BACKEND=memory is per process; use redis or one worker")
+        if settings.idempotency_backend == "memory":
+            parser.error("IDEMPOTENCY_BACKEND=memory is per process; use one worker")
+
+    if settings.storage_backend == "sqlalchemy" and not args.no_migrate:
+        upgrade()
+
+    uvicorn.run(
+        args.app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Compare requests per second and latency of the sync and async apps.
+
+Usage::
+
+    python -m benchmarks.bench_async --concurrency 500 --duration 10
+
+Each app is started under uvicorn against its own fresh SQLite file, seeded
+with a few posts and comments, and then hammered by ``--concurrency``
+clients issuing a read-heavy mix (GET /posts/{id}, GET /posts/{id}/comments,
+GET /posts) with one write in every ``--write-every`` requests.
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+import httpx
+
+from .common import run_server, seed
+from .run import percentile
+
+APPS = {
+    "sync": "app.main:app",
+    "async": "app.async_main:app",
+}
+
+
+async def drive(base_url: str, concurrency: int, duration: float, posts: int,
+                write_every: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    done = 0
+    errors = 0
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def worker(client: httpx.AsyncClient, seq: int) -> None:
+        nonlocal done, errors
+        rng = random.Random(seq)
+        n = 0
+        while time.perf_counter() < deadline:
+            n += 1
+            post_id = rng.randint(1, posts)
+            if write_every and n % write_every == 0:
+                request = client.post("/comments", json={
+                    "post_id": post_id, "content": "Benchmark write."
+                })
+            else:
+                path = rng.choice((
+                    f"/posts/{post_id}", f"/posts/{post_id}/comments", "/posts?limit=20",
+                ))
+                request = client.get(path)
+            started = time.perf_counter()
+            try:
+                response = await request
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+            done += 1
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client, i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": done,
+        "errors": errors,
+        "rps": done / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--comments-per-post", type=int, default=10)
+    parser.add_argument("--write-every", type=int, default=20)
+    parser.add_argument("--apps", nargs="+", choices=sorted(APPS), default=["sync", "async"])
+    args = parser.parse_args()
+
+    for name in args.apps:
+        with tempfile.TemporaryDirectory() as workdir, run_server(APPS[name], workdir) as server:
+            seed(server.base_url, args.posts, args.comments_per_post)
+            result = asyncio.run(drive(
+                server.base_url, args.concurrency, args.duration, args.posts, args.write_every
+            ))
+        print(f"{name:>5}: {result['rps']:8.1f} req/s  "
+              f"p50 {result['p50_ms']:7.1f}ms  p99 {result['p99_ms']:7.1f}ms  "
+              f"({result['requests']} requests, {result['errors']} errors, "
+              f"{args.concurrency} clients)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Offer a fixed rate of POST /comments with and without group commit.
+
+Usage::
+
+    python -m benchmarks.bench_batching --rate 1000 --duration 10
+
+The sync app is started against a fresh SQLite file once with
+``COMMENT_BATCHING=0`` and once with ``COMMENT_BATCHING=1``. An open-loop
+client schedules one POST /comments every ``1 / --rate`` seconds, whether or
+not earlier requests have finished, so slow commits show up as queueing
+latency instead of silently lowering the offered load. ``--synchronous FULL``
+makes every commit fsync, which is what group commit saves.
+
+``--in-process`` skips HTTP and uvicorn and offers the same load straight to
+the storage path from a pool of 40 threads (Starlette's default threadpool
+size): ``Repository.create_comment`` per request, or ``CommentBatcher``. On a
+small machine the HTTP stack saturates the CPU long before the database, so
+this is the way to see what group commit does to commit throughput.
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+
+import httpx
+from sqlalchemy.orm import sessionmaker
+
+from app.batching import CommentBatcher
+from app.config import settings
+from app.database import make_engine
+from app.models import CommentCreate
+from app.repository import SqlRepository
+from app.search import search_index
+
+from .common import run_server, seed
+from .run import percentile
+from .seed import seed_database
+
+
+async def drive(base_url: str, rate: float, duration: float, posts: int,
+                max_in_flight: int) -> dict:
+    limits = httpx.Limits(max_connections=max_in_flight,
+                          max_keepalive_connections=max_in_flight)
+    slots = asyncio.Semaphore(max_in_flight)
+    latencies, errors, dropped = [], 0, 0
+    rng = random.Random(0)
+
+    async def one(client: httpx.AsyncClient, post_id: int) -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            response = await client.post("/comments", json={
+                "post_id": post_id, "content": "Open-loop write."
+            })
+            if response.status_code != 201:
+                errors += 1
+        except httpx.HTTPError:
+            errors += 1
+        finally:
+            slots.release()
+        latencies.append(time.perf_counter() - start)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        tasks = []
+        start = time.perf_counter()
+        for i in range(int(rate * duration)):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if slots.locked():
+                # the client cannot keep up; count it instead of queueing forever
+                dropped += 1
+                continue
+            await slots.acquire()
+            tasks.append(asyncio.create_task(one(client, rng.randint(1, posts))))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "offered": rate,
+        "completed_rps": (len(latencies) - errors) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "errors": errors,
+        "dropped": dropped,
+    }
+
+
+def drive_in_process(workdir: str, batching: bool, args) -> dict:
+    path = Path(workdir) / "fastapi_app.db"
+    seed_database(path, args.posts, 0)
+    config = replace(settings, sqlite_synchronous=args.synchronous)
+    engine = make_engine(config, url=f"sqlite:///{path}")
+    factory = sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+    batcher = CommentBatcher(
+        lambda: SqlRepository(factory(), search_index),
+        max_batch=args.batch_size,
+        max_wait=args.batch_wait_ms / 1000,
+    ) if batching else None
+    rng = random.Random(0)
+    latencies, errors = [], 0
+
+    def one(scheduled: float, comment: CommentCreate) -> None:
+        nonlocal errors
+        try:
+            if batcher is not None:
+                row = batcher.submit(comment).result()
+            else:
+                repo = SqlRepository(factory(), search_index)
+                try:
+                    row = repo.create_comment(comment)
+                finally:
+                    repo.close()
+            if row is None:
+                errors += 1
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - scheduled)
+
+    total = int(args.rate * args.duration)
+    with ThreadPoolExecutor(max_workers=40) as pool:
+        start = time.perf_counter()
+        for i in range(total):
+            scheduled = start + i / args.rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(one, scheduled, CommentCreate(
+                post_id=rng.randint(1, args.posts), content="Open-loop write."
+            ))
+    elapsed = time.perf_counter() - start
+    if batcher is not None:
+        batcher.close()
+    engine.dispose()
+
+    latencies.sort()
+    return {
+        "offered": args.rate,
+        "completed_rps": (len(latencies) - errors) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "errors": errors,
+        "dropped": 0,
+        "batches": batcher.batches if batcher is not None else total,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=1000.0, help="offered writes per second")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--batch-wait-ms", type=float, default=5.0)
+    parser.add_argument("--synchronous", default="NORMAL", choices=["OFF", "NORMAL", "FULL"])
+    parser.add_argument("--in-process", action="store_true",
+                        help="drive the storage path directly instead of over HTTP")
+    args = parser.parse_args()
+
+    for batching in ("0", "1"):
+        label = "batched" if batching == "1" else "per-request"
+        if args.in_process:
+            with tempfile.TemporaryDirectory() as workdir:
+                result = drive_in_process(workdir, batching == "1", args)
+            print(
+                f"{label:>12}: {result['completed_rps']:7.1f} writes/s of "
+                f"{result['offered']:.0f} offered  p50 {result['p50_ms']:7.2f}ms  "
+                f"p95 {result['p95_ms']:7.2f}ms  p99 {result['p99_ms']:7.2f}ms  "
+                f"commits {result['batches']}  errors {result['errors']}"
+            )
+            continue
+        env = {
+            "COMMENT_BATCHING": batching,
+            "COMMENT_BATCH_SIZE": str(args.batch_size),
+            "COMMENT_BATCH_WAIT_MS": str(args.batch_wait_ms),
+            "SQLITE_SYNCHRONOUS": args.synchronous,
+        }
+        with tempfile.TemporaryDirectory() as workdir, \
+                run_server("app.main:app", workdir, env) as server:
+            seed(server.base_url, args.posts, 0)
+            result = asyncio.run(drive(
+                server.base_url, args.rate, args.duration, args.posts, args.max_in_flight
+            ))
+        print(
+            f"{label:>12}: {result['completed_rps']:7.1f} writes/s of {result['offered']:.0f} "
+            f"offered  p50 {result['p50_ms']:7.2f}ms  p95 {result['p95_ms']:7.2f}ms  "
+            f"p99 {result['p99_ms']:7.2f}ms  errors {result['errors']}  "
+            f"dropped {result['dropped']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare comment ingestion through POST /comments and POST /comments/bulk.
+
+Usage::
+
+    python -m benchmarks.bench_bulk --comments 5000 --batch-size 1000
+
+Both modes run against the sync app under uvicorn with a fresh SQLite file
+and a single client, so the numbers reflect per-row server cost rather than
+client concurrency.
+"""
+import argparse
+import tempfile
+import time
+
+import httpx
+
+from .common import run_server, seed
+
+
+def single_inserts(client: httpx.Client, comments: int, posts: int) -> float:
+    start = time.perf_counter()
+    for i in range(comments):
+        client.post("/comments", json={
+            "post_id": i % posts + 1, "content": f"Single comment {i}."
+        }).raise_for_status()
+    return comments / (time.perf_counter() - start)
+
+
+def bulk_inserts(client: httpx.Client, comments: int, posts: int, batch_size: int) -> float:
+    start = time.perf_counter()
+    for offset in range(0, comments, batch_size):
+        batch = [
+            {"post_id": i % posts + 1, "content": f"Bulk comment {i}."}
+            for i in range(offset, min(offset + batch_size, comments))
+        ]
+        response = client.post("/comments/bulk", json=batch)
+        response.raise_for_status()
+        assert not response.json()["errors"]
+    return comments / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--comments", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--posts", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir, run_server("app.main:app", workdir) as server:
+        seed(server.base_url, args.posts, 0)
+        with httpx.Client(base_url=server.base_url, timeout=60.0) as client:
+            single = single_inserts(client, args.comments, args.posts)
+            bulk = bulk_inserts(client, args.comments, args.posts, args.batch_size)
+
+    print(f"single: {single:9.1f} comments/s")
+    print(f"  bulk: {bulk:9.1f} comments/s (batches of {args.batch_size})")
+    print(f"speedup: {bulk / single:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Cost of a GET /posts page with and without a summary projection.
+
+Usage::
+
+    python -m benchmarks.bench_fields --posts 20000 --content-chars 5000
+
+Seeds posts whose ``content`` is ``--content-chars`` long, then walks every
+page of ``--limit`` posts through the same repository and serializer calls
+as ``GET /posts`` (full) and ``GET /posts?view=summary``. Reported per page:
+wall time, response bytes and peak Python allocation (``tracemalloc``).
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.config import Settings
+from app.database import make_engine
+from app.models import Post
+from app.projection import SUMMARY_FIELDS, post_columns, response_model
+from app.repository import SqlRepository
+from app.search import search_index
+from app.serialization import encode_many
+
+from .seed import seed_database
+
+
+def walk(factory, columns, schema, limit: int, trace: bool = False):
+    """Fetch and encode every page; return (pages, seconds, bytes, peak bytes)."""
+    repo = SqlRepository(factory(), search_index)
+    pages = size = peak = 0
+    cursor = None
+    start = time.perf_counter()
+    try:
+        while True:
+            if trace:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+            rows, cursor = repo.list_posts(cursor, limit, columns)
+            body = encode_many(rows, schema)
+            if trace:
+                peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+            del rows
+            pages += 1
+            size += len(body)
+            if not cursor:
+                break
+    finally:
+        repo.close()
+    return pages, time.perf_counter() - start, size, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--content-chars", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = Path(workdir) / "fields.db"
+        seed_database(path, args.posts, 0)
+        engine = make_engine(Settings(), url=f"sqlite:///{path}")
+        with engine.begin() as conn:
+            conn.execute(text(
+                "UPDATE posts SET content = substr(content || hex(zeroblob(:n)), 1, :chars)"
+            ), {"n": args.content_chars, "chars": args.content_chars})
+        factory = sessionmaker(bind=engine)
+
+        for label, fields in (("full", None), ("summary", SUMMARY_FIELDS[Post])):
+            columns, schema = post_columns(fields), response_model(Post, fields)
+            walk(factory, columns, schema, args.limit)  # warm the page cache
+            best = min(walk(factory, columns, schema, args.limit)[1]
+                       for _ in range(args.repeat))
+            tracemalloc.start()
+            pages, _, size, peak = walk(factory, columns, schema, args.limit, trace=True)
+            tracemalloc.stop()
+            print(f"{label:>8}: {best / pages * 1000:7.2f} ms/page  "
+                  f"{size / pages / 1024:8.1f} KiB/page  "
+                  f"peak alloc {peak / 1024:8.1f} KiB/page  ({pages} pages)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
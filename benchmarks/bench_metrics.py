@@ -0,0 +1,213 @@
+"""Per-request cost of the metrics middleware and SQL hooks.
+
+Usage::
+
+    python -m benchmarks.bench_metrics --requests 2000
+
+End-to-end A/B runs cannot resolve a difference of a few percent on a busy
+or single-core machine: consecutive blocks of identical requests already
+vary by more than that. Instead each piece of instrumentation is timed in
+isolation over many iterations, with and without it:
+
+* ``MetricsMiddleware`` around a trivial ASGI app,
+* the cursor-execute hooks around ``SELECT 1``,
+* ``InstrumentedQueuePool`` checkout versus plain ``QueuePool``,
+* one ``timed`` block (the serializer opens two per response),
+
+and the sum, weighted by the statements and checkouts a real request makes,
+is compared to the measured latency of the endpoint mix served in-process by
+``app.main`` (GET /posts/{id}, GET /posts/{id}/comments, GET /posts and
+POST /comments) with metrics disabled.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app import metrics
+from app.config import settings
+from app.database import get_db, make_engine
+from app.main import app
+
+from .seed import seed_database
+
+
+def best_of(fn, number: int, repeat: int = 5) -> float:
+    """Lowest mean seconds per call of ``fn`` over ``repeat`` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def middleware_cost(number: int) -> float:
+    class Route:
+        path = "/posts/{post_id}"
+
+    async def inner(scope, receive, send):
+        scope["route"] = Route
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def receive():
+        return {}
+
+    async def send(message):
+        pass
+
+    async def run(asgi) -> float:
+        best = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(number):
+                await asgi({"type": "http", "method": "GET"}, receive, send)
+            best = min(best, (time.perf_counter() - start) / number)
+        return best
+
+    async def both():
+        return await run(metrics.MetricsMiddleware(inner)) - await run(inner)
+
+    return asyncio.run(both())
+
+
+def engine_costs(workdir: str, number: int):
+    """Extra seconds per statement and per pool checkout."""
+    url = f"sqlite:///{Path(workdir) / 'pool.db'}"
+    plain = create_engine(url, poolclass=QueuePool)
+    hooked = create_engine(url, poolclass=metrics.InstrumentedQueuePool)
+    metrics.instrument_engine(hooked)
+    token = metrics._current.set(metrics.RequestStats())
+    try:
+        def checkout(engine):
+            return lambda: engine.connect().close()
+
+        per_checkout = best_of(checkout(hooked), number) - best_of(checkout(plain), number)
+        with plain.connect() as p, hooked.connect() as h:
+            per_statement = (best_of(lambda: h.exec_driver_sql("SELECT 1"), number)
+                             - best_of(lambda: p.exec_driver_sql("SELECT 1"), number))
+    finally:
+        metrics._current.reset(token)
+        plain.dispose()
+        hooked.dispose()
+    return per_statement, per_checkout
+
+
+def timed_cost(number: int) -> float:
+    token = metrics._current.set(metrics.RequestStats())
+    try:
+        def block():
+            with metrics.timed("encode"):
+                pass
+        return best_of(block, number)
+    finally:
+        metrics._current.reset(token)
+
+
+def request_profile(workdir: str, requests: int, posts: int, comments_per_post: int):
+    """Median latency with metrics off, and mean statements per request."""
+    path = Path(workdir) / "fastapi_app.db"
+    seed_database(path, posts, comments_per_post)
+    engines = {
+        enabled: make_engine(replace(settings, metrics_enabled=enabled), url=f"sqlite:///{path}")
+        for enabled in (False, True)
+    }
+    rng = random.Random(0)
+
+    def one(client: TestClient):
+        post_id = rng.randint(1, posts)
+        kind = rng.randrange(4)
+        if kind == 0:
+            return client.get(f"/posts/{post_id}")
+        if kind == 1:
+            return client.get(f"/posts/{post_id}/comments")
+        if kind == 2:
+            return client.get("/posts", params={"limit": 20})
+        return client.post("/comments", json={
+            "post_id": post_id, "content": "Benchmark comment.",
+        })
+
+    def use(engine) -> None:
+        factory = sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+
+        def override():
+            db = factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override
+
+    user_middleware = app.user_middleware
+    latencies, statements = [], []
+    try:
+        with TestClient(app) as client:
+            # metrics off: no middleware, uninstrumented engine
+            app.user_middleware = [
+                m for m in user_middleware if m.cls is not metrics.MetricsMiddleware
+            ]
+            app.middleware_stack = app.build_middleware_stack()
+            use(engines[False])
+            for _ in range(requests // 10):
+                one(client)
+            for _ in range(requests):
+                start = time.perf_counter()
+                one(client)
+                latencies.append(time.perf_counter() - start)
+
+            # metrics on: count statements from the Server-Timing header
+            app.user_middleware = user_middleware
+            app.middleware_stack = app.build_middleware_stack()
+            use(engines[True])
+            for _ in range(200):
+                timing = one(client).headers["server-timing"]
+                statements.append(int(timing.split('desc="')[1].split()[0]))
+    finally:
+        app.user_middleware = user_middleware
+        app.dependency_overrides.clear()
+        for engine in engines.values():
+            engine.dispose()
+    return statistics.median(latencies), statistics.mean(statements)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--comments-per-post", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        middleware = middleware_cost(args.iterations)
+        per_statement, per_checkout = engine_costs(workdir, args.iterations)
+        per_timed = timed_cost(args.iterations)
+        latency, statements = request_profile(
+            workdir, args.requests, args.posts, args.comments_per_post
+        )
+
+    total = middleware + statements * per_statement + per_checkout + 2 * per_timed
+    print(f"middleware:        {middleware * 1e6:8.2f} us/request")
+    print(f"SQL hooks:         {per_statement * 1e6:8.2f} us/statement "
+          f"x {statements:.2f} statements/request")
+    print(f"pool checkout:     {per_checkout * 1e6:8.2f} us/request")
+    print(f"serializer timers: {per_timed * 1e6:8.2f} us/block x 2")
+    print(f"total:             {total * 1e6:8.2f} us/request")
+    print(f"request latency:   {latency * 1e6:8.1f} us (median, metrics off)")
+    print(f"overhead:          {total / latency:+8.2%}")
+
+
+if __name__ == "__main__":
+    main()
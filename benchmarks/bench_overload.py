@@ -0,0 +1,96 @@
+"""Write latency under overload with and without load shedding.
+
+Usage::
+
+    python -m benchmarks.bench_overload --rate 150 --duration 15
+
+Sends ``POST /comments`` at ``--rate`` per second for ``--duration`` seconds
+whether or not the server keeps up, more than one worker's threadpool and
+SQLite writer can absorb, while a reader polls ``GET /posts/1``. In
+``queue`` mode every write waits for a thread and a connection; in ``shed``
+mode ``WRITE_CONCURRENCY_LIMIT`` turns the excess away with ``503``.
+Reported per mode: accepted writes per second and the latency of accepted
+writes, rejected writes and the concurrent reads.
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from .common import run_server
+from .run import percentile
+from .seed import seed_database
+
+
+async def overload(base_url: str, args) -> Dict[str, List[float]]:
+    latencies: Dict[str, List[float]] = {"accepted": [], "rejected": [], "reads": []}
+    done = asyncio.Event()
+
+    async def write(client: httpx.AsyncClient, i: int) -> None:
+        start = time.perf_counter()
+        try:
+            response = await client.post("/comments", json={
+                "post_id": i % args.posts + 1, "content": "Overload comment."
+            })
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        bucket = "accepted" if status == 201 else "rejected"
+        latencies[bucket].append(time.perf_counter() - start)
+
+    async def read(client: httpx.AsyncClient) -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/posts/1")
+            latencies["reads"].append(time.perf_counter() - start)
+            await asyncio.sleep(0.1)
+
+    limits = httpx.Limits(max_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        reader = asyncio.create_task(read(client))
+        writes = []
+        start = time.perf_counter()
+        # Open loop: arrivals keep coming whether or not the server keeps up
+        for i in range(int(args.rate * args.duration)):
+            delay = start + i / args.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            writes.append(asyncio.create_task(write(client, i)))
+        await asyncio.gather(*writes)
+        latencies["elapsed"] = [time.perf_counter() - start]
+        done.set()
+        await reader
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=150.0, help="writes per second")
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--write-limit", type=int, default=8,
+                        help="WRITE_CONCURRENCY_LIMIT in shed mode")
+    args = parser.parse_args()
+
+    modes = (("queue", {}), ("shed", {"WRITE_CONCURRENCY_LIMIT": str(args.write_limit)}))
+    for mode, env in modes:
+        with tempfile.TemporaryDirectory() as workdir:
+            seed_database(Path(workdir) / "fastapi_app.db", args.posts, 0)
+            with run_server("app.main:app", workdir, env=env,
+                            extra_args=["--backlog", "4096"]) as server:
+                result = asyncio.run(overload(server.base_url, args))
+        elapsed = result["elapsed"][0]
+        line = f"{mode:>6}: {len(result['accepted']) / elapsed:7.1f} writes/s"
+        for name in ("accepted", "rejected", "reads"):
+            values = sorted(result[name])
+            line += (f"  {name} {len(values):5d} p50 {percentile(values, 50) * 1000:7.1f}ms"
+                     f" p99 {percentile(values, 99) * 1000:7.1f}ms")
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Compare FTS5 search against a LIKE scan.
+
+Usage::
+
+    python -m benchmarks.bench_search --posts 1000000
+
+Builds a SQLite file in a temporary directory with ``--posts`` posts (plus
+one comment per ``--comment-every`` posts) of random words, then times the
+same queries through ``Fts5SearchIndex`` and ``LikeSearchIndex``.
+"""
+import argparse
+import itertools
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from app.config import Settings
+from app.database import Base, make_engine
+from app.search import Fts5SearchIndex, LikeSearchIndex
+
+VOCABULARY = 20000
+RARE_WORD = "zeppelin"
+
+
+def make_vocabulary(rng: random.Random):
+    """Pseudo-words with Zipf-distributed frequencies, like natural text."""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9)))
+             for _ in range(VOCABULARY)]
+    weights = [1.0 / rank for rank in range(1, VOCABULARY + 1)]
+    return words, list(itertools.accumulate(weights))
+
+
+def text(rng: random.Random, vocabulary, words: int) -> str:
+    return " ".join(rng.choices(vocabulary[0], cum_weights=vocabulary[1], k=words))
+
+
+def load(engine, posts: int, comment_every: int, batch: int = 10000) -> list:
+    """Insert the rows and return queries of decreasing term frequency."""
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for offset in range(0, posts, batch):
+            conn.exec_driver_sql(
+                "INSERT INTO posts (title, content, created_at, version, comment_count) "
+                "VALUES (?, ?, ?, 1, 0)",
+                [
+                    (
+                        text(rng, vocabulary, 4),
+                        text(rng, vocabulary, 30)
+                        + (f" {RARE_WORD}" if i % 100000 == 0 else ""),
+                        now,
+                    )
+                    for i in range(offset, min(offset + batch, posts))
+                ],
+            )
+        conn.exec_driver_sql(
+            "INSERT INTO comments (post_id, content, created_at) "
+            f"SELECT id, title, created_at FROM posts WHERE id % {comment_every} = 0"
+        )
+    words = vocabulary[0]
+    # Rank 50 appears in a few percent of posts, rank 2000 in a handful
+    return [words[50], f"{words[20]} {words[60]}", words[2000], RARE_WORD]
+
+
+def time_query(engine, index, q: str, repeat: int) -> float:
+    samples = []
+    with Session(engine) as db:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            index.search(db, q, None, 50)
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--comment-every", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = make_engine(Settings(), url=f"sqlite:///{Path(workdir) / 'search.db'}")
+        Base.metadata.create_all(bind=engine)
+        start = time.perf_counter()
+        queries = load(engine, args.posts, args.comment_every)
+        print(f"loaded {args.posts} posts with FTS triggers in "
+              f"{time.perf_counter() - start:.1f}s")
+
+        print(f"{'query':>16} {'fts5 ms':>10} {'like ms':>10} {'speedup':>8}")
+        for q in queries:
+            fts = time_query(engine, Fts5SearchIndex(), q, args.repeat)
+            like = time_query(engine, LikeSearchIndex(), q, args.repeat)
+            print(f"{q:>16} {fts:10.2f} {like:10.2f} {like / fts:7.1f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Measure mixed read/write throughput with and without the SQLite pragmas.
+
+Usage::
+
+    python -m benchmarks.bench_sqlite_concurrency --writers 8 --readers 24 --duration 10
+
+The sync app is started twice against a fresh SQLite file: once with
+``SQLITE_PRAGMAS=0`` (rollback journal, no busy timeout) and once with the
+default WAL/``synchronous=NORMAL``/``busy_timeout`` settings. Writers loop on
+POST /comments while readers loop on GET /posts/{id}/comments.
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+import httpx
+
+from .common import run_server, seed
+
+
+async def drive(base_url: str, writers: int, readers: int, duration: float,
+                posts: int) -> dict:
+    clients = writers + readers
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    stats = {"writes": 0, "reads": 0, "write_errors": 0, "read_errors": 0}
+    deadline = time.perf_counter() + duration
+
+    async def loop(client: httpx.AsyncClient, seq: int, kind: str) -> None:
+        rng = random.Random(seq)
+        while time.perf_counter() < deadline:
+            post_id = rng.randint(1, posts)
+            try:
+                if kind == "write":
+                    response = await client.post("/comments", json={
+                        "post_id": post_id, "content": "Concurrent write."
+                    })
+                else:
+                    response = await client.get(f"/posts/{post_id}/comments")
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            stats[f"{kind}s" if ok else f"{kind}_errors"] += 1
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(loop(client, i, "write") for i in range(writers)),
+            *(loop(client, writers + i, "read") for i in range(readers)),
+        )
+        elapsed = time.perf_counter() - start
+
+    stats["write_rps"] = stats["writes"] / elapsed
+    stats["read_rps"] = stats["reads"] / elapsed
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=24)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--posts", type=int, default=50)
+    parser.add_argument("--comments-per-post", type=int, default=20)
+    args = parser.parse_args()
+
+    for label, pragmas in (("default", "0"), ("tuned", "1")):
+        with tempfile.TemporaryDirectory() as workdir, run_server(
+            "app.main:app", workdir, env={"SQLITE_PRAGMAS": pragmas}
+        ) as server:
+            seed(server.base_url, args.posts, args.comments_per_post)
+            result = asyncio.run(drive(
+                server.base_url, args.writers, args.readers, args.duration, args.posts
+            ))
+        print(f"{label:>7}: writes {result['write_rps']:7.1f}/s "
+              f"({result['write_errors']} errors), "
+              f"reads {result['read_rps']:7.1f}/s ({result['read_errors']} errors)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Measure startup time and how throughput scales with worker processes.
+
+Usage::
+
+    python -m benchmarks.bench_startup --workers 1 2 4 --duration 10
+
+Startup is the time from launching ``uvicorn app.main:app`` to its first
+successful response, once on an empty directory with ``MIGRATE_ON_STARTUP=1``
+(the schema is created in the lifespan) and once on a database that was
+migrated beforehand, which is how ``python -m app.serve`` starts workers.
+
+Scaling starts ``python -m app.serve --workers N`` for each ``N`` against
+the same seeded database and drives a read-heavy mix (nine ``GET /posts/{id}``
+for every ``POST /comments``) with ``--concurrency`` clients. Extra workers
+only help up to the number of cores; ``os.cpu_count()`` is printed with the
+results so they can be read in that light.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from .common import REPO_ROOT, free_port, wait_until_ready
+from .run import Scenario, drive
+from .seed import seed_database
+
+MIXED = Scenario("mixed", lambda rng, ctx: (
+    ("POST", "/comments", {"post_id": rng.randint(1, ctx["posts"]), "content": "Scaling."})
+    if rng.random() < 0.1 else ("GET", f"/posts/{rng.randint(1, ctx['posts'])}", None)
+))
+
+
+def spawn(args, workdir, env=None) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, *args],
+        cwd=workdir,
+        env={**os.environ, "PYTHONPATH": str(REPO_ROOT), **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def stop(proc: subprocess.Popen) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def time_to_first_response(migrate_first: bool) -> float:
+    with tempfile.TemporaryDirectory() as workdir:
+        if migrate_first:
+            seed_database(Path(workdir) / "fastapi_app.db", 0, 0)
+        port = free_port()
+        start = time.perf_counter()
+        proc = spawn([
+            "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+        ], workdir, {"MIGRATE_ON_STARTUP": "0" if migrate_first else "1"})
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+                while True:
+                    if proc.poll() is not None:
+                        raise RuntimeError(f"server exited with code {proc.returncode}")
+                    try:
+                        client.get("/posts", timeout=1.0).raise_for_status()
+                        return time.perf_counter() - start
+                    except httpx.TransportError:
+                        time.sleep(0.005)
+        finally:
+            stop(proc)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3, help="startup measurements per mode")
+    args = parser.parse_args()
+
+    for migrate_first, label in ((False, "migrate in lifespan"), (True, "pre-migrated")):
+        times = sorted(time_to_first_response(migrate_first) for _ in range(args.repeat))
+        print(f"startup, {label:>19}: median {times[len(times) // 2] * 1000:7.1f}ms  "
+              f"min {times[0] * 1000:7.1f}ms")
+
+    print(f"cpu_count={os.cpu_count()}")
+    ctx = {"posts": args.posts}
+    with tempfile.TemporaryDirectory() as workdir:
+        seed_database(Path(workdir) / "fastapi_app.db", args.posts, 5)
+        baseline = None
+        for workers in args.workers:
+            port = free_port()
+            proc = spawn([
+                "-m", "app.serve", "--workers", str(workers), "--port", str(port),
+                "--log-level", "warning",
+            ], workdir)
+            try:
+                wait_until_ready(f"http://127.0.0.1:{port}", proc)
+                result = asyncio.run(drive(
+                    f"http://127.0.0.1:{port}", MIXED, ctx, args.concurrency, args.duration
+                ))
+            finally:
+                stop(proc)
+            baseline = baseline or result["rps"]
+            print(f"workers {workers:>2}: {result['rps']:8.1f} req/s "
+                  f"({result['rps'] / baseline:4.2f}x)  p50 {result['p50_ms']:7.2f}ms  "
+                  f"p95 {result['p95_ms']:7.2f}ms  p99 {result['p99_ms']:7.2f}ms  "
+                  f"errors {result['errors']}")
+
+
+if __name__ == "__main__":
+    main()
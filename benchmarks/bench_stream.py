@@ -0,0 +1,173 @@
+"""Compare polling for new comments with the server-sent event stream.
+
+Usage::
+
+    python -m benchmarks.bench_stream --clients 1000 --duration 20
+
+``--clients`` readers each watch one of ``--posts`` posts while a writer adds
+``--write-rate`` comments per second. In ``poll`` mode every reader sends a
+conditional ``GET /posts/{post_id}`` (the cheapest poll the API offers: one
+statement and usually a 304) every ``--poll-interval`` seconds. In
+``stream`` mode every reader holds ``GET /posts/{post_id}/comments/stream``
+open. Reported per mode: the requests and SQL statements the readers caused
+(from ``/metrics``), the server's CPU time, its memory per reader, and how
+long after a comment was sent its readers noticed it.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from .common import run_server
+from .run import percentile
+from .seed import seed_database
+
+
+def cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as stat:
+        fields = stat.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def reader_counters(base_url: str) -> Dict[str, float]:
+    """Requests and SQL statements recorded for the routes readers use."""
+    routes = ('route="/posts/{post_id}"', 'route="/posts/{post_id}/comments/stream"')
+    counters = {"requests": 0.0, "statements": 0.0}
+    for line in httpx.get(f"{base_url}/metrics").text.splitlines():
+        if not any(route in line for route in routes):
+            continue
+        if line.startswith("http_request_sql_statements_sum"):
+            counters["statements"] += float(line.rsplit(" ", 1)[1])
+        elif line.startswith("http_request_sql_statements_count"):
+            counters["requests"] += float(line.rsplit(" ", 1)[1])
+    return counters
+
+
+async def write(base_url: str, rate: float, duration: float, posts: int,
+                committed: Dict[int, float]) -> None:
+    rng = random.Random(1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+        start = time.perf_counter()
+        for i in range(int(rate * duration)):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            post_id = rng.randint(1, posts)
+            committed.setdefault(post_id, time.perf_counter())
+            await client.post("/comments", json={
+                "post_id": post_id, "content": "Watched comment."
+            })
+
+
+async def run_mode(mode: str, base_url: str, pid: int, args) -> dict:
+    rng = random.Random(0)
+    watched = [rng.randint(1, args.posts) for _ in range(args.clients)]
+    # when each post's first comment was sent, and how long readers took to see it
+    committed: Dict[int, float] = {}
+    noticed: List[float] = []
+    stop = asyncio.Event()
+    connected = 0
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+
+    async def poll(client: httpx.AsyncClient, post_id: int) -> None:
+        nonlocal connected
+        etag, seen = None, False
+        await asyncio.sleep(rng.random() * args.poll_interval)
+        connected += 1
+        while not stop.is_set():
+            headers = {"If-None-Match": etag} if etag else {}
+            try:
+                response = await client.get(f"/posts/{post_id}", headers=headers)
+            except httpx.HTTPError:
+                continue
+            if response.status_code == 200:
+                if etag is not None and not seen and post_id in committed:
+                    seen = True
+                    noticed.append(time.perf_counter() - committed[post_id])
+                etag = response.headers["ETag"]
+            await asyncio.sleep(args.poll_interval)
+
+    async def listen(client: httpx.AsyncClient, post_id: int) -> None:
+        nonlocal connected
+        seen = False
+        async with client.stream("GET", f"/posts/{post_id}/comments/stream") as response:
+            connected += 1
+            async for line in response.aiter_lines():
+                if line.startswith("id:") and not seen:
+                    seen = True
+                    noticed.append(time.perf_counter() - committed[post_id])
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+        reader = poll if mode == "poll" else listen
+        tasks = [asyncio.create_task(reader(client, post_id)) for post_id in watched]
+        while connected < args.clients:
+            await asyncio.sleep(0.1)
+        await asyncio.sleep(1)
+        before = reader_counters(base_url)
+        cpu_before, rss = cpu_seconds(pid), rss_mb(pid)
+        start = time.perf_counter()
+        await write(base_url, args.write_rate, args.duration, args.posts, committed)
+        await asyncio.sleep(args.poll_interval if mode == "poll" else 1)
+        elapsed = time.perf_counter() - start
+        cpu = cpu_seconds(pid) - cpu_before
+        # streams are recorded when they end, so read the counters first
+        after = reader_counters(base_url)
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    noticed.sort()
+    return {
+        "reader_rps": (after["requests"] - before["requests"]) / elapsed,
+        "statements_per_s": (after["statements"] - before["statements"]) / elapsed,
+        "cpu_pct": 100 * cpu / elapsed,
+        "rss_mb": rss,
+        "noticed": len(noticed),
+        "p50_ms": percentile(noticed, 50) * 1000,
+        "p95_ms": percentile(noticed, 95) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--write-rate", type=float, default=5.0, help="comments per second")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    parser.add_argument("--modes", nargs="+", choices=["poll", "stream"],
+                        default=["poll", "stream"])
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory() as workdir:
+            seed_database(Path(workdir) / "fastapi_app.db", args.posts, 0)
+            with run_server("app.main:app", workdir, extra_args=["--backlog", "4096"]) as server:
+                idle_rss = rss_mb(server.pid)
+                result = asyncio.run(run_mode(mode, server.base_url, server.pid, args))
+        per_reader_kb = (result["rss_mb"] - idle_rss) * 1024 / args.clients
+        print(
+            f"{mode:>6}: {args.clients} readers  {result['reader_rps']:7.1f} req/s  "
+            f"{result['statements_per_s']:7.1f} SQL/s  server CPU {result['cpu_pct']:5.1f}%  "
+            f"{per_reader_kb:5.1f} KiB/reader  noticed {result['noticed']} "
+            f"p50 {result['p50_ms']:7.1f}ms  p95 {result['p95_ms']:7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
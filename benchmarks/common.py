@@ -0,0 +1,82 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def run_server(app_path: str, workdir, env=None, port=None, extra_args=()):
+    """Run ``uvicorn app_path`` in ``workdir`` and yield its base URL.
+
+    The server runs with ``workdir`` as its current directory so the default
+    ``./fastapi_app.db`` lands there instead of in the repository, and with
+    ``MIGRATE_ON_STARTUP=1`` so a fresh directory gets the schema.
+    """
+    port = port or free_port()
+    server_env = {
+        **os.environ, "PYTHONPATH": str(REPO_ROOT), "MIGRATE_ON_STARTUP": "1", **(env or {})
+    }
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", app_path,
+            "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning", "--no-access-log",
+            *extra_args,
+        ],
+        cwd=workdir,
+        env=server_env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_ready(base_url, proc)
+        proc.base_url = base_url
+        yield proc
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def wait_until_ready(base_url: str, proc=None, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            httpx.get(f"{base_url}/openapi.json", timeout=1.0)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server at {base_url} did not start in {timeout}s")
+
+
+def seed(base_url: str, posts: int, comments_per_post: int) -> None:
+    """Create ``posts`` posts with ``comments_per_post`` comments each."""
+    with httpx.Client(base_url=base_url) as client:
+        for i in range(posts):
+            post_id = client.post("/posts", json={
+                "title": f"Benchmark post {i}",
+                "content": f"Benchmark content for post {i}.",
+                "author": "bench",
+            }).json()["id"]
+            for j in range(comments_per_post):
+                client.post("/comments", json={
+                    "post_id": post_id,
+                    "content": f"Comment {j} on post {i}.",
+                })
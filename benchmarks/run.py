@@ -0,0 +1,244 @@
+"""Load-test every endpoint of ``app.main`` over real uvicorn.
+
+Usage::
+
+    python -m benchmarks.run --posts 10000 --comments-per-post 20 \\
+        --duration 10 --concurrency 32 --output results.json
+
+    # later, on another commit
+    python -m benchmarks.run ... --output new.json --compare results.json
+
+A SQLite file is seeded in a temporary directory, the app is started under
+uvicorn with that directory as its working directory, and each scenario is
+driven for ``--duration`` seconds by ``--concurrency`` clients. Results
+(p50/p95/p99 latency, requests per second, errors and the server's peak RSS)
+are printed and written as JSON. With ``--compare`` the run exits non-zero
+if any scenario's p95 latency grew, or its throughput fell, by more than
+``--max-regression``.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from .common import REPO_ROOT, run_server
+from .seed import WORDS, seed_database
+
+
+class Scenario:
+    """One endpoint to drive; ``request`` builds a request from an RNG."""
+
+    def __init__(self, name: str, request: Callable[[random.Random, dict], tuple],
+                 heavy: bool = False):
+        self.name = name
+        self.request = request
+        self.heavy = heavy
+
+
+def _post_body(rng):
+    return {"title": "Benchmark post", "content": "Benchmark content " + rng.choice(WORDS)}
+
+
+def _comment_body(rng, ctx):
+    return {"post_id": rng.randint(1, ctx["posts"]), "content": "Benchmark comment."}
+
+
+def _since(rng, ctx):
+    # Seeded posts are created one second apart from ctx["start"]
+    since = ctx["start"] + timedelta(seconds=rng.randint(1, ctx["posts"]))
+    return since.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("get_posts", lambda rng, ctx: ("GET", "/posts", None)),
+    Scenario("get_posts_fields", lambda rng, ctx: ("GET", "/posts?fields=id,title", None)),
+    Scenario("get_posts_summary", lambda rng, ctx: ("GET", "/posts?view=summary", None)),
+    Scenario("get_posts_filtered", lambda rng, ctx: (
+        "GET", f"/posts?author=author{rng.randrange(50)}&since={_since(rng, ctx)}", None)),
+    Scenario("get_post", lambda rng, ctx: (
+        "GET", f"/posts/{rng.randint(1, ctx['posts'])}", None)),
+    Scenario("get_post_with_comments", lambda rng, ctx: (
+        "GET", f"/posts/{rng.randint(1, ctx['posts'])}?include=comments", None)),
+    Scenario("get_comments", lambda rng, ctx: (
+        "GET", f"/posts/{rng.randint(1, ctx['posts'])}/comments", None)),
+    Scenario("get_comments_summary", lambda rng, ctx: (
+        "GET", f"/posts/{rng.randint(1, ctx['posts'])}/comments?view=summary", None)),
+    Scenario("get_comments_filtered", lambda rng, ctx: (
+        "GET", f"/posts/{rng.randint(1, ctx['posts'])}/comments"
+               f"?author=commenter{rng.randrange(20)}", None)),
+    Scenario("search", lambda rng, ctx: (
+        "GET", f"/search?q={rng.choice(WORDS)}&limit=20", None)),
+    Scenario("cache_stats", lambda rng, ctx: ("GET", "/cache/stats", None)),
+    Scenario("metrics", lambda rng, ctx: ("GET", "/metrics", None)),
+    Scenario("create_post", lambda rng, ctx: ("POST", "/posts", _post_body(rng))),
+    Scenario("create_posts_bulk", lambda rng, ctx: (
+        "POST", "/posts/bulk", [_post_body(rng) for _ in range(ctx["bulk_size"])])),
+    Scenario("create_comment", lambda rng, ctx: (
+        "POST", "/comments", _comment_body(rng, ctx))),
+    Scenario("create_comments_bulk", lambda rng, ctx: (
+        "POST", "/comments/bulk",
+        [_comment_body(rng, ctx) for _ in range(ctx["bulk_size"])])),
+    Scenario("export_posts", lambda rng, ctx: ("GET", "/export/posts.ndjson", None), heavy=True),
+    Scenario("export_comments", lambda rng, ctx: (
+        "GET", "/export/comments.ndjson", None), heavy=True),
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    """Peak resident set size of ``pid`` in MiB (VmHWM, or psutil's RSS)."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+
+
+async def drive(base_url: str, scenario: Scenario, ctx: dict, concurrency: int,
+                duration: float) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async def worker(client: httpx.AsyncClient, seq: int) -> None:
+        nonlocal errors
+        rng = random.Random(seq)
+        while time.perf_counter() < deadline:
+            method, path, body = scenario.request(rng, ctx)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client, i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+            text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], max_regression: float) -> List[str]:
+    """Return a description of every scenario that regressed past the threshold."""
+    failures = []
+    for name, old in baseline.items():
+        new = results.get(name)
+        if new is None:
+            continue
+        if old["p95_ms"] and new["p95_ms"] > old["p95_ms"] * (1 + max_regression):
+            failures.append(f"{name}: p95 {old['p95_ms']}ms -> {new['p95_ms']}ms")
+        if old["rps"] and new["rps"] < old["rps"] * (1 - max_regression):
+            failures.append(f"{name}: rps {old['rps']} -> {new['rps']}")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--comments-per-post", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--bulk-size", type=int, default=50)
+    parser.add_argument("--scenarios", nargs="+", choices=[s.name for s in SCENARIOS],
+                        help="scenarios to run (default: all)")
+    parser.add_argument("--app", default="app.main:app")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="extra environment for the server, e.g. FAST_SERIALIZER=1")
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument("--compare", type=Path, help="baseline results to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="allowed fractional change before failing (default 0.2)")
+    args = parser.parse_args(argv)
+
+    selected = [s for s in SCENARIOS if not args.scenarios or s.name in args.scenarios]
+    env = dict(item.split("=", 1) for item in args.env)
+    results: Dict[str, dict] = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # The seed dates its posts from 30 days before now
+        start = datetime.now(timezone.utc) - timedelta(days=30)
+        ctx = {"posts": args.posts, "bulk_size": args.bulk_size, "start": start}
+        seed_database(Path(workdir) / "fastapi_app.db", args.posts, args.comments_per_post)
+        with run_server(args.app, workdir, env=env) as server:
+            for scenario in selected:
+                # Exports stream the whole table; one client is enough load
+                concurrency = 1 if scenario.heavy else args.concurrency
+                result = asyncio.run(drive(
+                    server.base_url, scenario, ctx, concurrency, args.duration
+                ))
+                result["peak_rss_mb"] = peak_rss_mb(server.pid)
+                results[scenario.name] = result
+                print(f"{scenario.name:>22}: {result['rps']:9.1f} req/s  "
+                      f"p50 {result['p50_ms']:8.2f}ms  p95 {result['p95_ms']:8.2f}ms  "
+                      f"p99 {result['p99_ms']:8.2f}ms  errors {result['errors']}  "
+                      f"rss {result['peak_rss_mb'] or 0:.1f}MiB")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "args": {k: str(v) for k, v in vars(args).items()},
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"wrote {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["results"]
+        failures = compare(results, baseline, args.max_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
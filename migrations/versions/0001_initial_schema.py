@@ -0,0 +1,49 @@
+"""Initial schema: the posts and comments tables as first released.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+This is exactly what the original ``create_all`` built, so databases created
+before migrations existed can be stamped with it. Everything added since
+lives in later revisions.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "posts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=100), nullable=False),
+        sa.Column("content", sa.String(length=5000), nullable=False),
+        sa.Column("author", sa.String(length=50), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_posts_id", "posts", ["id"])
+
+    op.create_table(
+        "comments",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("post_id", sa.Integer(), nullable=False),
+        sa.Column("content", sa.String(length=300), nullable=False),
+        sa.Column("author", sa.String(length=50), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["post_id"], ["posts.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_comments_id", "comments", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_comments_id", table_name="comments")
+    op.drop_table("comments")
+    op.drop_index("ix_posts_id", table_name="posts")
+    op.drop_table("posts")
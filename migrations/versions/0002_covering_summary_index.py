@@ -0,0 +1,26 @@
+"""Cover GET /posts?view=summary with the pagination index.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # create_all databases stamped at 0001 may already have the new index,
+    # and those made by the first pagination release have the narrow one
+    op.create_index(
+        "ix_posts_created_at_id_summary", "posts",
+        ["created_at", "id", "title", "author"], if_not_exists=True,
+    )
+    op.drop_index("ix_posts_created_at_id", table_name="posts", if_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_created_at_id_summary", table_name="posts")
@@ -0,0 +1,23 @@
+"""Index posts by author for GET /posts?author=...
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_posts_author_created_at_id", "posts",
+        ["author", "created_at", "id"], if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_author_created_at_id", table_name="posts")
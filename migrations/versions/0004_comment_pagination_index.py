@@ -0,0 +1,24 @@
+"""Index comments in pagination order for GET /posts/{post_id}/comments.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # create_all databases stamped at 0001 may already have it
+    op.create_index(
+        "ix_comments_post_id_created_at_id", "comments",
+        ["post_id", "created_at", "id"], if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_comments_post_id_created_at_id", table_name="comments")
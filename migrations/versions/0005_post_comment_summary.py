@@ -0,0 +1,51 @@
+"""Add the post version and denormalized comment summary columns.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+Columns a create_all database already has are kept as they are; added ones
+are filled in from the existing comments. Every comment bumps its post's
+version by one, so a post's version is one more than its comment count.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def columns():
+    return [
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+        sa.Column("comment_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_comment_at", sa.DateTime(), nullable=True),
+    ]
+
+
+BACKFILL = {
+    "comment_count": "(SELECT count(*) FROM comments WHERE comments.post_id = posts.id)",
+    "last_comment_at": "(SELECT max(created_at) FROM comments WHERE comments.post_id = posts.id)",
+    "version": "1 + (SELECT count(*) FROM comments WHERE comments.post_id = posts.id)",
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = {column["name"] for column in sa.inspect(bind).get_columns("posts")}
+    added = [column for column in columns() if column.name not in existing]
+    if not added:
+        return
+    with op.batch_alter_table("posts") as batch:
+        for column in added:
+            batch.add_column(column)
+    assignments = ", ".join(f"{column.name} = {BACKFILL[column.name]}" for column in added)
+    op.execute(f"UPDATE posts SET {assignments}")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("posts") as batch:
+        for column in reversed(columns()):
+            batch.drop_column(column.name)
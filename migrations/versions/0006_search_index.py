@@ -0,0 +1,78 @@
+"""Add the full-text search index and the triggers that maintain it.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+The DDL is copied from ``app.search`` as it was at this revision, so the
+schema does not depend on ``SEARCH_BACKEND`` or later edits to the app.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+CREATE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        title, content, post_id UNINDEXED, tokenize = 'unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS search_posts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO search_index (rowid, title, content, post_id)
+        VALUES (new.id * 2, new.title, new.content, new.id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_posts_au AFTER UPDATE OF title, content ON posts BEGIN
+        UPDATE search_index SET title = new.title, content = new.content
+        WHERE rowid = new.id * 2;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_posts_ad AFTER DELETE ON posts BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_comments_ai AFTER INSERT ON comments BEGIN
+        INSERT INTO search_index (rowid, title, content, post_id)
+        VALUES (new.id * 2 + 1, NULL, new.content, new.post_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_comments_au AFTER UPDATE OF content ON comments BEGIN
+        UPDATE search_index SET content = new.content WHERE rowid = new.id * 2 + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_comments_ad AFTER DELETE ON comments BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2 + 1;
+    END""",
+]
+
+POPULATE = [
+    "INSERT INTO search_index (rowid, title, content, post_id) "
+    "SELECT id * 2, title, content, id FROM posts",
+    "INSERT INTO search_index (rowid, title, content, post_id) "
+    "SELECT id * 2 + 1, NULL, content, post_id FROM comments",
+    "INSERT INTO search_index (search_index) VALUES ('optimize')",
+]
+
+DROP = [
+    "DROP TRIGGER IF EXISTS search_posts_ai",
+    "DROP TRIGGER IF EXISTS search_posts_au",
+    "DROP TRIGGER IF EXISTS search_posts_ad",
+    "DROP TRIGGER IF EXISTS search_comments_ai",
+    "DROP TRIGGER IF EXISTS search_comments_au",
+    "DROP TRIGGER IF EXISTS search_comments_ad",
+    "DROP TABLE IF EXISTS search_index",
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    # A create_all database may already have an index kept current by its triggers
+    populate = not sa.inspect(bind).has_table("search_index")
+    for ddl in CREATE + (POPULATE if populate else []):
+        op.execute(ddl)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for ddl in DROP:
+            op.execute(ddl)
@@ -1,5 +0,0 @@
-from typing import List
-from .models import Post, Comment
-
-posts: List[Post] = []
-comments: List[Comment] = []
@@ -1,39 +1,210 @@
+"""Shared fixtures.
+
+By default every test runs against one in-memory SQLite database that is
+created once per session (per xdist worker). Each test gets a connection
+with an open transaction; the app's sessions join it through SAVEPOINTs
+and the transaction is rolled back afterwards, so no DDL runs per test.
+
+``TEST_DATABASE=file`` restores the old behaviour: a SQLite file whose
+tables are created and dropped around every test. Tests that open several
+connections at once (threads writing concurrently, read-only replicas,
+pool accounting) are marked ``file_database`` and always use the file.
+"""
+import os
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
 from app.main import app
-from app.database import Base, get_db
+from app.async_main import app as async_app
+from app.async_database import get_async_db
+from app.database import Base, get_db, get_read_db
+from app.metrics import instrument_engine
+from app.repository import (
+    MemoryRepository, get_read_repository, get_repository, get_stream_repository
+)
+
+TEST_DATABASE = os.environ.get("TEST_DATABASE", "memory")
+if TEST_DATABASE not in ("memory", "file"):
+    raise ValueError(f"TEST_DATABASE must be 'memory' or 'file', not {TEST_DATABASE!r}")
+
+# pytest-xdist workers each get their own database files
+WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+DATABASE_PATH = f"./test_{WORKER}.db" if WORKER else "./test.db"
+ASYNC_DATABASE_PATH = f"./test_async_{WORKER}.db" if WORKER else "./test_async.db"
+
+# Create test databases
+file_engine = create_engine(
+    f"sqlite:///{DATABASE_PATH}", connect_args={"check_same_thread": False}
+)
+instrument_engine(file_engine)
+
+# One connection shared by every thread, so all sessions see the same database
+memory_engine = create_engine(
+    "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+)
+instrument_engine(memory_engine)
+
+
+@event.listens_for(memory_engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    # pysqlite's implicit BEGIN breaks SAVEPOINTs; let SQLAlchemy emit it
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(memory_engine, "begin")
+def _begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+def _sessionmaker(bind, **options):
+    return sessionmaker(
+        autocommit=False, autoflush=False, expire_on_commit=False, bind=bind, **options
+    )
+
 
-# Create test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@pytest.fixture(scope="session")
+def memory_schema():
+    """Create the in-memory tables once."""
+    Base.metadata.create_all(bind=memory_engine)
 
 
-def override_get_db():
-    """Override database dependency for testing."""
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
+@pytest.fixture
+def db_engine(request):
+    """The engine the current test runs against."""
+    if TEST_DATABASE == "file" or request.node.get_closest_marker("file_database"):
+        return file_engine
+    return memory_engine
 
 
 @pytest.fixture
-def client():
+def session_factory(request, db_engine):
+    """A session factory for a clean test database."""
+    if db_engine is file_engine:
+        Base.metadata.create_all(bind=file_engine)
+        yield _sessionmaker(file_engine)
+        Base.metadata.drop_all(bind=file_engine)
+        return
+
+    request.getfixturevalue("memory_schema")
+    connection = memory_engine.connect()
+    transaction = connection.begin()
+    # Commits release a SAVEPOINT instead of ending the test's transaction
+    yield _sessionmaker(connection, join_transaction_mode="create_savepoint")
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def client(session_factory):
     """Create a test client with a clean test database."""
-    # Create tables
-    Base.metadata.create_all(bind=engine)
-    
-    # Override the database dependency
+    def override_get_db():
+        """Override database dependency for testing."""
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
     app.dependency_overrides[get_db] = override_get_db
-    
+    app.dependency_overrides[get_read_db] = override_get_db
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def create_post(client):
+    """Create a post through the API; keyword arguments override its fields."""
+    def create(**fields):
+        return client.post("/posts", json={
+            "title": "Test Post", "content": "This is a test post.", **fields
+        })
+    return create
+
+
+@pytest.fixture
+def memory_client():
+    """Create a test client backed by a fresh in-memory repository."""
+    store = MemoryRepository()
+    app.dependency_overrides[get_repository] = lambda: store
+    app.dependency_overrides[get_read_repository] = lambda: store
+    app.dependency_overrides[get_stream_repository] = lambda: store
     with TestClient(app) as test_client:
         yield test_client
-    
-    # Clean up: drop all tables after test
-    Base.metadata.drop_all(bind=engine)
-    
-    # Clear dependency overrides
     app.dependency_overrides.clear()
+
+
+def _is_savepoint(statement):
+    return statement.startswith(("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT"))
+
+
+@pytest.fixture
+def sql_statements(db_engine):
+    """Record every SQL statement the app sends to the test database."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not _is_savepoint(statement):
+            statements.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def executed(db_engine):
+    """Record every statement with its parameters, for EXPLAIN QUERY PLAN."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not _is_savepoint(statement):
+            statements.append((statement, parameters))
+
+    event.listen(db_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def query_plan(session_factory):
+    """Return SQLite's EXPLAIN QUERY PLAN details for a recorded statement."""
+    def plan(statement, parameters):
+        with session_factory() as db:
+            rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            return " | ".join(row[-1] for row in rows)
+    return plan
+
+
+@pytest.fixture
+def async_client():
+    """Create a test client for the async app with a clean test database."""
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{ASYNC_DATABASE_PATH}")
+    TestingAsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+
+    with TestClient(async_app) as test_client:
+        test_client.portal.call(_run_sync, async_engine, Base.metadata.create_all)
+        yield test_client
+        test_client.portal.call(_run_sync, async_engine, Base.metadata.drop_all)
+        test_client.portal.call(async_engine.dispose)
+
+    async_app.dependency_overrides.clear()
+
+
+async def _run_sync(async_engine, fn):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(fn)
@@ -0,0 +1,73 @@
+"""Tests for the async application."""
+
+
+def test_async_create_and_get_post(async_client):
+    """Test creating and fetching a post through the async app."""
+    response = async_client.post("/posts", json={
+        "title": "Async Post",
+        "content": "Created through an AsyncSession.",
+        "author": "Async Author"
+    })
+    assert response.status_code == 201
+    data = response.json()
+    assert data["id"] == 1
+    assert data["title"] == "Async Post"
+    assert "created_at" in data
+
+    response = async_client.get(f"/posts/{data['id']}")
+    assert response.status_code == 200
+    assert response.json() == data
+
+
+def test_async_get_post_not_found(async_client):
+    """Test getting a non-existent post returns 404."""
+    response = async_client.get("/posts/999")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Post not found"
+
+
+def test_async_get_posts_paginated(async_client):
+    """Test paging through posts on the async app."""
+    for i in range(3):
+        async_client.post("/posts", json={
+            "title": f"Post {i}",
+            "content": f"Content of post number {i}.",
+        })
+
+    first = async_client.get("/posts", params={"limit": 2})
+    assert [p["id"] for p in first.json()] == [1, 2]
+    second = async_client.get(
+        "/posts", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]}
+    )
+    assert [p["id"] for p in second.json()] == [3]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_async_comments(async_client):
+    """Test creating and listing comments through the async app."""
+    post_id = async_client.post("/posts", json={
+        "title": "Test Post",
+        "content": "This is a test post.",
+    }).json()["id"]
+
+    response = async_client.post("/comments", json={
+        "post_id": post_id,
+        "content": "Async comment.",
+        "author": "Commenter"
+    })
+    assert response.status_code == 201
+    assert response.json()["post_id"] == post_id
+
+    response = async_client.get(f"/posts/{post_id}/comments")
+    assert response.status_code == 200
+    assert [c["content"] for c in response.json()] == ["Async comment."]
+
+
+def test_async_comment_post_not_found(async_client):
+    """Test comment endpoints 404 for a non-existent post."""
+    response = async_client.post("/comments", json={
+        "post_id": 999,
+        "content": "Orphan comment.",
+    })
+    assert response.status_code == 404
+    assert async_client.get("/posts/999/comments").status_code == 404
@@ -0,0 +1,152 @@
+"""Tests for write-behind comment batching."""
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.batching import CommentBatcher, get_comment_batcher, make_batcher
+from app.config import Settings
+from app.main import app
+from app.models import CommentCreate, PostCreate
+from app.repository import MemoryRepository, SqlRepository
+from app.search import search_index
+
+
+@pytest.fixture
+def batcher(client, session_factory):
+    """A batcher writing to the test database, wired into the app."""
+    batcher = CommentBatcher(
+        lambda: SqlRepository(session_factory(), search_index), max_wait=0.05
+    )
+    app.dependency_overrides[get_comment_batcher] = lambda: batcher
+    yield batcher
+    batcher.close()
+
+
+def test_batched_comment_returns_its_row(client, batcher, create_post):
+    """Test that callers get their committed comment back."""
+    post = create_post().json()
+    response = client.post("/comments", json={"post_id": post["id"], "content": "Batched!"})
+    assert response.status_code == 201
+    assert response.json()["id"] == 1
+    assert response.json()["content"] == "Batched!"
+    assert client.get(f"/posts/{post['id']}").json()["comment_count"] == 1
+
+
+def test_batched_comment_on_missing_post(client, batcher):
+    """Test that a missing post still yields 404."""
+    response = client.post("/comments", json={"post_id": 42, "content": "Orphan"})
+    assert response.status_code == 404
+
+
+def test_concurrent_comments_share_a_commit(client, batcher, sql_statements, create_post):
+    """Test that comments arriving together are written by one batch."""
+    post = create_post().json()
+    sql_statements.clear()
+    futures = [
+        batcher.submit(CommentCreate(post_id=post_id, content=f"Comment {i}"))
+        for i, post_id in enumerate([post["id"]] * 9 + [99])
+    ]
+    rows = [future.result(timeout=5) for future in futures]
+
+    assert [row.id for row in rows[:9]] == list(range(1, 10))
+    assert rows[9] is None
+    assert batcher.batches == 1
+    # post check, INSERT ... RETURNING, summary UPDATE
+    assert len(sql_statements) == 3
+    assert client.get(f"/posts/{post['id']}").json()["comment_count"] == 9
+
+
+def test_full_queue_returns_503():
+    """Test that a full queue rejects writes instead of growing."""
+    store = MemoryRepository()
+    flushing, release = threading.Event(), threading.Event()
+
+    def blocked_repository():
+        flushing.set()
+        release.wait(5)
+        return store
+
+    batcher = CommentBatcher(blocked_repository, max_wait=0, max_queue=1)
+    comment = CommentCreate(post_id=1, content="Queued")
+    batcher.submit(comment)
+    assert flushing.wait(5)
+    batcher.submit(comment)
+    with pytest.raises(HTTPException) as exc_info:
+        batcher.submit(comment)
+    assert exc_info.value.status_code == 503
+    release.set()
+    batcher.close()
+
+
+def test_close_flushes_pending_comments():
+    """Test that shutting down commits what is still queued."""
+    store = MemoryRepository()
+    post = store.create_post(PostCreate(title="Post", content="Post content."))
+    batcher = CommentBatcher(lambda: store, max_wait=10)
+    futures = [batcher.submit(CommentCreate(post_id=post.id, content="Late")) for _ in range(3)]
+    batcher.close()
+    assert all(future.done() for future in futures)
+    assert store.get_post(post.id).comment_count == 3
+
+
+def test_failed_flush_fails_every_caller():
+    """Test that a database error reaches every comment of the batch."""
+    class Broken(MemoryRepository):
+        def existing_post_ids(self, post_ids):
+            raise RuntimeError("database is locked")
+
+    batcher = CommentBatcher(Broken, max_wait=0)
+    future = batcher.submit(CommentCreate(post_id=1, content="Lost"))
+    with pytest.raises(RuntimeError):
+        future.result(timeout=5)
+    batcher.close()
+
+
+def test_failing_repository_factory_fails_the_batch():
+    """Test that a factory error reaches the callers and the thread keeps going."""
+    store = MemoryRepository()
+    post = store.create_post(PostCreate(title="Post", content="Post content."))
+    calls = []
+
+    def flaky_repository():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("unable to open database file")
+        return store
+
+    batcher = CommentBatcher(flaky_repository, max_wait=0)
+    with pytest.raises(RuntimeError):
+        batcher.submit(CommentCreate(post_id=post.id, content="Lost")).result(timeout=5)
+    row = batcher.submit(CommentCreate(post_id=post.id, content="Kept")).result(timeout=5)
+    assert row.content == "Kept"
+    batcher.close()
+
+
+def test_slow_batch_answers_503(client, create_post):
+    """Test that a request stops waiting for its batch after the timeout."""
+    post = create_post().json()
+    release = threading.Event()
+    store = MemoryRepository()
+
+    def stuck_repository():
+        release.wait(5)
+        return store
+
+    batcher = CommentBatcher(stuck_repository, max_wait=0, timeout=0.05)
+    app.dependency_overrides[get_comment_batcher] = lambda: batcher
+    response = client.post("/comments", json={"post_id": post["id"], "content": "Slow"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    release.set()
+    batcher.close()
+
+
+def test_batching_is_off_by_default():
+    """Test that COMMENT_BATCHING selects the batcher."""
+    assert make_batcher(Settings()) is None
+    batcher = make_batcher(Settings(
+        comment_batching=True, comment_batch_size=7, comment_batch_timeout=2.5
+    ))
+    assert batcher.max_batch == 7
+    assert batcher.timeout == 2.5
@@ -0,0 +1,97 @@
+"""Tests for bulk create endpoints."""
+
+
+def _post(i):
+    return {
+        "title": f"Bulk Post {i}",
+        "content": f"Content of bulk post {i}.",
+        "author": "Bulk Author"
+    }
+
+
+def test_create_posts_bulk(client):
+    """Test creating several posts in one request."""
+    response = client.post("/posts/bulk", json=[_post(i) for i in range(3)])
+    assert response.status_code == 201
+    data = response.json()
+    assert data["errors"] == []
+    assert [p["id"] for p in data["created"]] == [1, 2, 3]
+    assert [p["title"] for p in data["created"]] == [f"Bulk Post {i}" for i in range(3)]
+    assert all("created_at" in p for p in data["created"])
+
+    assert [p["id"] for p in client.get("/posts").json()] == [1, 2, 3]
+
+
+def test_create_posts_bulk_reports_invalid_items(client):
+    """Test that invalid items are reported by index and the rest created."""
+    items = [_post(0), {"title": "Hi", "content": "Too short title."}, _post(2)]
+    response = client.post("/posts/bulk", json=items)
+    assert response.status_code == 201
+    data = response.json()
+    assert [p["title"] for p in data["created"]] == ["Bulk Post 0", "Bulk Post 2"]
+    assert len(data["errors"]) == 1
+    assert data["errors"][0]["index"] == 1
+    assert data["errors"][0]["detail"][0]["loc"] == ["title"]
+
+
+def test_create_posts_bulk_strips_whitespace(client):
+    """Test that bulk items go through the same validators as single creates."""
+    response = client.post("/posts/bulk", json=[
+        {"title": "  Padded  ", "content": "  Padded content.  "},
+        {"title": "   ", "content": "Blank title after strip."},
+    ])
+    data = response.json()
+    assert data["created"][0]["title"] == "Padded"
+    assert data["errors"][0]["index"] == 1
+
+
+def test_create_posts_bulk_limit(client):
+    """Test that bulk requests are bounded in size."""
+    response = client.post("/posts/bulk", json=[_post(i) for i in range(1001)])
+    assert response.status_code == 422
+
+
+def test_create_comments_bulk(client):
+    """Test creating comments across posts in one request."""
+    client.post("/posts/bulk", json=[_post(0), _post(1)])
+    response = client.post("/comments/bulk", json=[
+        {"post_id": 1, "content": "First on one."},
+        {"post_id": 2, "content": "First on two."},
+        {"post_id": 1, "content": "Second on one.", "author": "Commenter"},
+    ])
+    assert response.status_code == 201
+    data = response.json()
+    assert data["errors"] == []
+    assert [(c["id"], c["post_id"]) for c in data["created"]] == [(1, 1), (2, 2), (3, 1)]
+    assert data["created"][2]["author"] == "Commenter"
+
+    comments = client.get("/posts/1/comments").json()
+    assert [c["content"] for c in comments] == ["First on one.", "Second on one."]
+
+
+def test_create_comments_bulk_reports_missing_posts(client):
+    """Test per-item errors for unknown posts and invalid content."""
+    client.post("/posts", json=_post(0))
+    response = client.post("/comments/bulk", json=[
+        {"post_id": 999, "content": "Orphan comment."},
+        {"post_id": 1, "content": "X"},
+        {"post_id": 1, "content": "Valid comment."},
+    ])
+    assert response.status_code == 201
+    data = response.json()
+    assert [c["content"] for c in data["created"]] == ["Valid comment."]
+    assert [e["index"] for e in data["errors"]] == [0, 1]
+    assert data["errors"][0]["detail"] == "Post not found"
+
+
+def test_create_comments_bulk_bumps_post_etag(client):
+    """Test that bulk comments invalidate conditional GETs of their posts."""
+    client.post("/posts", json=_post(0))
+    etag = client.get("/posts/1/comments").headers["ETag"]
+    client.post("/comments/bulk", json=[
+        {"post_id": 1, "content": "Bulk one."},
+        {"post_id": 1, "content": "Bulk two."},
+    ])
+    response = client.get("/posts/1/comments", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
@@ -0,0 +1,171 @@
+"""Tests for the response cache."""
+import pytest
+
+from app import crud
+from app.cache import MemoryCache, RedisCache, comments_key, get_cache, post_key
+from app.main import app
+from app.models import CommentCreate
+
+
+class FakeRedis:
+    """Minimal stand-in for a Redis client."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        return [key for key in self.data if key.startswith(prefix)]
+
+    def info(self, section):
+        return {"evicted_keys": 3}
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request, client):
+    """Enable a fresh cache backend for the test client."""
+    backend = MemoryCache() if request.param == "memory" else RedisCache(FakeRedis())
+    app.dependency_overrides[get_cache] = lambda: backend
+    return backend
+
+
+def test_get_post_is_cached(client, cache, create_post):
+    """Test that the second read of a post is a cache hit."""
+    post = create_post().json()
+
+    first = client.get(f"/posts/{post['id']}")
+    second = client.get(f"/posts/{post['id']}")
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json() == post
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 1
+
+
+def test_missing_post_is_not_cached(client, cache, create_post):
+    """Test that 404s are not cached."""
+    assert client.get("/posts/999").status_code == 404
+    post = create_post().json()
+    assert client.get(f"/posts/{post['id']}").status_code == 200
+
+
+def test_create_comment_invalidates_comment_list(client, cache, create_post):
+    """Test that a new comment is visible right after it is created."""
+    post = create_post().json()
+    assert client.get(f"/posts/{post['id']}/comments").json() == []
+    assert client.get(f"/posts/{post['id']}/comments").json() == []
+    assert cache.stats.hits == 1
+
+    client.post("/comments", json={"post_id": post["id"], "content": "New comment."})
+    response = client.get(f"/posts/{post['id']}/comments")
+    assert [c["content"] for c in response.json()] == ["New comment."]
+
+
+def test_cached_comment_page_keeps_next_cursor(client, cache, create_post):
+    """Test that a cached first page still returns X-Next-Cursor."""
+    post = create_post().json()
+    for i in range(51):
+        client.post("/comments", json={"post_id": post["id"], "content": f"Comment {i}."})
+
+    first = client.get(f"/posts/{post['id']}/comments")
+    second = client.get(f"/posts/{post['id']}/comments")
+    assert cache.stats.hits == 1
+    assert len(second.json()) == 50
+    assert second.json() == first.json()
+    assert second.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+
+
+def test_cache_stats_endpoint(client, cache, create_post):
+    """Test that cache counters are exposed."""
+    post = create_post().json()
+    client.get(f"/posts/{post['id']}")
+    client.get(f"/posts/{post['id']}")
+
+    data = client.get("/cache/stats").json()
+    assert data["backend"] == cache.name
+    assert data["hits"] == 1
+    assert data["misses"] == 1
+    assert "evictions" in data
+
+
+@pytest.mark.parametrize("read, path", [
+    ("get_post", "/posts/1"), ("list_comments", "/posts/1/comments")
+])
+def test_write_during_read_is_not_cached_over(
+    client, cache, create_post, monkeypatch, read, path
+):
+    """Test that a comment committed mid-read is not hidden by the reader's set."""
+    create_post()
+    original = getattr(crud, read)
+
+    def read_then_comment(db, *args, **kwargs):
+        rows = original(db, *args, **kwargs)
+        # A comment commits and is invalidated, as create_comment does
+        crud.create_comment(db, CommentCreate(post_id=1, content="Mid-read"))
+        cache.delete(post_key(1), comments_key(1))
+        return rows
+
+    monkeypatch.setattr(crud, read, read_then_comment)
+    stale = client.get(path)
+    assert stale.status_code == 200
+    monkeypatch.undo()
+
+    fresh = client.get(path)
+    assert fresh.headers["ETag"] != stale.headers["ETag"]
+    if read == "get_post":
+        assert fresh.json()["comment_count"] == 1
+    else:
+        assert [c["content"] for c in fresh.json()] == ["Mid-read"]
+
+
+def test_cache_disabled_by_default(client):
+    """Test that the default backend stores nothing."""
+    assert client.get("/cache/stats").json()["backend"] == "none"
+
+
+def test_memory_cache_evicts_least_recently_used():
+    """Test LRU eviction once max_entries is exceeded."""
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.get("a")
+    cache.set("c", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+    assert cache.stats.evictions == 1
+
+
+def test_memory_cache_expires_entries(monkeypatch):
+    """Test that entries are dropped after their TTL."""
+    now = [100.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+    cache = MemoryCache(ttl=10)
+    cache.set("a", b"1")
+    assert cache.get("a") == b"1"
+    now[0] += 11
+    assert cache.get("a") is None
+
+
+def test_cached_responses_honour_if_none_match(client, cache, create_post):
+    """Test that cache hits still answer conditional GETs with 304."""
+    post = create_post().json()
+    etag = client.get(f"/posts/{post['id']}").headers["ETag"]
+    response = client.get(f"/posts/{post['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert cache.stats.hits == 1
+
+    etag = client.get(f"/posts/{post['id']}/comments").headers["ETag"]
+    response = client.get(f"/posts/{post['id']}/comments", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert cache.stats.hits == 2
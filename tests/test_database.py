@@ -0,0 +1,76 @@
+"""Tests for engine configuration."""
+from sqlalchemy import text
+
+from app.config import Settings
+from app.database import make_engine
+
+
+def _pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_settings_from_env(monkeypatch):
+    """Test that settings are read from environment variables."""
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///./other.db")
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "3")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "true")
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT", "1234")
+
+    settings = Settings.from_env()
+    assert settings.database_url == "sqlite:///./other.db"
+    assert settings.db_pool_size == 7
+    assert settings.db_max_overflow == 3
+    assert settings.db_pool_pre_ping is True
+    assert settings.sqlite_busy_timeout == 1234
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    """Test that WAL and the tuning pragmas are set on new connections."""
+    engine = make_engine(Settings(
+        sqlite_mmap_size=1024 * 1024,
+        sqlite_cache_size=-2000,
+        sqlite_busy_timeout=2500,
+    ), url=f"sqlite:///{tmp_path / 'pragmas.db'}")
+    try:
+        assert _pragma(engine, "journal_mode") == "wal"
+        assert _pragma(engine, "synchronous") == 1  # NORMAL
+        assert _pragma(engine, "mmap_size") == 1024 * 1024
+        assert _pragma(engine, "cache_size") == -2000
+        assert _pragma(engine, "busy_timeout") == 2500
+    finally:
+        engine.dispose()
+
+
+def test_pool_settings_applied(tmp_path):
+    """Test that pool size, overflow and pre-ping come from settings."""
+    engine = make_engine(Settings(
+        db_pool_size=3, db_max_overflow=4, db_pool_pre_ping=True
+    ), url=f"sqlite:///{tmp_path / 'pool.db'}")
+    try:
+        assert engine.pool.size() == 3
+        assert engine.pool._max_overflow == 4
+        assert engine.pool._pre_ping is True
+    finally:
+        engine.dispose()
+
+
+def test_sqlite_pragmas_can_be_disabled(tmp_path):
+    """Test that SQLITE_PRAGMAS=0 leaves SQLite defaults in place."""
+    engine = make_engine(
+        Settings(sqlite_pragmas=False), url=f"sqlite:///{tmp_path / 'plain.db'}"
+    )
+    try:
+        assert _pragma(engine, "journal_mode") == "delete"
+    finally:
+        engine.dispose()
+
+
+def test_in_memory_engine_skips_pool_sizing():
+    """Test that an in-memory URL does not receive QueuePool arguments."""
+    engine = make_engine(Settings(), url="sqlite://")
+    try:
+        assert _pragma(engine, "busy_timeout") == 5000
+    finally:
+        engine.dispose()
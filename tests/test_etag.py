@@ -0,0 +1,99 @@
+"""Tests for ETag / If-None-Match conditional GETs."""
+from app.etag import etag_matches
+
+
+def test_get_post_not_modified(client, create_post):
+    """Test that a matching If-None-Match returns 304 without a body."""
+    post = create_post().json()
+    response = client.get(f"/posts/{post['id']}")
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = client.get(f"/posts/{post['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_get_post_etag_changes_with_new_comment(client, create_post):
+    """Test that a new comment bumps the post version and its ETag."""
+    post = create_post().json()
+    etag = client.get(f"/posts/{post['id']}").headers["ETag"]
+
+    client.post("/comments", json={"post_id": post["id"], "content": "A comment."})
+    response = client.get(f"/posts/{post['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_get_post_conditional_not_found(client):
+    """Test that a conditional GET of a missing post is still a 404."""
+    response = client.get("/posts/999", headers={"If-None-Match": 'W/"abc"'})
+    assert response.status_code == 404
+
+
+def test_get_comments_not_modified(client, create_post):
+    """Test polling comments returns 304 until a new comment arrives."""
+    post = create_post().json()
+    client.post("/comments", json={"post_id": post["id"], "content": "First comment."})
+
+    response = client.get(f"/posts/{post['id']}/comments")
+    etag = response.headers["ETag"]
+    response = client.get(f"/posts/{post['id']}/comments", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    client.post("/comments", json={"post_id": post["id"], "content": "Second comment."})
+    response = client.get(f"/posts/{post['id']}/comments", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+def test_get_comments_etag_depends_on_page(client, create_post):
+    """Test that different pages of the same post have different ETags."""
+    post = create_post().json()
+    for i in range(3):
+        client.post("/comments", json={"post_id": post["id"], "content": f"Comment {i}."})
+
+    first = client.get(f"/posts/{post['id']}/comments", params={"limit": 2})
+    second = client.get(f"/posts/{post['id']}/comments", params={
+        "limit": 2, "cursor": first.headers["X-Next-Cursor"]
+    })
+    assert first.headers["ETag"] != second.headers["ETag"]
+
+
+def test_get_comments_conditional_not_found(client):
+    """Test that a conditional GET for a missing post is still a 404."""
+    response = client.get("/posts/999/comments", headers={"If-None-Match": "*"})
+    assert response.status_code == 404
+
+
+def test_get_posts_not_modified(client, create_post):
+    """Test that the posts list returns 304 until a post is added."""
+    create_post().json()
+    etag = client.get("/posts").headers["ETag"]
+    response = client.get("/posts", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    create_post().json()
+    response = client.get("/posts", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+def test_get_posts_etag_changes_with_new_comment(client, create_post):
+    """Test that a comment on a listed post changes the list ETag."""
+    post = create_post().json()
+    etag = client.get("/posts").headers["ETag"]
+    client.post("/comments", json={"post_id": post["id"], "content": "A comment."})
+    response = client.get("/posts", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_etag_matches():
+    """Test weak comparison of If-None-Match values."""
+    assert etag_matches('W/"a"', 'W/"a"')
+    assert etag_matches('"a"', 'W/"a"')
+    assert etag_matches('W/"b", W/"a"', 'W/"a"')
+    assert etag_matches("*", 'W/"a"')
+    assert not etag_matches('W/"b"', 'W/"a"')
+    assert not etag_matches(None, 'W/"a"')
@@ -0,0 +1,53 @@
+"""Tests for the NDJSON export endpoints."""
+import json
+
+from app import db_models
+from app.export import iter_ndjson
+from app.models import Post
+
+
+def test_export_posts_empty(client):
+    """Test exporting posts when none exist."""
+    response = client.get("/export/posts.ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.text == ""
+
+
+def test_export_posts_and_comments(client):
+    """Test that every row is exported as one JSON line."""
+    post_ids = []
+    for i in range(3):
+        response = client.post("/posts", json={
+            "title": f"Post {i}",
+            "content": f"Content of post number {i}.",
+            "author": "Author"
+        })
+        post_ids.append(response.json()["id"])
+    client.post("/comments", json={"post_id": post_ids[0], "content": "First!"})
+    client.post("/comments", json={"post_id": post_ids[2], "content": "Third!"})
+
+    posts = [json.loads(line) for line in client.get("/export/posts.ndjson").text.splitlines()]
+    assert [p["id"] for p in posts] == post_ids
+    assert posts[0]["title"] == "Post 0"
+    assert "created_at" in posts[0]
+
+    comments = [json.loads(line) for line in client.get("/export/comments.ndjson").text.splitlines()]
+    assert [(c["id"], c["post_id"]) for c in comments] == [(1, post_ids[0]), (2, post_ids[2])]
+    assert comments[1]["content"] == "Third!"
+
+
+def test_iter_ndjson_yields_one_chunk_per_batch(client, session_factory):
+    """Test that rows are streamed in batch-sized chunks."""
+    for i in range(5):
+        client.post("/posts", json={
+            "title": f"Post {i}",
+            "content": f"Content of post number {i}.",
+        })
+
+    db = session_factory()
+    try:
+        chunks = list(iter_ndjson(db, db_models.DBPost.__table__, Post, batch_size=2))
+    finally:
+        db.close()
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
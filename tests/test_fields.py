@@ -0,0 +1,124 @@
+"""Tests for sparse fieldsets and summary views on the list endpoints."""
+import pytest
+
+from app import serialization
+
+
+def _seed(client, posts=3, comments=2):
+    for i in range(posts):
+        post = client.post("/posts", json={
+            "title": f"Post {i}", "content": "Long body " * 50, "author": "Writer",
+        }).json()
+        for j in range(comments):
+            client.post("/comments", json={"post_id": post["id"], "content": f"Comment {j}"})
+
+
+def test_summary_view_reads_only_the_index(client, executed, query_plan):
+    """Test that view=summary returns four fields from a covering index scan."""
+    _seed(client)
+    executed.clear()
+    response = client.get("/posts", params={"view": "summary", "limit": 2})
+
+    assert response.status_code == 200
+    assert [list(post) for post in response.json()] == [
+        ["title", "author", "id", "created_at"]
+    ] * 2
+    (statement, parameters), = executed
+    assert "content" not in statement
+    assert "USING COVERING INDEX ix_posts_created_at_id_summary" in query_plan(
+        statement, parameters
+    )
+
+    rest = client.get("/posts", params={
+        "view": "summary", "cursor": response.headers["X-Next-Cursor"]
+    })
+    assert [post["title"] for post in rest.json()] == ["Post 2"]
+
+
+def test_fields_select_requested_columns(client, executed):
+    """Test that fields= returns those fields plus id, in model order."""
+    _seed(client, posts=1)
+    executed.clear()
+    posts = client.get("/posts", params={"fields": "comment_count, title"}).json()
+
+    assert posts == [{"title": "Post 0", "id": 1, "comment_count": 2}]
+    (statement, _), = executed
+    assert "content" not in statement
+    assert "posts.version" in statement
+
+
+def test_projected_etags(client):
+    """Test that ETags differ per projection and track mutable fields only."""
+    _seed(client, posts=1, comments=0)
+    full = client.get("/posts").headers["ETag"]
+    summary = client.get("/posts", params={"view": "summary"}).headers["ETag"]
+    counts = client.get("/posts", params={"fields": "comment_count"}).headers["ETag"]
+    assert len({full, summary, counts}) == 3
+
+    client.post("/comments", json={"post_id": 1, "content": "Changes the count"})
+    assert client.get("/posts", params={"view": "summary"},
+                      headers={"If-None-Match": summary}).status_code == 304
+    assert client.get("/posts", params={"fields": "comment_count"},
+                      headers={"If-None-Match": counts}).status_code == 200
+
+
+def test_comment_fields(client, executed):
+    """Test projections on a post's comments."""
+    _seed(client, posts=1, comments=2)
+    executed.clear()
+    summary = client.get("/posts/1/comments", params={"view": "summary"}).json()
+    assert [list(comment) for comment in summary] == [
+        ["author", "id", "post_id", "created_at"]
+    ] * 2
+    assert all("comments.content" not in statement for statement, _ in executed)
+
+    contents = client.get("/posts/1/comments", params={"fields": "content"}).json()
+    assert contents == [{"content": "Comment 0", "id": 1}, {"content": "Comment 1", "id": 2}]
+
+
+def test_projection_bypasses_comment_cache(client):
+    """Test that a projected page is never served as, or cached as, the full page."""
+    from app.cache import MemoryCache, get_cache
+    from app.main import app
+
+    cache = MemoryCache(ttl=60, max_entries=100)
+    app.dependency_overrides[get_cache] = lambda: cache
+    _seed(client, posts=1, comments=1)
+
+    client.get("/posts/1/comments", params={"view": "summary"})
+    assert cache.info()["size"] == 0
+    client.get("/posts/1/comments")
+    projected = client.get("/posts/1/comments", params={"view": "summary"}).json()
+    assert "content" not in projected[0]
+
+
+@pytest.mark.parametrize("params, detail", [
+    ({"fields": "title,body"}, "Unknown fields: body"),
+    ({"fields": " , "}, "fields must name at least one field"),
+    ({"fields": "title", "view": "summary"}, "Use either fields or view"),
+])
+def test_invalid_projections(client, params, detail):
+    """Test that unknown fields and conflicting options are rejected."""
+    response = client.get("/posts", params=params)
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith(detail)
+
+
+@pytest.mark.parametrize("params", [{"view": "summary"}, {"fields": "id"}])
+def test_fast_serializer_projection(client, monkeypatch, params):
+    """Test that the fast serializer emits the same projected JSON."""
+    _seed(client, posts=2, comments=0)
+    validated = client.get("/posts", params=params)
+    assert validated.status_code == 200
+    monkeypatch.setattr(serialization.settings, "fast_serializer", True)
+    fast = client.get("/posts", params=params)
+    assert fast.status_code == 200
+    assert fast.content == validated.content
+
+
+def test_memory_backend_projection(memory_client):
+    """Test that the in-memory store honours projections too."""
+    memory_client.post("/posts", json={"title": "Memory", "content": "Kept in memory."})
+    assert memory_client.get("/posts", params={"fields": "title"}).json() == [
+        {"title": "Memory", "id": 1}
+    ]
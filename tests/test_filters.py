@@ -0,0 +1,135 @@
+"""Tests for the author and time-range filters on the list endpoints."""
+from datetime import datetime
+from itertools import combinations
+
+import pytest
+from sqlalchemy import text
+
+BASE = datetime(2026, 1, 1)
+FILTERS = {"author": "Ada", "since": "2026-01-01T02:00:00", "until": "2026-01-01T05:00:00"}
+COMBINATIONS = [
+    dict((name, FILTERS[name]) for name in names)
+    for size in range(len(FILTERS) + 1)
+    for names in combinations(FILTERS, size)
+]
+
+
+def _seed(client, session_factory):
+    """Six posts an hour apart by alternating authors; post 1 gets six comments too."""
+    for i in range(6):
+        client.post("/posts", json={
+            "title": f"Post {i}", "content": "Filtered post.", "author": ("Ada", "Bob")[i % 2],
+        })
+        client.post("/comments", json={
+            "post_id": 1, "content": f"Comment {i}", "author": ("Ada", "Bob")[i % 2],
+        })
+    with session_factory() as db:
+        for table in ("posts", "comments"):
+            db.execute(
+                text(f"UPDATE {table} SET created_at = :base || printf(' 0%d:00:00.000000', id - 1)"),
+                {"base": BASE.date().isoformat()},
+            )
+        db.commit()
+
+
+def _titles(response):
+    assert response.status_code == 200
+    return [post["title"] for post in response.json()]
+
+
+def test_post_filters(client, session_factory):
+    """Test author, since and until alone and together."""
+    _seed(client, session_factory)
+    assert _titles(client.get("/posts", params={"author": "Ada"})) == [
+        "Post 0", "Post 2", "Post 4"
+    ]
+    assert _titles(client.get("/posts", params={"since": FILTERS["since"]})) == [
+        "Post 2", "Post 3", "Post 4", "Post 5"
+    ]
+    assert _titles(client.get("/posts", params={"until": FILTERS["until"]})) == [
+        "Post 0", "Post 1", "Post 2", "Post 3", "Post 4"
+    ]
+    assert _titles(client.get("/posts", params=FILTERS)) == ["Post 2", "Post 4"]
+    assert _titles(client.get("/posts", params={"author": "Nobody"})) == []
+
+
+def test_filtered_pages_follow_the_cursor(client, session_factory):
+    """Test that the cursor keeps the filter's order across pages."""
+    _seed(client, session_factory)
+    params = {"author": "Bob", "limit": 2}
+    first = client.get("/posts", params=params)
+    assert _titles(first) == ["Post 1", "Post 3"]
+    rest = client.get("/posts", params={**params, "cursor": first.headers["X-Next-Cursor"]})
+    assert _titles(rest) == ["Post 5"]
+    assert "X-Next-Cursor" not in rest.headers
+
+
+def test_comment_filters(client, session_factory):
+    """Test the same filters on a post's comments."""
+    _seed(client, session_factory)
+    response = client.get("/posts/1/comments", params=FILTERS)
+    assert [comment["content"] for comment in response.json()] == ["Comment 2", "Comment 4"]
+
+    # The filtered page has its own ETag and never replaces the cached full page
+    full = client.get("/posts/1/comments")
+    assert len(full.json()) == 6
+    assert full.headers["ETag"] != response.headers["ETag"]
+
+
+def test_timezone_offsets_are_converted(client, session_factory):
+    """Test that aware timestamps are compared in UTC."""
+    _seed(client, session_factory)
+    response = client.get("/posts", params={"since": "2026-01-01T06:00:00+01:00"})
+    assert _titles(response) == ["Post 5"]
+
+
+def test_empty_range_is_rejected(client):
+    response = client.get("/posts", params={"since": FILTERS["until"], "until": FILTERS["since"]})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("params", COMBINATIONS, ids=lambda p: "+".join(p) or "none")
+def test_every_filter_combination_uses_an_index(
+    client, session_factory, executed, query_plan, params
+):
+    """Test that no filter combination scans a table or sorts in a temp B-tree."""
+    _seed(client, session_factory)
+    first = client.get("/posts", params={**params, "limit": 1})
+    cursor = {"cursor": first.headers["X-Next-Cursor"]} if "X-Next-Cursor" in first.headers else {}
+    executed.clear()
+    client.get("/posts", params={**params, "limit": 1, **cursor})
+    client.get("/posts", params=params, headers={"If-None-Match": '"stale"'})
+    client.get("/posts/1/comments", params={**params, "limit": 2})
+
+    reads = [(s, p) for s, p in executed if s.lstrip().startswith("SELECT")]
+    assert len(reads) == 5
+    for statement, parameters in reads:
+        plan = query_plan(statement, parameters)
+        steps = plan.split(" | ")
+        assert all(" USING " in step for step in steps if step.startswith("SCAN")), plan
+        assert "TEMP B-TREE" not in plan, plan
+        if params and "FROM posts" in statement and "posts.id =" not in statement:
+            assert steps[0].startswith("SEARCH posts USING"), plan
+
+
+def test_memory_backend_filters(memory_client):
+    """Test that the in-memory store applies the same filters."""
+    for i in range(4):
+        memory_client.post("/posts", json={
+            "title": f"Post {i}", "content": "Kept in memory.", "author": ("Ada", "Bob")[i % 2],
+        })
+        memory_client.post("/comments", json={
+            "post_id": 1, "content": f"Comment {i}", "author": ("Ada", "Bob")[i % 2],
+        })
+    assert _titles(memory_client.get("/posts", params={"author": "Bob"})) == ["Post 1", "Post 3"]
+    second = memory_client.get("/posts").json()[1]["created_at"]
+    assert _titles(memory_client.get("/posts", params={"author": "Ada", "since": second})) == [
+        "Post 2"
+    ]
+    assert _titles(memory_client.get("/posts", params={"until": second})) == ["Post 0"]
+    comments = memory_client.get("/posts/1/comments", params={"author": "Ada", "limit": 1})
+    assert [c["content"] for c in comments.json()] == ["Comment 0"]
+    rest = memory_client.get("/posts/1/comments", params={
+        "author": "Ada", "cursor": comments.headers["X-Next-Cursor"]
+    })
+    assert [c["content"] for c in rest.json()] == ["Comment 2"]
@@ -0,0 +1,150 @@
+"""Tests for Idempotency-Key replays on the create endpoints."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import crud
+from app.config import Settings
+from app.idempotency import (
+    MemoryIdempotencyStore, StoredResult, get_idempotency_store, make_idempotency_store,
+)
+from app.main import app
+
+POST = {"title": "Once", "content": "Created exactly once.", "author": "Retrier"}
+
+
+@pytest.fixture
+def store(client):
+    """Enable a fresh idempotency store for the test client."""
+    store = MemoryIdempotencyStore(max_entries=100, ttl=60)
+    app.dependency_overrides[get_idempotency_store] = lambda: store
+    return store
+
+
+def _post(client, key, payload=POST):
+    return client.post("/posts", json=payload, headers={"Idempotency-Key": key})
+
+
+def test_replay_returns_first_response_without_sql(client, store, sql_statements):
+    """Test that a retry gets the original 201 and runs no statements."""
+    first = _post(client, "key-1")
+    sql_statements.clear()
+    replay = _post(client, "key-1")
+
+    assert replay.status_code == 201
+    assert replay.json() == first.json()
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert sql_statements == []
+    assert len(client.get("/posts").json()) == 1
+
+
+def test_comment_replay(client, store):
+    """Test that comments are deduplicated and the post is updated once."""
+    post_id = client.post("/posts", json=POST).json()["id"]
+    comment = {"post_id": post_id, "content": "Only once."}
+    headers = {"Idempotency-Key": "comment-1"}
+    first = client.post("/comments", json=comment, headers=headers)
+    replay = client.post("/comments", json=comment, headers=headers)
+
+    assert replay.status_code == 201
+    assert replay.json() == first.json()
+    assert client.get(f"/posts/{post_id}").json()["comment_count"] == 1
+
+
+def test_key_reused_with_other_payload(client, store):
+    """Test that a key cannot be reused for different data."""
+    _post(client, "key-1")
+    response = _post(client, "key-1", {**POST, "title": "Something else"})
+    assert response.status_code == 422
+    assert len(client.get("/posts").json()) == 1
+
+
+def test_failures_are_not_stored(client, store):
+    """Test that a failed request can be retried with the same key."""
+    headers = {"Idempotency-Key": "early"}
+    comment = {"post_id": 1, "content": "Before the post exists."}
+    assert client.post("/comments", json=comment, headers=headers).status_code == 404
+
+    client.post("/posts", json=POST)
+    response = client.post("/comments", json=comment, headers=headers)
+    assert response.status_code == 201
+    assert "Idempotent-Replayed" not in response.headers
+
+
+def test_keys_are_scoped_per_endpoint(client, store):
+    """Test that the same key on posts and comments names two requests."""
+    post_id = _post(client, "shared").json()["id"]
+    response = client.post("/comments", json={"post_id": post_id, "content": "Hi"},
+                           headers={"Idempotency-Key": "shared"})
+    assert response.status_code == 201
+    assert "Idempotent-Replayed" not in response.headers
+
+
+def test_invalid_key(client, store):
+    assert _post(client, "x" * 256).status_code == 400
+    assert _post(client, "").status_code == 400
+
+
+def test_keys_ignored_by_default(client):
+    """Test that without a store every request creates a row."""
+    assert get_idempotency_store() is None
+    _post(client, "key-1")
+    _post(client, "key-1")
+    assert len(client.get("/posts").json()) == 2
+
+
+def test_store_expires_and_evicts():
+    """Test the TTL and the LRU bound of the memory store."""
+    now = [0.0]
+    store = MemoryIdempotencyStore(max_entries=2, ttl=10, clock=lambda: now[0])
+    for key in ("a", "b", "c"):
+        store.set(key, StoredResult("digest", key))
+    assert len(store) == 2
+    assert store.get("a") is None
+    assert store.get("b").value == "b"
+
+    now[0] = 11
+    assert store.get("b") is None
+    with pytest.raises(ValueError):
+        make_idempotency_store(Settings(idempotency_backend="bogus"))
+
+
+# Threads write at once, so each needs its own connection
+@pytest.mark.file_database
+def test_concurrent_retries_create_one_row_per_key(client, store, monkeypatch):
+    """Stress test: many simultaneous retries of each key insert one row each."""
+    create_post = crud.create_post
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow_create_post(db, post):
+        # Widen the race window so unserialized retries would overlap
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.02)
+        try:
+            return create_post(db, post)
+        finally:
+            with lock:
+                in_flight[0] -= 1
+
+    monkeypatch.setattr(crud, "create_post", slow_create_post)
+    keys = [f"retry-{i}" for i in range(8)] * 10
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        responses = list(pool.map(
+            lambda key: _post(client, key, {**POST, "title": key}), keys
+        ))
+
+    assert {response.status_code for response in responses} == {201}
+    ids = {}
+    for key, response in zip(keys, responses):
+        ids.setdefault(key, set()).add(response.json()["id"])
+    assert all(len(post_ids) == 1 for post_ids in ids.values())
+    posts = client.get("/posts").json()
+    assert sorted(post["title"] for post in posts) == sorted(set(keys))
+    assert peak[0] > 1  # different keys still ran in parallel
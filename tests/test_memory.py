@@ -0,0 +1,156 @@
+"""Tests for the in-memory storage backend."""
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+from app.config import Settings
+from app.models import CommentCreate, PostCreate
+from app.repository import MemoryRepository, make_store
+
+
+def _post(i):
+    return {"title": f"Memory Post {i}", "content": f"Content of memory post {i}."}
+
+
+def test_create_and_get_post(memory_client):
+    """Test that posts round-trip with the same shape as the SQL backend."""
+    response = memory_client.post("/posts", json={**_post(0), "author": "Author"})
+    assert response.status_code == 201
+    post = response.json()
+    assert post["id"] == 1
+    assert post["author"] == "Author"
+    assert post["comment_count"] == 0
+    assert post["last_comment_at"] is None
+
+    assert memory_client.get("/posts/1").json() == post
+    assert memory_client.get("/posts/2").status_code == 404
+
+
+def test_comments_update_post_summary(memory_client):
+    """Test comment creation, listing and the denormalized summary."""
+    memory_client.post("/posts", json=_post(0))
+    for i in range(3):
+        response = memory_client.post("/comments", json={"post_id": 1, "content": f"Comment {i}"})
+        assert response.status_code == 201
+
+    comments = memory_client.get("/posts/1/comments").json()
+    assert [c["content"] for c in comments] == ["Comment 0", "Comment 1", "Comment 2"]
+    post = memory_client.get("/posts/1").json()
+    assert post["comment_count"] == 3
+    assert post["last_comment_at"] == comments[-1]["created_at"]
+
+
+def test_missing_post_returns_404(memory_client):
+    """Test that comments on missing posts are rejected."""
+    response = memory_client.post("/comments", json={"post_id": 9, "content": "Orphan"})
+    assert response.status_code == 404
+    assert memory_client.get("/posts/9/comments").status_code == 404
+
+
+def test_keyset_pagination(memory_client):
+    """Test that cursors walk every post exactly once."""
+    memory_client.post("/posts/bulk", json=[_post(i) for i in range(7)])
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = memory_client.get("/posts", params=params)
+        seen += [p["id"] for p in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == list(range(1, 8))
+
+
+def test_conditional_get(memory_client):
+    """Test that ETags change when a comment is added."""
+    memory_client.post("/posts", json=_post(0))
+    etag = memory_client.get("/posts/1").headers["ETag"]
+    assert memory_client.get("/posts/1", headers={"If-None-Match": etag}).status_code == 304
+
+    memory_client.post("/comments", json={"post_id": 1, "content": "Changes it"})
+    assert memory_client.get("/posts/1", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_bulk_comments_report_missing_posts(memory_client):
+    """Test that bulk comments on missing posts are reported by index."""
+    memory_client.post("/posts", json=_post(0))
+    response = memory_client.post("/comments/bulk", json=[
+        {"post_id": 1, "content": "Kept"},
+        {"post_id": 5, "content": "Dropped"},
+    ])
+    data = response.json()
+    assert [c["id"] for c in data["created"]] == [1]
+    assert data["errors"] == [{"index": 1, "detail": "Post not found"}]
+
+
+def test_search_and_export(memory_client):
+    """Test the scan-based search and the NDJSON export."""
+    memory_client.post("/posts/bulk", json=[
+        {"title": "Gardening tips", "content": "Tomatoes need sun."},
+        {"title": "Cooking", "content": "Pasta with TOMATOES."},
+    ])
+    memory_client.post("/comments", json={"post_id": 1, "content": "More tomatoes please"})
+
+    results = memory_client.get("/search", params={"q": "tomatoes"}).json()
+    assert [(r["kind"], r["id"]) for r in results] == [("post", 1), ("comment", 1), ("post", 2)]
+
+    first = memory_client.get("/search", params={"q": "tomatoes", "limit": 2})
+    rest = memory_client.get("/search", params={
+        "q": "tomatoes", "cursor": first.headers["X-Next-Cursor"],
+    })
+    assert [r["id"] for r in rest.json()] == [2]
+
+    lines = memory_client.get("/export/comments.ndjson").text.splitlines()
+    assert [json.loads(line)["content"] for line in lines] == ["More tomatoes please"]
+
+
+def test_concurrent_writes_are_consistent():
+    """Test that the lock keeps ids unique and counters exact under threads."""
+    store = MemoryRepository()
+    post = store.create_post(PostCreate(**_post(0)))
+    ids, lock = [], threading.Lock()
+
+    def write():
+        created = [store.create_comment(CommentCreate(post_id=post.id, content="Hi there"))
+                   for _ in range(200)]
+        with lock:
+            ids.extend(c.id for c in created)
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(ids) == list(range(1, 1601))
+    assert store.get_post(post.id).comment_count == 1600
+    assert store.get_post(post.id).version == 1601
+    assert len(store.list_comments(post.id, None, 2000)[0]) == 1600
+
+
+def test_out_of_order_clock_keeps_pages_sorted(monkeypatch):
+    """Test that a clock step backwards does not break keyset order."""
+    store = MemoryRepository()
+    times = iter([datetime(2024, 1, 2), datetime(2024, 1, 1), datetime(2024, 1, 3)])
+
+    class Clock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return next(times)
+
+    monkeypatch.setattr("app.repository.datetime", Clock)
+    for i in range(3):
+        store.create_post(PostCreate(**_post(i)))
+
+    rows, _ = store.list_posts(None, 10)
+    assert [row.id for row in rows] == [2, 1, 3]
+
+
+def test_make_store_selects_backend():
+    """Test that STORAGE_BACKEND picks the backend."""
+    assert make_store(Settings(storage_backend="sqlalchemy")) is None
+    assert isinstance(make_store(Settings(storage_backend="memory")), MemoryRepository)
+    with pytest.raises(ValueError):
+        make_store(Settings(storage_backend="files"))
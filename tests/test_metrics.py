@@ -0,0 +1,152 @@
+import logging
+import re
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import metrics
+from app.config import Settings
+from app.database import make_engine
+
+
+def server_timing(response):
+    return dict(
+        (name, params) for name, _, params in
+        (part.strip().partition(";") for part in response.headers["server-timing"].split(","))
+    )
+
+
+# Counts statements, so the rollback fixture's SAVEPOINTs would show up
+@pytest.mark.file_database
+def test_server_timing_reports_sql(client):
+    post = client.post("/posts", json={"title": "Metrics", "content": "Some content"}).json()
+    client.post("/comments", json={"post_id": post["id"], "author": "Ann", "content": "A comment"})
+
+    response = client.get(f"/posts/{post['id']}/comments")
+    timing = server_timing(response)
+    assert 'desc="2 queries"' in timing["sql"]
+    assert "validate" in timing and "encode" in timing
+    assert re.match(r"dur=\d+\.\d{3}$", timing["total"])
+
+
+@pytest.mark.file_database
+def test_metrics_endpoint_exposes_route_histograms(client):
+    metrics.REQUEST_DURATION.clear()
+    metrics.REQUEST_SQL_STATEMENTS.clear()
+    client.post("/posts", json={"title": "Metrics", "content": "Some content"})
+    client.get("/posts/1")
+    client.get("/posts/999")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert ('http_request_duration_seconds_count'
+            '{method="GET",route="/posts/{post_id}",status="200"} 1') in text
+    assert ('http_request_duration_seconds_count'
+            '{method="GET",route="/posts/{post_id}",status="404"} 1') in text
+    # POST /posts is a single INSERT ... RETURNING
+    assert 'http_request_sql_statements_bucket{route="/posts",le="1"} 1' in text
+    assert 'cache_hits_total{backend="none"} 0' in text
+
+
+def test_unmatched_routes_share_one_label(client):
+    metrics.REQUEST_DURATION.clear()
+    client.get("/no/such/path")
+    client.get("/another/missing/path")
+    text = client.get("/metrics").text
+    assert ('http_request_duration_seconds_count'
+            '{method="GET",route="unmatched",status="404"} 2') in text
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("h", "test", ("route",), buckets=(1, 5))
+    for value in (0.5, 3, 3, 10):
+        histogram.observe(value, 'a"b')
+    lines = histogram.render()
+    assert 'h_bucket{route="a\\"b",le="1"} 1' in lines
+    assert 'h_bucket{route="a\\"b",le="5"} 3' in lines
+    assert 'h_bucket{route="a\\"b",le="+Inf"} 4' in lines
+    assert 'h_sum{route="a\\"b"} 16.5' in lines
+    assert 'h_count{route="a\\"b"} 4' in lines
+
+
+def test_pool_checkout_wait_is_recorded(tmp_path):
+    engine = make_engine(Settings(), url=f"sqlite:///{tmp_path}/pool.db")
+    assert isinstance(engine.pool, metrics.InstrumentedQueuePool)
+    stats = metrics.RequestStats()
+    token = metrics._current.set(stats)
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+    finally:
+        metrics._current.reset(token)
+        engine.dispose()
+    assert stats.sql_count == 1
+    assert stats.pool_wait > 0
+
+
+def test_metrics_can_be_disabled(tmp_path):
+    engine = make_engine(Settings(metrics_enabled=False), url=f"sqlite:///{tmp_path}/off.db")
+    assert not isinstance(engine.pool, metrics.InstrumentedQueuePool)
+    engine.dispose()
+
+
+def test_instrument_engine_is_idempotent():
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine)
+    metrics.instrument_engine(engine)
+    stats = metrics.RequestStats()
+    token = metrics._current.set(stats)
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+    finally:
+        metrics._current.reset(token)
+    assert stats.sql_count == 1
+
+
+@pytest.fixture
+def slow_log(db_engine):
+    """Log every statement of the test database as slow."""
+    log = metrics.SlowQueryLog(0.0, max_param_chars=40)
+    log.attach(db_engine)
+    yield log
+    log.detach(db_engine)
+
+
+@pytest.mark.file_database
+def test_slow_query_log_records_route_and_parameters(client, slow_log, caplog):
+    """Test that a slow statement is logged with its parameters and route."""
+    client.post("/posts", json={"title": "Slow", "content": "Logged statement."})
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger="app.slow_query"):
+        client.get("/posts/1")
+
+    record, = caplog.records
+    message = record.getMessage()
+    assert "route=GET /posts/{post_id}" in message
+    assert "FROM posts WHERE posts.id = ?" in message
+    assert "parameters=(1,)" in message
+    assert record.duration_ms >= 0
+
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger="app.slow_query"):
+        client.post("/posts", json={"title": "x" * 60, "content": "Long parameters."})
+    assert caplog.records[0].getMessage().endswith("...")
+
+
+def test_slow_query_threshold(tmp_path, caplog):
+    """Test that SLOW_QUERY_MS attaches the log and fast statements pass silently."""
+    engine = make_engine(Settings(slow_query_ms=20), url=f"sqlite:///{tmp_path}/slow.db")
+    with caplog.at_level(logging.WARNING, logger="app.slow_query"):
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+            conn.exec_driver_sql(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000000)"
+                " SELECT count(*) FROM n"
+            )
+    engine.dispose()
+    record, = caplog.records
+    assert "route=-" in record.getMessage()
+    assert "RECURSIVE" in record.getMessage()
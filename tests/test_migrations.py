@@ -0,0 +1,238 @@
+"""Tests for the Alembic migrations and the app factory."""
+import subprocess
+import sys
+from contextlib import contextmanager
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app import migrate
+from app.config import Settings
+from app.database import Base, get_db, get_read_db
+from app.main import app, create_app
+from app.migrate import current_revision, downgrade, head_revision, include_name, upgrade
+
+
+# The schema the first release built with create_all at import
+BASELINE_DDL = [
+    """CREATE TABLE posts (
+        id INTEGER NOT NULL,
+        title VARCHAR(100) NOT NULL,
+        content VARCHAR(5000) NOT NULL,
+        author VARCHAR(50),
+        created_at DATETIME,
+        PRIMARY KEY (id)
+    )""",
+    "CREATE INDEX ix_posts_id ON posts (id)",
+    """CREATE TABLE comments (
+        id INTEGER NOT NULL,
+        post_id INTEGER NOT NULL,
+        content VARCHAR(300) NOT NULL,
+        author VARCHAR(50),
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(post_id) REFERENCES posts (id)
+    )""",
+    "CREATE INDEX ix_comments_id ON comments (id)",
+]
+
+
+def _create_baseline(engine):
+    with engine.begin() as conn:
+        for ddl in BASELINE_DDL:
+            conn.exec_driver_sql(ddl)
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'migrated.db'}"
+
+
+def _schema_diff(url):
+    engine = create_engine(url)
+    try:
+        with engine.connect() as conn:
+            context = MigrationContext.configure(conn, opts={"include_name": include_name})
+            return compare_metadata(context, Base.metadata)
+    finally:
+        engine.dispose()
+
+
+def _names(url, kind):
+    engine = create_engine(url)
+    try:
+        with engine.connect() as conn:
+            return {row[0] for row in conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = :kind"), {"kind": kind}
+            )}
+    finally:
+        engine.dispose()
+
+
+def test_upgrade_matches_models(db_url):
+    """Test that the migrations build exactly the schema the models declare."""
+    upgrade(db_url)
+    assert current_revision(db_url) == head_revision()
+    assert _schema_diff(db_url) == []
+    assert {"search_posts_ai", "search_comments_ai"} <= _names(db_url, "trigger")
+    assert "search_index" in _names(db_url, "table")
+
+
+def test_search_index_is_populated_after_upgrade(db_url):
+    """Test that the FTS triggers installed by the migration index new rows."""
+    upgrade(db_url)
+    engine = create_engine(db_url)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO posts (title, content, created_at) "
+            "VALUES ('Tomatoes', 'Grow them.', CURRENT_TIMESTAMP)"
+        ))
+        hits = conn.execute(text(
+            "SELECT count(*) FROM search_index WHERE search_index MATCH 'tomatoes'"
+        )).scalar()
+    engine.dispose()
+    assert hits == 1
+
+
+def test_search_index_does_not_depend_on_search_backend(db_url, monkeypatch):
+    """Test that migrating under SEARCH_BACKEND=like still creates the FTS5 index."""
+    from app import search
+
+    monkeypatch.setattr(search, "search_index", search.LikeSearchIndex())
+    upgrade(db_url)
+    assert "search_index" in _names(db_url, "table")
+    assert "search_comments_ai" in _names(db_url, "trigger")
+
+
+def test_downgrade_removes_schema(db_url):
+    """Test that downgrading to base drops every table and trigger."""
+    upgrade(db_url)
+    downgrade(db_url, "base")
+    assert current_revision(db_url) is None
+    assert _names(db_url, "table") == {"alembic_version"}
+    assert _names(db_url, "trigger") == set()
+
+
+def test_initial_revision_is_the_baseline_schema(db_url, tmp_path):
+    """Test that revision 0001 builds what the first release's create_all did."""
+    upgrade(db_url, "0001")
+    baseline_url = f"sqlite:///{tmp_path / 'baseline.db'}"
+    engine = create_engine(baseline_url)
+    _create_baseline(engine)
+    engine.dispose()
+    for kind in ("table", "index", "trigger"):
+        migrated = {name for name in _names(db_url, kind) if "alembic_version" not in name}
+        assert migrated == _names(baseline_url, kind)
+
+
+@contextmanager
+def _app_client(url):
+    """A test client whose sessions use the database at ``url``."""
+    engine = create_engine(url)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    def override_get_db():
+        with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+
+def test_baseline_database_is_stamped_and_upgraded(db_url):
+    """Test that a first-release database gets the new columns, data and index."""
+    engine = create_engine(db_url)
+    _create_baseline(engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO posts (title, content, created_at) "
+            "VALUES ('Kept', 'Existing tomatoes.', '2026-01-01 00:00:00')"
+        ))
+        conn.execute(text(
+            "INSERT INTO comments (post_id, content, created_at) "
+            "VALUES (1, 'First', '2026-01-02 00:00:00'), (1, 'Second', '2026-01-03 00:00:00')"
+        ))
+    engine.dispose()
+
+    upgrade(db_url)
+    assert current_revision(db_url) == head_revision()
+    assert _schema_diff(db_url) == []
+
+    with _app_client(db_url) as client:
+        posts = client.get("/posts")
+        assert posts.status_code == 200
+        assert [post["title"] for post in posts.json()] == ["Kept"]
+        post = client.get("/posts/1").json()
+        assert post["comment_count"] == 2
+        assert post["last_comment_at"].startswith("2026-01-03")
+        hits = client.get("/search", params={"q": "tomatoes"}).json()
+        assert [(hit["kind"], hit["id"]) for hit in hits] == [("post", 1)]
+        assert client.post("/comments", json={"post_id": 1, "content": "Third"}).status_code == 201
+        assert client.get("/posts/1").json()["comment_count"] == 3
+
+
+def test_create_all_database_is_stamped(db_url):
+    """Test that a database made by a later create_all is adopted as it is."""
+    engine = create_engine(db_url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO posts (title, content, created_at) "
+            "VALUES ('Kept', 'Existing row.', CURRENT_TIMESTAMP)"
+        ))
+    engine.dispose()
+
+    upgrade(db_url)
+    assert current_revision(db_url) == head_revision()
+    assert _schema_diff(db_url) == []
+    with _app_client(db_url) as client:
+        assert [post["title"] for post in client.get("/posts").json()] == ["Kept"]
+        assert len(client.get("/search", params={"q": "existing"}).json()) == 1
+
+
+def test_import_runs_no_ddl(tmp_path):
+    """Test that importing the app no longer touches the database."""
+    subprocess.run(
+        [sys.executable, "-c", "import app.main"],
+        cwd=tmp_path,
+        env={"PYTHONPATH": str(migrate.REPO_ROOT)},
+        check=True,
+    )
+    assert not (tmp_path / "fastapi_app.db").exists()
+
+
+def test_migrate_on_startup(db_url, monkeypatch):
+    """Test that MIGRATE_ON_STARTUP applies the schema in the lifespan."""
+    calls = []
+    monkeypatch.setattr(migrate, "upgrade", lambda url: calls.append(url))
+    with TestClient(create_app(Settings(database_url=db_url))):
+        pass
+    assert calls == []
+
+    monkeypatch.undo()
+    with TestClient(create_app(Settings(database_url=db_url, migrate_on_startup=True))):
+        pass
+    assert current_revision(db_url) == head_revision()
+
+
+@pytest.mark.parametrize("config", [
+    Settings(storage_backend="memory"),
+    Settings(idempotency_backend="memory"),
+])
+def test_serve_refuses_per_process_state_with_workers(monkeypatch, config):
+    """Test that the runner rejects backends that cannot be shared by workers."""
+    from app import serve
+
+    monkeypatch.setattr(serve, "settings", config)
+    with pytest.raises(SystemExit):
+        serve.main(["--workers", "2"])
@@ -0,0 +1,80 @@
+"""Tests for keyset pagination on list endpoints."""
+
+
+def _create_posts(client, count):
+    ids = []
+    for i in range(count):
+        response = client.post("/posts", json={
+            "title": f"Post {i}",
+            "content": f"Content of post number {i}.",
+            "author": "Author"
+        })
+        ids.append(response.json()["id"])
+    return ids
+
+
+def test_get_posts_pages_with_cursor(client):
+    """Test walking all posts page by page using X-Next-Cursor."""
+    ids = _create_posts(client, 5)
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/posts", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen.extend(post["id"] for post in page)
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == ids
+    assert pages == 3
+
+
+def test_get_posts_last_page_has_no_cursor(client):
+    """Test that a page holding every remaining row has no next cursor."""
+    _create_posts(client, 2)
+    response = client.get("/posts", params={"limit": 2})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_posts_invalid_cursor(client):
+    """Test that a malformed cursor is rejected."""
+    response = client.get("/posts", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_get_posts_limit_is_bounded(client):
+    """Test that page size must be within the allowed range."""
+    assert client.get("/posts", params={"limit": 0}).status_code == 422
+    assert client.get("/posts", params={"limit": 201}).status_code == 422
+
+
+def test_get_comments_pages_with_cursor(client):
+    """Test paging through the comments of one post."""
+    post_id = _create_posts(client, 1)[0]
+    for i in range(3):
+        client.post("/comments", json={
+            "post_id": post_id,
+            "content": f"Comment {i}.",
+        })
+
+    first = client.get(f"/posts/{post_id}/comments", params={"limit": 2})
+    assert [c["id"] for c in first.json()] == [1, 2]
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get(
+        f"/posts/{post_id}/comments", params={"limit": 2, "cursor": cursor}
+    )
+    assert [c["id"] for c in second.json()] == [3]
+    assert "X-Next-Cursor" not in second.headers
@@ -129,3 +129,94 @@ def test_create_post_without_optional_author(client):
     assert response.status_code == 201
     data = response.json()
     assert data["author"] is None
+
+
+def test_post_comment_summary(client):
+    """Test that posts report their comment count and latest comment time."""
+    response = client.post("/posts", json={
+        "title": "Test Post",
+        "content": "This is a test post."
+    })
+    post = response.json()
+    assert post["comment_count"] == 0
+    assert post["last_comment_at"] is None
+
+    client.post("/comments", json={"post_id": post["id"], "content": "First comment."})
+    latest = client.post("/comments", json={
+        "post_id": post["id"], "content": "Second comment."
+    }).json()
+
+    data = client.get(f"/posts/{post['id']}").json()
+    assert data["comment_count"] == 2
+    assert data["last_comment_at"] == latest["created_at"]
+
+    listed = client.get("/posts").json()[0]
+    assert listed["comment_count"] == 2
+    assert listed["last_comment_at"] == latest["created_at"]
+
+
+def test_post_comment_summary_after_bulk(client):
+    """Test that bulk comments update the comment summary of each post."""
+    client.post("/posts/bulk", json=[
+        {"title": "First Post", "content": "Content of first post."},
+        {"title": "Second Post", "content": "Content of second post."},
+    ])
+    created = client.post("/comments/bulk", json=[
+        {"post_id": 1, "content": "One."},
+        {"post_id": 1, "content": "Two."},
+        {"post_id": 2, "content": "Three."},
+    ]).json()["created"]
+
+    posts = client.get("/posts").json()
+    assert [p["comment_count"] for p in posts] == [2, 1]
+    assert posts[0]["last_comment_at"] == created[-1]["created_at"]
+
+
+def test_get_post_with_comments(client):
+    """Test that include=comments embeds the first page of comments."""
+    post = client.post("/posts", json={
+        "title": "Test Post", "content": "This is a test post."
+    }).json()
+    client.post("/comments/bulk", json=[
+        {"post_id": post["id"], "content": f"Comment {i}."} for i in range(55)
+    ])
+
+    response = client.get(f"/posts/{post['id']}", params={"include": "comments"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["title"] == "Test Post"
+    assert data["comment_count"] == 55
+    assert [c["content"] for c in data["comments"][:2]] == ["Comment 0.", "Comment 1."]
+    assert len(data["comments"]) == 50
+
+    rest = client.get(f"/posts/{post['id']}/comments", params={
+        "cursor": response.headers["X-Next-Cursor"]
+    }).json()
+    assert len(rest) == 5
+    assert client.get(f"/posts/{post['id']}").json() == {
+        key: value for key, value in data.items() if key != "comments"
+    }
+
+
+def test_get_post_with_comments_not_found(client):
+    """Test that include=comments on a missing post returns 404."""
+    response = client.get("/posts/999", params={"include": "comments"})
+    assert response.status_code == 404
+    assert client.get("/posts/999", params={"include": "authors"}).status_code == 422
+
+
+def test_get_post_with_comments_etag(client):
+    """Test that the embedded page revalidates when a comment is added."""
+    post = client.post("/posts", json={
+        "title": "Test Post", "content": "This is a test post."
+    }).json()
+    url = f"/posts/{post['id']}"
+    etag = client.get(url, params={"include": "comments"}).headers["ETag"]
+    assert etag != client.get(url).headers["ETag"]
+    assert client.get(url, params={"include": "comments"},
+                      headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/comments", json={"post_id": post["id"], "content": "New comment."})
+    response = client.get(url, params={"include": "comments"}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [c["content"] for c in response.json()["comments"]] == ["New comment."]
@@ -0,0 +1,116 @@
+"""Regression tests for the number of SQL statements each endpoint emits."""
+import pytest
+
+
+@pytest.fixture
+def post_id(client):
+    response = client.post("/posts", json={
+        "title": "Test Post",
+        "content": "This is a test post.",
+        "author": "Post Author"
+    })
+    post_id = response.json()["id"]
+    for i in range(3):
+        client.post("/comments", json={"post_id": post_id, "content": f"Comment {i}."})
+    return post_id
+
+
+def test_create_post_statements(client, sql_statements):
+    """Test that creating a post is a single INSERT ... RETURNING."""
+    client.post("/posts", json={"title": "New Post", "content": "Some new content."})
+    assert len(sql_statements) == 1
+    assert sql_statements[0].startswith("INSERT INTO posts")
+    assert "RETURNING" in sql_statements[0]
+
+
+def test_create_comment_statements(client, post_id, sql_statements):
+    """Test that a comment is a version UPDATE plus INSERT ... RETURNING."""
+    response = client.post("/comments", json={"post_id": post_id, "content": "Another."})
+    assert response.status_code == 201
+    assert len(sql_statements) == 2
+    assert sql_statements[0].startswith("UPDATE posts")
+    assert sql_statements[1].startswith("INSERT INTO comments")
+
+
+def test_create_comment_missing_post_statements(client, sql_statements):
+    """Test that a comment on a missing post stops after the UPDATE."""
+    response = client.post("/comments", json={"post_id": 999, "content": "Orphan."})
+    assert response.status_code == 404
+    assert len(sql_statements) == 1
+
+
+def test_get_posts_statements(client, post_id, sql_statements):
+    client.get("/posts")
+    assert len(sql_statements) == 1
+
+
+def test_get_post_statements(client, post_id, sql_statements):
+    client.get(f"/posts/{post_id}")
+    assert len(sql_statements) == 1
+
+
+def test_get_comments_statements(client, post_id, sql_statements):
+    """Test that listing comments is a version lookup plus one page query."""
+    response = client.get(f"/posts/{post_id}/comments")
+    assert len(response.json()) == 3
+    assert len(sql_statements) == 2
+
+
+def test_get_comments_not_modified_statements(client, post_id, sql_statements):
+    """Test that a 304 never reads comment rows."""
+    etag = client.get(f"/posts/{post_id}/comments").headers["ETag"]
+    sql_statements.clear()
+    response = client.get(f"/posts/{post_id}/comments", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(sql_statements) == 1
+    assert "FROM posts" in sql_statements[0]
+
+
+def test_get_post_with_comments_statements(client, post_id, sql_statements):
+    """Test that a post page is two statements in one request, not three in two."""
+    response = client.get(f"/posts/{post_id}", params={"include": "comments"})
+    assert len(response.json()["comments"]) == 3
+    assert len(sql_statements) == 2
+    assert "FROM posts" in sql_statements[0]
+    assert "FROM comments" in sql_statements[1]
+
+
+def test_get_post_with_comments_not_modified_statements(client, post_id, sql_statements):
+    """Test that revalidating a post page only reads the post's version."""
+    etag = client.get(f"/posts/{post_id}", params={"include": "comments"}).headers["ETag"]
+    sql_statements.clear()
+    response = client.get(
+        f"/posts/{post_id}", params={"include": "comments"}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert len(sql_statements) == 1
+
+
+def test_bulk_statements(client, post_id, sql_statements):
+    """Test that bulk creates do not issue one statement per item."""
+    client.post("/posts/bulk", json=[
+        {"title": f"Bulk {i}", "content": "Bulk content."} for i in range(10)
+    ])
+    assert len(sql_statements) == 1
+
+    sql_statements.clear()
+    client.post("/comments/bulk", json=[
+        {"post_id": post_id, "content": f"Bulk comment {i}."} for i in range(10)
+    ])
+    # IN check, multi-row INSERT, version UPDATE
+    assert len(sql_statements) == 3
+
+
+def test_get_posts_with_comment_summary_is_one_statement(client, sql_statements):
+    """Test that comment counts on a full page do not add per-row queries."""
+    client.post("/posts/bulk", json=[
+        {"title": f"Post {i}", "content": "Some content."} for i in range(50)
+    ])
+    client.post("/comments/bulk", json=[
+        {"post_id": i % 50 + 1, "content": f"Comment {i}."} for i in range(200)
+    ])
+    sql_statements.clear()
+
+    posts = client.get("/posts", params={"limit": 50}).json()
+    assert all(post["comment_count"] == 4 for post in posts)
+    assert len(sql_statements) == 1
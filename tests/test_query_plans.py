@@ -0,0 +1,107 @@
+"""Query-plan regression harness for the API endpoints.
+
+Every case sends one request to a seeded database and records each SQL
+statement the endpoint runs, together with SQLite's EXPLAIN QUERY PLAN. The
+case fails when the statement count rises above the one recorded in
+``query_plans.json``. It also fails when a plan gains a ``SCAN`` or temp
+B-tree step that the baseline does not list. The listed ones are deliberate,
+e.g. walking the pagination index in order or exporting every row.
+
+After an intended change, refresh the baseline and review its diff::
+
+    UPDATE_QUERY_PLANS=1 python -m pytest tests/test_query_plans.py
+"""
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+BASELINE = Path(__file__).with_name("query_plans.json")
+UPDATE = os.environ.get("UPDATE_QUERY_PLANS") == "1"
+
+POST = {"title": "Planned post", "content": "Content for the query plan run.", "author": "Ada"}
+COMMENT = {"post_id": 3, "content": "Planned comment.", "author": "Bob"}
+SINCE = "2000-01-01T00:00:00"
+
+# name -> (method, url, request keyword arguments)
+CASES = {
+    "POST /posts": ("POST", "/posts", {"json": POST}),
+    "POST /posts/bulk": ("POST", "/posts/bulk", {"json": [POST] * 5}),
+    "GET /posts": ("GET", "/posts", {}),
+    "GET /posts conditional": ("GET", "/posts", {"headers": {"If-None-Match": '"stale"'}}),
+    "GET /posts?view=summary": ("GET", "/posts", {"params": {"view": "summary"}}),
+    "GET /posts?author": ("GET", "/posts", {"params": {"author": "Ada"}}),
+    "GET /posts?author&since": ("GET", "/posts", {"params": {"author": "Ada", "since": SINCE}}),
+    "GET /posts?since": ("GET", "/posts", {"params": {"since": SINCE}}),
+    "GET /posts/{post_id}": ("GET", "/posts/3", {}),
+    "GET /posts/{post_id}?include=comments": (
+        "GET", "/posts/3", {"params": {"include": "comments"}}
+    ),
+    "GET /posts/{post_id}/comments": ("GET", "/posts/3/comments", {}),
+    "GET /posts/{post_id}/comments?author&since": (
+        "GET", "/posts/3/comments", {"params": {"author": "Bob", "since": SINCE}}
+    ),
+    "POST /comments": ("POST", "/comments", {"json": COMMENT}),
+    "POST /comments/bulk": ("POST", "/comments/bulk", {"json": [COMMENT] * 5}),
+    "GET /search": ("GET", "/search", {"params": {"q": "planned"}}),
+    "GET /export/posts.ndjson": ("GET", "/export/posts.ndjson", {}),
+    "GET /export/comments.ndjson": ("GET", "/export/comments.ndjson", {}),
+}
+
+
+def flagged_steps(plan: str) -> list:
+    """Plan steps that read a whole table or index, or sort in a temp B-tree."""
+    return [
+        step for step in plan.split(" | ")
+        if (step.startswith("SCAN") and not step.endswith("CONSTANT ROWS"))
+        or "TEMP B-TREE" in step
+    ]
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    recorded = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    yield recorded
+    if UPDATE:
+        BASELINE.write_text(json.dumps(recorded, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture
+def seeded(client):
+    """Thirty posts by two authors with three comments each."""
+    client.post("/posts/bulk", json=[
+        {**POST, "title": f"Post {i}", "author": ("Ada", "Bob")[i % 2]} for i in range(30)
+    ])
+    client.post("/comments/bulk", json=[
+        {**COMMENT, "post_id": i % 30 + 1, "author": ("Ada", "Bob")[i % 2]} for i in range(90)
+    ])
+    return client
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_query_plan(name, seeded, executed, query_plan, baseline):
+    method, url, kwargs = CASES[name]
+    executed.clear()
+    response = seeded.request(method, url, **kwargs)
+    assert response.status_code < 400, response.text
+
+    statements = list(executed)
+    scans = sorted({
+        step
+        for statement, parameters in statements
+        for step in flagged_steps(query_plan(statement, parameters))
+    })
+    observed = {"statements": len(statements), "scans": scans}
+    if UPDATE:
+        baseline[name] = observed
+        return
+
+    expected = baseline.get(name)
+    assert expected is not None, f"{name} has no baseline; run with UPDATE_QUERY_PLANS=1"
+    assert len(statements) <= expected["statements"], (
+        f"{name} now runs {len(statements)} statements instead of {expected['statements']}:\n"
+        + "\n".join(statement for statement, _ in statements)
+    )
+    new_scans = [step for step in scans if step not in expected["scans"]]
+    assert not new_scans, f"{name} has new full scans or sorts: {new_scans}"
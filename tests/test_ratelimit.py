@@ -0,0 +1,162 @@
+"""Tests for rate limiting and load shedding on the write endpoints."""
+import asyncio
+
+import pytest
+
+from app.config import Settings
+from app.main import app
+from app.ratelimit import (
+    ConcurrencyLimiter, MemoryRateLimiter, RedisRateLimiter, get_rate_limiter,
+    get_write_limiter, make_rate_limiter, make_write_limiter,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """Stand-in for a Redis client that runs the token bucket script in Python."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.calls = []
+
+    def register_script(self, script):
+        def run(keys, args):
+            self.calls.append((keys, args))
+            rate, burst, now = args
+            tokens, ts = self.hashes.get(keys[0], (burst, now))
+            tokens = min(burst, tokens + max(0, now - ts) * rate)
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self.hashes[keys[0]] = (tokens, now)
+            return str(wait).encode()
+        return run
+
+
+@pytest.fixture(params=["memory", "redis"])
+def limited(request, client):
+    """Allow each client a burst of two writes, refilled at one per second."""
+    if request.param == "memory":
+        limiter = MemoryRateLimiter(rate=1, burst=2)
+    else:
+        limiter = RedisRateLimiter(FakeRedis(), rate=1, burst=2)
+    app.dependency_overrides[get_rate_limiter] = lambda: limiter
+    return limiter
+
+
+def test_token_bucket_allows_burst_then_refills():
+    """Test that a bucket spends its burst, reports the wait, then refills."""
+    clock = FakeClock()
+    limiter = MemoryRateLimiter(rate=2, burst=3, clock=clock)
+
+    assert [limiter.acquire("a") for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire("a") == pytest.approx(0.5)
+    assert limiter.acquire("b") == 0
+
+    clock.now += 1
+    assert [limiter.acquire("a") for _ in range(2)] == [0, 0]
+    assert limiter.acquire("a") > 0
+
+
+def test_idle_clients_are_evicted():
+    """Test that the bucket table never outgrows max_clients."""
+    clock = FakeClock()
+    limiter = MemoryRateLimiter(rate=1, burst=1, max_clients=2, clock=clock)
+    limiter.acquire("a")
+    limiter.acquire("b")
+    limiter.acquire("a")  # "b" is now the least recently seen
+    limiter.acquire("c")
+
+    assert len(limiter) == 2
+    assert limiter.acquire("a") > 0
+    assert limiter.acquire("b") == 0  # forgotten, so it starts with a full bucket
+
+
+def test_redis_limiter_shares_one_key_per_client():
+    """Test the keys and arguments passed to the Redis script."""
+    redis = FakeRedis()
+    limiter = RedisRateLimiter(redis, rate=5, burst=1)
+    assert limiter.acquire("10.0.0.1") == 0
+    assert limiter.acquire("10.0.0.1") > 0
+
+    keys, args = redis.calls[0]
+    assert keys == ["fastapi:rate:10.0.0.1"]
+    assert args[:2] == [5, 1]
+
+
+def test_write_endpoints_answer_429(client, limited, create_post):
+    """Test that writes beyond the burst are rejected with Retry-After."""
+    assert create_post().status_code == 201
+    assert client.post("/comments", json={"post_id": 1, "content": "Hi"}).status_code == 201
+
+    response = create_post(title="Rejected")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert client.post("/comments/bulk", json=[]).status_code == 429
+
+    # Reads are never limited and the rejected post was not written
+    assert [post["title"] for post in client.get("/posts").json()] == ["Test Post"]
+
+
+def test_redis_limiter_runs_off_the_event_loop(client, create_post):
+    """Test that the Redis round trip does not block the event loop."""
+    limiter = RedisRateLimiter(FakeRedis(), rate=1, burst=2)
+    acquire, on_loop = limiter.acquire, []
+
+    def acquire_and_check(key):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return acquire(key)
+
+    limiter.acquire = acquire_and_check
+    app.dependency_overrides[get_rate_limiter] = lambda: limiter
+    assert create_post().status_code == 201
+    assert on_loop == [False]
+
+
+def test_write_concurrency_limit_answers_503(client, create_post):
+    """Test that a write finding every slot taken is shed immediately."""
+    slots = ConcurrencyLimiter(1)
+    app.dependency_overrides[get_write_limiter] = lambda: slots
+
+    assert slots.try_acquire()
+    response = create_post()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    slots.release()
+
+    assert create_post().status_code == 201
+    # The slot is released after failed writes too
+    assert client.post("/comments", json={"post_id": 99, "content": "Hi"}).status_code == 404
+    assert create_post().status_code == 201
+
+
+def test_admission_control_disabled_by_default(create_post):
+    """Test that neither limiter is active without configuration."""
+    assert get_rate_limiter() is None
+    assert get_write_limiter() is None
+    assert all(create_post().status_code == 201 for _ in range(30))
+
+
+def test_make_limiters():
+    """Test building the limiters from settings."""
+    limiter = make_rate_limiter(Settings(
+        rate_limit_backend="memory", rate_limit_per_second=3, rate_limit_max_clients=5
+    ))
+    assert (limiter.name, limiter.rate, limiter.max_clients) == ("memory", 3, 5)
+    assert make_write_limiter(Settings(write_concurrency_limit=4)).limit == 4
+    assert make_write_limiter(Settings()) is None
+    with pytest.raises(ValueError):
+        make_rate_limiter(Settings(rate_limit_backend="bogus"))
@@ -0,0 +1,128 @@
+"""Tests for read-replica routing and read-your-writes stickiness."""
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.cache import MemoryCache, comments_key, get_cache, post_key
+from app.config import Settings
+from app.database import (
+    LAST_WRITE_COOKIE, ReadRouter, get_read_db, make_engine, make_replica_engines
+)
+from app.main import app
+from tests.conftest import DATABASE_PATH
+
+# The replica reads the test database file
+pytestmark = pytest.mark.file_database
+REPLICA_URL = f"sqlite:///file:{DATABASE_PATH}?mode=ro&uri=true"
+
+
+@pytest.fixture
+def replica(client, session_factory, monkeypatch):
+    """Route reads to a read-only connection of the test database."""
+    engine = make_engine(Settings(), url=REPLICA_URL)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    router = ReadRouter(session_factory, [sessionmaker(bind=engine)], sticky_seconds=5)
+    monkeypatch.setattr(database, "read_router", router)
+    app.dependency_overrides.pop(get_read_db)
+    yield statements
+    engine.dispose()
+
+
+def test_reads_go_to_replica(client, replica, create_post):
+    """Test that a client without recent writes reads from the replica."""
+    post = create_post().json()
+    client.cookies.clear()
+
+    assert client.get(f"/posts/{post['id']}").json()["title"] == "Test Post"
+    assert client.get("/posts").status_code == 200
+    assert client.get(f"/posts/{post['id']}/comments").json() == []
+    assert len(replica) == 4
+
+
+def test_reads_after_write_stay_on_primary(client, replica, create_post):
+    """Test read-your-writes: the writer's next reads use the primary."""
+    post = create_post().json()
+    response = client.post("/comments", json={"post_id": post["id"], "content": "Mine"})
+    assert LAST_WRITE_COOKIE in response.cookies
+
+    comments = client.get(f"/posts/{post['id']}/comments").json()
+    assert [c["content"] for c in comments] == ["Mine"]
+    assert replica == []
+
+
+def test_stickiness_expires(client, replica, create_post):
+    """Test that reads return to the replica after the window."""
+    post = create_post().json()
+    client.cookies.set(LAST_WRITE_COOKIE, str(time.time() - 60))
+    client.get(f"/posts/{post['id']}")
+    assert len(replica) == 1
+
+
+def test_replica_rejects_writes(client):
+    """Test that the mode=ro URI really opens the database read-only."""
+    engine = make_engine(Settings(), url=REPLICA_URL)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("DELETE FROM posts"))
+    finally:
+        engine.dispose()
+
+
+def test_replica_reads_do_not_fill_the_cache(client, replica, create_post):
+    """Test that a possibly stale replica page is served but not cached."""
+    cache = MemoryCache()
+    app.dependency_overrides[get_cache] = lambda: cache
+    post = create_post().json()
+    client.cookies.clear()
+
+    assert client.get(f"/posts/{post['id']}").status_code == 200
+    assert client.get(f"/posts/{post['id']}/comments").status_code == 200
+    assert len(replica) == 3
+    assert cache.get(post_key(post["id"])) is None
+    assert cache.get(comments_key(post["id"])) is None
+
+
+def test_round_robin_over_replicas():
+    """Test that reads are spread across replicas and marked as such."""
+    def sessions(name):
+        return lambda: SimpleNamespace(name=name, info={})
+
+    router = ReadRouter(sessions("primary"), [sessions("first"), sessions("second")])
+    chosen = [router.session() for _ in range(4)]
+    assert [db.name for db in chosen] == ["first", "second", "first", "second"]
+    assert all(db.info["replica"] for db in chosen)
+    primary = router.session(str(time.time()))
+    assert primary.name == "primary" and "replica" not in primary.info
+    assert router.session("not a timestamp").name in ("first", "second")
+
+
+def test_no_cookie_without_replicas(client):
+    """Test that writes do not set the stickiness cookie when nothing is routed."""
+    response = client.post("/posts", json={
+        "title": "Primary only", "content": "No replicas configured."
+    })
+    assert LAST_WRITE_COOKIE not in response.cookies
+
+
+def test_make_replica_engines_parses_urls():
+    """Test that DATABASE_REPLICA_URLS is a comma-separated list."""
+    assert make_replica_engines(Settings()) == []
+    engines = make_replica_engines(Settings(
+        database_replica_urls=f"{REPLICA_URL}, sqlite:///file:./other.db?mode=ro&uri=true"
+    ))
+    assert [engine.url.database for engine in engines] == [
+        "file:./test.db", "file:./other.db"
+    ]
+    for engine in engines:
+        engine.dispose()
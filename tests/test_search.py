@@ -0,0 +1,97 @@
+"""Tests for full-text search."""
+import pytest
+
+from app.main import app
+from app.search import LikeSearchIndex, get_search_index, search_index
+
+
+def _seed(client):
+    client.post("/posts", json={
+        "title": "Gardening tips",
+        "content": "How to grow tomatoes on a balcony.",
+        "author": "Grower"
+    })
+    client.post("/posts", json={
+        "title": "Cooking pasta",
+        "content": "Fresh tomatoes make the best sauce.",
+    })
+    client.post("/comments", json={"post_id": 2, "content": "I love tomatoes in pasta!"})
+    client.post("/comments", json={"post_id": 1, "content": "Try basil as well."})
+
+
+def test_search_finds_posts_and_comments(client):
+    """Test that posts and comments are indexed as they are created."""
+    _seed(client)
+    response = client.get("/search", params={"q": "tomatoes"})
+    assert response.status_code == 200
+    hits = {(r["kind"], r["id"]) for r in response.json()}
+    assert hits == {("post", 1), ("post", 2), ("comment", 1)}
+
+
+def test_search_ranks_and_snippets(client):
+    """Test BM25 ordering (title matches weigh more) and highlighted snippets."""
+    _seed(client)
+    results = client.get("/search", params={"q": "pasta"}).json()
+    assert [(r["kind"], r["id"]) for r in results] == [("post", 2), ("comment", 1)]
+    assert results[0]["rank"] <= results[1]["rank"]
+    assert "<b>pasta</b>" in results[0]["snippet"].lower()
+    assert results[1]["post_id"] == 2
+
+
+def test_search_requires_all_terms(client):
+    """Test that multi-word queries match documents containing every term."""
+    _seed(client)
+    results = client.get("/search", params={"q": "basil try"}).json()
+    assert [(r["kind"], r["id"]) for r in results] == [("comment", 2)]
+
+
+def test_search_ignores_query_syntax(client):
+    """Test that FTS operators in user input cannot cause errors."""
+    _seed(client)
+    response = client.get("/search", params={"q": 'tomatoes" OR NEAR(*'})
+    assert response.status_code == 200
+
+
+def test_search_paginates(client):
+    """Test walking search results with the cursor."""
+    for i in range(5):
+        client.post("/posts", json={"title": f"Post {i}", "content": "Shared keyword here."})
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"q": "keyword", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/search", params=params)
+        seen.extend(r["id"] for r in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert sorted(seen) == [1, 2, 3, 4, 5]
+
+
+def test_search_rebuild(client, session_factory):
+    """Test that rebuilding re-indexes existing rows."""
+    _seed(client)
+    with session_factory() as db:
+        db.connection().exec_driver_sql("DELETE FROM search_index")
+        db.commit()
+    assert client.get("/search", params={"q": "tomatoes"}).json() == []
+
+    with session_factory() as db:
+        search_index.rebuild(db.connection())
+        db.commit()
+    assert len(client.get("/search", params={"q": "tomatoes"}).json()) == 3
+
+
+@pytest.fixture
+def like_index(client):
+    app.dependency_overrides[get_search_index] = LikeSearchIndex
+
+
+def test_like_backend(client, like_index):
+    """Test the unindexed fallback backend returns the same documents."""
+    _seed(client)
+    hits = {(r["kind"], r["id"]) for r in client.get("/search", params={"q": "tomatoes"}).json()}
+    assert hits == {("post", 1), ("post", 2), ("comment", 1)}
@@ -0,0 +1,86 @@
+"""Tests for the fast response serializer."""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app import serialization
+from app.config import settings
+from app.models import Comment, Post
+
+
+@pytest.fixture
+def fast(monkeypatch):
+    monkeypatch.setattr(settings, "fast_serializer", True)
+
+
+def _rows():
+    return [
+        SimpleNamespace(
+            id=1, title="Café crème", content="Ünïcode content — with \"quotes\".",
+            author=None, created_at=datetime(2024, 1, 2, 3, 4, 5),
+            version=3, comment_count=2, last_comment_at=datetime(2024, 1, 2, 3, 4, 5, 678),
+        ),
+        SimpleNamespace(
+            id=2, title="Plain", content="Plain content here.", author="Someone",
+            created_at=datetime(2024, 1, 2, 3, 4, 5, 123456),
+            version=1, comment_count=0, last_comment_at=None,
+        ),
+    ]
+
+
+def _encode_both(monkeypatch, fn, *args):
+    monkeypatch.setattr(settings, "fast_serializer", False)
+    validated = fn(*args)
+    monkeypatch.setattr(settings, "fast_serializer", True)
+    return validated, fn(*args)
+
+
+def test_fast_serializer_matches_validated_output(monkeypatch):
+    """Test that the fast path produces byte-identical JSON."""
+    validated, fast = _encode_both(monkeypatch, serialization.encode_many, _rows(), Post)
+    assert fast == validated
+
+    validated, fast = _encode_both(monkeypatch, serialization.encode_one, _rows()[0], Post)
+    assert fast == validated
+
+
+def test_fast_serializer_without_orjson(monkeypatch):
+    """Test the pydantic-core fallback when orjson is not installed."""
+    monkeypatch.setattr(serialization, "orjson", None)
+    validated, fast = _encode_both(monkeypatch, serialization.encode_many, _rows(), Post)
+    assert fast == validated
+
+
+def test_fast_serializer_drops_unmodelled_columns(monkeypatch):
+    """Test that columns missing from the response model are not emitted."""
+    monkeypatch.setattr(settings, "fast_serializer", True)
+    assert b"version" not in serialization.encode_one(_rows()[0], Post)
+
+
+def test_endpoints_identical_with_fast_serializer(client, monkeypatch):
+    """Test that every read endpoint returns the same body in both modes."""
+    client.post("/posts", json={"title": "Tëst Post", "content": "This is a test post."})
+    client.post("/comments", json={"post_id": 1, "content": "A comment.", "author": "Al"})
+    paths = [
+        "/posts", "/posts/1", "/posts/1?include=comments", "/posts/1/comments",
+        "/export/posts.ndjson", "/export/comments.ndjson",
+    ]
+
+    monkeypatch.setattr(settings, "fast_serializer", False)
+    validated = {path: client.get(path).content for path in paths}
+    monkeypatch.setattr(settings, "fast_serializer", True)
+    fast = {path: client.get(path).content for path in paths}
+    assert fast == validated
+
+
+def test_comment_schema_field_order(fast):
+    """Test that fields follow the response model's declaration order."""
+    row = SimpleNamespace(
+        id=5, post_id=1, content="Hello there.", author=None,
+        created_at=datetime(2024, 1, 1),
+    )
+    assert serialization.encode_one(row, Comment) == (
+        b'{"content":"Hello there.","author":null,"id":5,"post_id":1,'
+        b'"created_at":"2024-01-01T00:00:00"}'
+    )
@@ -0,0 +1,207 @@
+"""Tests for the server-sent comment stream."""
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from app.events import KEEPALIVE, CommentBroker, comment_broker
+from app.main import app
+from app.repository import CommentRecord
+
+
+class EventStream:
+    """Drive the ASGI app directly; TestClient buffers whole responses."""
+
+    def __init__(self, path, headers=None):
+        self.path = path
+        self.headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+        self.messages = asyncio.Queue()
+        self.disconnected = asyncio.Event()
+
+    async def __aenter__(self):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": self.path, "raw_path": self.path.encode(),
+            "query_string": b"", "root_path": "", "headers": self.headers,
+            "client": ("test", 1), "server": ("test", 80),
+        }
+        self.task = asyncio.create_task(app(scope, self.receive, self.messages.put))
+        self.start = await asyncio.wait_for(self.messages.get(), 5)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.disconnected.set()
+        await asyncio.wait_for(self.task, 5)
+
+    async def receive(self):
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def next_chunk(self) -> bytes:
+        while True:
+            message = await asyncio.wait_for(self.messages.get(), 5)
+            if message.get("body"):
+                return message["body"]
+            if not message.get("more_body", False):
+                return b""
+
+
+def _parse(chunk: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+    fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+def test_stream_delivers_new_comments(client, create_post):
+    """Test that a committed comment reaches the post's open streams."""
+    post = create_post().json()
+    other = create_post().json()
+
+    async def scenario():
+        async with EventStream(f"/posts/{post['id']}/comments/stream") as stream:
+            assert stream.start["status"] == 200
+            assert (b"content-type", b"text/event-stream; charset=utf-8") in stream.start["headers"]
+            client.post("/comments", json={"post_id": other["id"], "content": "Elsewhere"})
+            client.post("/comments", json={"post_id": post["id"], "content": "Live!"})
+            return _parse(await stream.next_chunk())
+
+    event = asyncio.run(scenario())
+    assert event["event"] == "comment"
+    assert event["id"] == "2"
+    assert event["data"]["content"] == "Live!"
+    assert event["data"]["post_id"] == post["id"]
+    assert comment_broker.subscriber_count() == 0
+
+
+def test_bulk_comments_are_streamed(client, create_post):
+    """Test that comments created in bulk are published one event each."""
+    post = create_post().json()
+
+    async def scenario():
+        async with EventStream(f"/posts/{post['id']}/comments/stream") as stream:
+            client.post("/comments/bulk", json=[
+                {"post_id": post["id"], "content": f"Bulk {i}"} for i in range(2)
+            ])
+            return [_parse(await stream.next_chunk()) for _ in range(2)]
+
+    events = asyncio.run(scenario())
+    assert [e["data"]["content"] for e in events] == ["Bulk 0", "Bulk 1"]
+
+
+def test_last_event_id_replays_missed_comments(client, create_post):
+    """Test that a reconnect resumes after the last comment it saw."""
+    post = create_post().json()
+    for i in range(3):
+        client.post("/comments", json={"post_id": post["id"], "content": f"Comment {i}"})
+
+    async def scenario():
+        async with EventStream(
+            f"/posts/{post['id']}/comments/stream", {"Last-Event-ID": "1"}
+        ) as stream:
+            replayed = [_parse(await stream.next_chunk()) for _ in range(2)]
+            client.post("/comments", json={"post_id": post["id"], "content": "After"})
+            return replayed + [_parse(await stream.next_chunk())]
+
+    events = asyncio.run(scenario())
+    assert [e["id"] for e in events] == ["2", "3", "4"]
+    assert events[-1]["data"]["content"] == "After"
+
+
+# Checks the connection pool, which the in-memory database bypasses
+@pytest.mark.file_database
+def test_idle_stream_holds_no_connection(create_post, session_factory, sql_statements):
+    """Test that an open stream neither polls nor keeps a pooled connection."""
+    post = create_post().json()
+    pool = session_factory.kw["bind"].pool
+    sql_statements.clear()
+
+    async def scenario():
+        async with EventStream(f"/posts/{post['id']}/comments/stream"):
+            await asyncio.sleep(0.2)
+            return pool.checkedout(), len(sql_statements)
+
+    checked_out, statements = asyncio.run(scenario())
+    assert checked_out == 0
+    # only the existence check when the stream opened
+    assert statements == 1
+
+
+def test_stream_missing_post_returns_404(client):
+    """Test that streams of missing posts are rejected and not subscribed."""
+    response = client.get("/posts/42/comments/stream")
+    assert response.status_code == 404
+    assert comment_broker.subscriber_count() == 0
+
+
+def test_idle_stream_sends_keepalives():
+    """Test that idle streams send comments so proxies keep them open."""
+    broker = CommentBroker(keepalive=0.01)
+
+    async def scenario():
+        stream = broker.stream(broker.subscribe(1), [])
+        chunk = await stream.__anext__()
+        await stream.aclose()
+        return chunk
+
+    assert asyncio.run(scenario()) == KEEPALIVE
+    assert broker.subscriber_count() == 0
+
+
+def test_slow_reader_is_disconnected():
+    """Test that a full queue ends the stream instead of growing."""
+    broker = CommentBroker(max_pending=2, keepalive=5)
+
+    async def scenario():
+        subscription = broker.subscribe(1)
+        for comment_id in (1, 2, 3):
+            broker.publish(CommentRecord(
+                id=comment_id, post_id=1, content="Fast", author=None,
+                created_at=datetime(2024, 1, 1),
+            ))
+        await asyncio.sleep(0)
+        return [chunk async for chunk in broker.stream(subscription, [])]
+
+    chunks = asyncio.run(scenario())
+    assert [chunk.split(b"\n", 1)[0] for chunk in chunks] == [b"id: 1", b"id: 2"]
+
+
+def test_out_of_order_publishes_are_delivered():
+    """Test that a comment published after a newer one still reaches the stream."""
+    broker = CommentBroker(keepalive=5)
+
+    async def scenario():
+        subscription = broker.subscribe(1)
+        for comment_id in (4, 6, 5):
+            broker.publish(CommentRecord(
+                id=comment_id, post_id=1, content="Racing", author=None,
+                created_at=datetime(2024, 1, 1),
+            ))
+        await asyncio.sleep(0)
+        replay = [(3, b"{}"), (4, b"{}")]
+        stream = broker.stream(subscription, replay, last_id=2)
+        chunks = [await stream.__anext__() for _ in range(4)]
+        await stream.aclose()
+        return chunks
+
+    chunks = asyncio.run(scenario())
+    # 4 came from the replay and its live copy is skipped
+    assert [chunk.split(b"\n", 1)[0] for chunk in chunks] == [
+        b"id: 3", b"id: 4", b"id: 6", b"id: 5"
+    ]
+
+
+def test_memory_backend_streams(memory_client):
+    """Test that the stream works on the in-memory store as well."""
+    post = memory_client.post("/posts", json={
+        "title": "Memory Post", "content": "Streamed from memory."
+    }).json()
+    memory_client.post("/comments", json={"post_id": post["id"], "content": "Earlier"})
+
+    async def scenario():
+        async with EventStream(
+            f"/posts/{post['id']}/comments/stream", {"Last-Event-ID": "0"}
+        ) as stream:
+            return _parse(await stream.next_chunk())
+
+    assert asyncio.run(scenario())["data"]["content"] == "Earlier"